@@ -39,17 +39,15 @@ def add_10_voters():
     print(f"\nRegistering {len(voters_data)} voters...")
     print("-" * 60)
     
-    successful_registrations = 0
-    failed_registrations = 0
+    # Register the whole list in one batch; existing IDs are reported, not fatal
+    successful_registrations, duplicates = voting_system.register_voters_bulk(voters_data)
+    failed_registrations = len(duplicates)
     
     for i, (voter_id, name, password) in enumerate(voters_data, 1):
-        success, msg = voting_system.register_voter(voter_id, name, password)
-        if success:
-            print(f"✓ {i:2d}. Registered: {voter_id} | {name}")
-            successful_registrations += 1
+        if voter_id in duplicates:
+            print(f"⚠ {i:2d}. Failed: {voter_id} | {name} | Reason: Voter ID already exists")
         else:
-            print(f"⚠ {i:2d}. Failed: {voter_id} | {name} | Reason: {msg}")
-            failed_registrations += 1
+            print(f"✓ {i:2d}. Registered: {voter_id} | {name}")
     
     # Display results
     print("\n" + "=" * 60)
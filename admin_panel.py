@@ -1,18 +1,71 @@
 # Code created by https://linktr.ee/saran709
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, simpledialog
 from voting_system import VotingSystem
+from database_manager import DEFAULT_ELECTION_ID
+from tree_sync import TreeSync
 
 class AdminPanel:
     """
     Admin panel interface for managing the voting system
     """
     
-    def __init__(self, parent_gui, voting_system):
+    # Milliseconds between change probes while auto-refresh is on
+    DEFAULT_REFRESH_INTERVAL = 1000
+    ACTIVITY_ROWS = 10
+    
+    # Voter roll paging: rows fetched per page, and the database column behind each heading
+    VOTERS_PAGE_SIZE = 200
+    VOTER_SORT_COLUMNS = {
+        'Voter ID': 'voter_id',
+        'Name': 'name',
+        'Has Voted': 'has_voted',
+        'Registration Date': 'registration_date',
+    }
+    VOTER_ROW_FIELDS = ('voter_id', 'name', 'has_voted', 'registration_date')
+    VOTER_FILTERS = {
+        'All voters': None,
+        'Voted': 'voted',
+        'Not voted': 'not_voted',
+    }
+    
+    # Vote-rate chart: bucket widths offered, buckets drawn, and one colour per candidate
+    TIMELINE_WIDTHS = {
+        '1 min': 1,
+        '5 min': 5,
+        '15 min': 15,
+        '1 hour': 60,
+    }
+    TIMELINE_BUCKETS = 60
+    
+    # Columns of the performance metrics table and the snapshot field behind each
+    METRIC_COLUMNS = {
+        'Operation': None,
+        'Calls': 'calls',
+        'Errors': 'errors',
+        'Mean (ms)': 'mean_ms',
+        'p50 (ms)': 'p50_ms',
+        'p95 (ms)': 'p95_ms',
+        'p99 (ms)': 'p99_ms',
+        'Max (ms)': 'max_ms',
+    }
+    CHART_COLORS = ('#3498db', '#e74c3c', '#27ae60', '#f39c12', '#8e44ad', '#16a085', '#d35400', '#2c3e50')
+    
+    def __init__(self, parent_gui, voting_system, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        """refresh_interval: milliseconds between checks for new votes; probes are cheap, so sub-second is fine"""
         self.parent_gui = parent_gui
         self.voting_system = voting_system
         self.root = parent_gui.root
+        self.worker = parent_gui.worker
         self.current_frame = None
+        self.refresh_interval = refresh_interval
+        self.auto_refresh_job = None
+        self.change_token = None
+        self.activity_votes = []
+        self.voters_generation = 0
+        self.timeline = None
+        self.elections = {}
+        self.election_id = DEFAULT_ELECTION_ID
     
     def setup_admin_screen(self):
         """Setup the admin dashboard"""
@@ -49,6 +102,23 @@ class AdminPanel:
         )
         admin_status_label.pack(side='left', padx=(20, 0))
         
+        # Election shown on every tab; filled in once the list has loaded
+        tk.Label(header_frame, text="Election:", bg='#f0f0f0').pack(side='left', padx=(20, 5))
+        self.election_var = tk.StringVar()
+        self.election_box = ttk.Combobox(header_frame, textvariable=self.election_var, state='readonly', width=24)
+        self.election_box.pack(side='left')
+        self.election_box.bind('<<ComboboxSelected>>', lambda event: self.select_election())
+        
+        new_election_btn = tk.Button(
+            header_frame,
+            text="New Election...",
+            command=self.new_election,
+            bg='#3498db',
+            fg='white',
+            font=('Arial', 10)
+        )
+        new_election_btn.pack(side='left', padx=(10, 0))
+        
         logout_btn = tk.Button(
             header_frame, 
             text="Logout", 
@@ -71,6 +141,8 @@ class AdminPanel:
         self.create_voters_tab()
         self.create_results_tab()
         self.create_settings_tab()
+        
+        self.refresh_elections()
     
     def clear_frame(self):
         """Clear the current frame"""
@@ -87,18 +159,18 @@ class AdminPanel:
         )
         stats_frame.pack(fill='x', pady=10)
         
-        # Get statistics
-        stats = self.voting_system.get_statistics()
-        
         # Create statistics grid
         stats_grid = tk.Frame(stats_frame, bg='#f0f0f0')
         stats_grid.pack(fill='x', padx=10, pady=10)
         
-        # Statistics cards
-        self.create_stat_card(stats_grid, "Total Voters", stats['total_voters'], 0, 0, '#3498db')
-        self.create_stat_card(stats_grid, "Total Candidates", stats['total_candidates'], 0, 1, '#e74c3c')
-        self.create_stat_card(stats_grid, "Votes Cast", stats['total_votes'], 0, 2, '#27ae60')
-        self.create_stat_card(stats_grid, "Turnout", f"{stats['voter_turnout']:.1f}%", 0, 3, '#f39c12')
+        # Statistics cards - values are filled in once the statistics have loaded
+        self.stat_labels = {
+            'total_voters': self.create_stat_card(stats_grid, "Total Voters", "...", 0, 0, '#3498db'),
+            'total_candidates': self.create_stat_card(stats_grid, "Total Candidates", "...", 0, 1, '#e74c3c'),
+            'total_votes': self.create_stat_card(stats_grid, "Votes Cast", "...", 0, 2, '#27ae60'),
+            'voter_turnout': self.create_stat_card(stats_grid, "Turnout", "...", 0, 3, '#f39c12'),
+        }
+        self.refresh_statistics()
     
     def create_stat_card(self, parent, title, value, row, col, color):
         """Create a statistics card"""
@@ -123,6 +195,8 @@ class AdminPanel:
             fg='white'
         )
         title_label.pack(pady=(0, 10))
+        
+        return value_label
     
     def create_candidates_tab(self):
         """Create the candidates management tab"""
@@ -151,7 +225,7 @@ class AdminPanel:
         
         fields_frame.grid_columnconfigure(1, weight=1)
         
-        add_btn = tk.Button(
+        self.add_candidate_btn = tk.Button(
             add_frame, 
             text="Add Candidate", 
             command=self.add_candidate,
@@ -159,7 +233,7 @@ class AdminPanel:
             fg='white',
             font=('Arial', 11)
         )
-        add_btn.pack(pady=10)
+        self.add_candidate_btn.pack(pady=10)
         
         # Candidates list
         list_frame = tk.LabelFrame(candidates_frame, text="Current Candidates", font=('Arial', 12, 'bold'))
@@ -168,6 +242,7 @@ class AdminPanel:
         # Treeview for candidates
         columns = ('ID', 'Name', 'Party', 'Description')
         self.candidates_tree = ttk.Treeview(list_frame, columns=columns, show='headings')
+        self.candidates_sync = TreeSync(self.candidates_tree)
         
         for col in columns:
             self.candidates_tree.heading(col, text=col)
@@ -181,7 +256,7 @@ class AdminPanel:
         candidates_scrollbar.pack(side='right', fill='y')
         
         # Remove button
-        remove_candidate_btn = tk.Button(
+        self.remove_candidate_btn = tk.Button(
             list_frame, 
             text="Remove Selected", 
             command=self.remove_candidate,
@@ -189,7 +264,7 @@ class AdminPanel:
             fg='white',
             font=('Arial', 10)
         )
-        remove_candidate_btn.pack(pady=5)
+        self.remove_candidate_btn.pack(pady=5)
         
         self.refresh_candidates_list()
     
@@ -220,7 +295,7 @@ class AdminPanel:
         
         voter_fields_frame.grid_columnconfigure(1, weight=1)
         
-        register_btn = tk.Button(
+        self.register_voter_btn = tk.Button(
             register_frame, 
             text="Register Voter", 
             command=self.register_voter,
@@ -228,28 +303,66 @@ class AdminPanel:
             fg='white',
             font=('Arial', 11)
         )
-        register_btn.pack(pady=10)
+        self.register_voter_btn.pack(pady=10)
         
         # Voters list
         voters_list_frame = tk.LabelFrame(voters_frame, text="Registered Voters", font=('Arial', 12, 'bold'))
         voters_list_frame.pack(fill='both', expand=True, padx=10, pady=10)
         
-        # Treeview for voters
-        voter_columns = ('Voter ID', 'Name', 'Has Voted', 'Registration Date')
+        # Voted-status filter, applied by the database
+        filter_frame = tk.Frame(voters_list_frame)
+        filter_frame.pack(fill='x', padx=5, pady=(5, 0))
+        
+        tk.Label(filter_frame, text="Show:").pack(side='left')
+        self.voter_filter_var = tk.StringVar(value='All voters')
+        voter_filter_box = ttk.Combobox(
+            filter_frame,
+            textvariable=self.voter_filter_var,
+            values=list(self.VOTER_FILTERS),
+            state='readonly',
+            width=12
+        )
+        voter_filter_box.pack(side='left', padx=5)
+        voter_filter_box.bind('<<ComboboxSelected>>', lambda event: self.reload_voters())
+        
+        self.voters_loaded_label = tk.Label(filter_frame, text="", fg='#7f8c8d')
+        self.voters_loaded_label.pack(side='right')
+        
+        # Roll management for the election selected in the header; the general election includes everyone
+        self.remove_from_roll_btn = tk.Button(
+            filter_frame,
+            text="Remove Selected from Roll",
+            command=self.remove_from_roll,
+            font=('Arial', 9)
+        )
+        self.remove_from_roll_btn.pack(side='right', padx=5)
+        
+        self.add_to_roll_btn = tk.Button(
+            filter_frame,
+            text="Add to Roll...",
+            command=self.add_to_roll,
+            font=('Arial', 9)
+        )
+        self.add_to_roll_btn.pack(side='right', padx=5)
+        
+        # Treeview for voters - rows are fetched a page at a time as the list is scrolled
+        voter_columns = tuple(self.VOTER_SORT_COLUMNS)
         self.voters_tree = ttk.Treeview(voters_list_frame, columns=voter_columns, show='headings')
+        self.voters_sync = TreeSync(self.voters_tree)
         
         for col in voter_columns:
-            self.voters_tree.heading(col, text=col)
+            self.voters_tree.heading(col, text=col, command=lambda c=col: self.sort_voters(c))
             self.voters_tree.column(col, width=120)
         
         # Scrollbar
-        voters_scrollbar = ttk.Scrollbar(voters_list_frame, orient='vertical', command=self.voters_tree.yview)
-        self.voters_tree.configure(yscrollcommand=voters_scrollbar.set)
+        self.voters_scrollbar = ttk.Scrollbar(voters_list_frame, orient='vertical', command=self.voters_tree.yview)
+        self.voters_tree.configure(yscrollcommand=self.on_voters_scroll)
         
         self.voters_tree.pack(side='left', fill='both', expand=True)
-        voters_scrollbar.pack(side='right', fill='y')
+        self.voters_scrollbar.pack(side='right', fill='y')
         
-        self.refresh_voters_list()
+        self.voter_sort = ('Voter ID', False)
+        self.reload_voters()
     
     def create_results_tab(self):
         """Create the results viewing tab"""
@@ -263,6 +376,7 @@ class AdminPanel:
         # Results treeview
         result_columns = ('Rank', 'Candidate', 'Party', 'Votes', 'Percentage')
         self.results_tree = ttk.Treeview(results_display_frame, columns=result_columns, show='headings')
+        self.results_sync = TreeSync(self.results_tree)
         
         for col in result_columns:
             self.results_tree.heading(col, text=col)
@@ -279,7 +393,7 @@ class AdminPanel:
         buttons_frame = tk.Frame(results_display_frame)
         buttons_frame.pack(fill='x', pady=10)
         
-        refresh_btn = tk.Button(
+        self.refresh_results_btn = tk.Button(
             buttons_frame, 
             text="Refresh Results", 
             command=self.refresh_results,
@@ -287,9 +401,9 @@ class AdminPanel:
             fg='white',
             font=('Arial', 10)
         )
-        refresh_btn.pack(side='left', padx=5)
+        self.refresh_results_btn.pack(side='left', padx=5)
         
-        export_btn = tk.Button(
+        self.export_btn = tk.Button(
             buttons_frame, 
             text="Export Summary", 
             command=self.export_results,
@@ -297,19 +411,101 @@ class AdminPanel:
             fg='white',
             font=('Arial', 10)
         )
-        export_btn.pack(side='left', padx=5)
+        self.export_btn.pack(side='left', padx=5)
+        
+        # Streaming data exports, written on the background worker
+        self.export_data_btn = tk.Menubutton(
+            buttons_frame,
+            text="Export Data ▾",
+            bg='#8e44ad',
+            fg='white',
+            font=('Arial', 10),
+            relief='raised'
+        )
+        export_menu = tk.Menu(self.export_data_btn, tearoff=0)
+        export_menu.add_command(label="Results...", command=lambda: self.export_data('results'))
+        export_menu.add_command(label="Turnout Roll...", command=lambda: self.export_data('turnout'))
+        export_menu.add_command(label="Vote Audit...", command=lambda: self.export_data('audit'))
+        self.export_data_btn.config(menu=export_menu)
+        self.export_data_btn.pack(side='left', padx=5)
         
         # Auto-refresh toggle
         self.auto_refresh_var = tk.BooleanVar(value=True)
         auto_refresh_check = tk.Checkbutton(
             buttons_frame,
-            text="Auto-refresh (5s)",
+            text=f"Auto-refresh ({self.refresh_interval / 1000:g}s)",
             variable=self.auto_refresh_var,
             command=self.toggle_auto_refresh,
             bg='#f0f0f0'
         )
         auto_refresh_check.pack(side='left', padx=10)
         
+        # Instant-runoff count over the ranked ballots, one row per candidate per round
+        runoff_frame = tk.LabelFrame(results_frame, text="Instant-Runoff Rounds", font=('Arial', 12, 'bold'))
+        runoff_frame.pack(fill='x', padx=10, pady=10)
+        
+        runoff_controls = tk.Frame(runoff_frame)
+        runoff_controls.pack(fill='x', padx=10, pady=(5, 0))
+        
+        self.recount_runoff_btn = tk.Button(
+            runoff_controls,
+            text="Recount",
+            command=self.refresh_runoff,
+            bg='#3498db',
+            fg='white',
+            font=('Arial', 10)
+        )
+        self.recount_runoff_btn.pack(side='left')
+        
+        self.runoff_label = tk.Label(runoff_controls, text="", fg='#7f8c8d')
+        self.runoff_label.pack(side='left', padx=10)
+        
+        runoff_columns = ('Round', 'Candidate', 'Votes', 'Share', 'Outcome')
+        self.runoff_tree = ttk.Treeview(runoff_frame, columns=runoff_columns, show='headings', height=6)
+        self.runoff_sync = TreeSync(self.runoff_tree)
+        
+        for col in runoff_columns:
+            self.runoff_tree.heading(col, text=col)
+            self.runoff_tree.column(col, width=120)
+        self.runoff_tree.column('Outcome', width=260)
+        
+        self.runoff_tree.pack(fill='x', padx=10, pady=10)
+        
+        # Votes per time bucket and cumulative turnout, drawn from the per-minute rollup
+        timeline_frame = tk.LabelFrame(results_frame, text="Votes Over Time", font=('Arial', 12, 'bold'))
+        timeline_frame.pack(fill='x', padx=10, pady=10)
+        
+        timeline_controls = tk.Frame(timeline_frame)
+        timeline_controls.pack(fill='x', padx=10, pady=(5, 0))
+        
+        tk.Label(timeline_controls, text="Bucket:").pack(side='left')
+        self.timeline_width_var = tk.StringVar(value='1 min')
+        timeline_width_box = ttk.Combobox(
+            timeline_controls,
+            textvariable=self.timeline_width_var,
+            values=list(self.TIMELINE_WIDTHS),
+            state='readonly',
+            width=8
+        )
+        timeline_width_box.pack(side='left', padx=5)
+        timeline_width_box.bind('<<ComboboxSelected>>', lambda event: self.refresh_timeline())
+        
+        self.timeline_by_candidate_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            timeline_controls,
+            text="By candidate",
+            variable=self.timeline_by_candidate_var,
+            command=self.draw_timeline
+        ).pack(side='left', padx=10)
+        
+        self.timeline_label = tk.Label(timeline_controls, text="", fg='#7f8c8d')
+        self.timeline_label.pack(side='right')
+        
+        self.timeline_canvas = tk.Canvas(timeline_frame, height=180, bg='white', highlightthickness=0)
+        self.timeline_canvas.pack(fill='x', padx=10, pady=10)
+        self.timeline_canvas.bind('<Configure>', lambda event: self.draw_timeline())
+        self.timeline = None
+        
         # Recent activity section
         activity_frame = tk.LabelFrame(results_frame, text="Recent Voting Activity", font=('Arial', 12, 'bold'))
         activity_frame.pack(fill='x', padx=10, pady=10)
@@ -317,6 +513,7 @@ class AdminPanel:
         # Recent votes treeview
         activity_columns = ('Time', 'Candidate', 'Party')
         self.activity_tree = ttk.Treeview(activity_frame, columns=activity_columns, show='headings', height=6)
+        self.activity_sync = TreeSync(self.activity_tree)
         
         for col in activity_columns:
             self.activity_tree.heading(col, text=col)
@@ -324,11 +521,12 @@ class AdminPanel:
         
         self.activity_tree.pack(fill='x', padx=10, pady=10)
         
-        self.refresh_results()
-        self.refresh_recent_activity()
-        
-        # Start auto-refresh
+        # The first change probe loads results and activity
+        self.change_token = None
+        self.activity_votes = []
         self.start_auto_refresh()
+        # A runoff recount reads every ballot, so it runs here and on Recount rather than on every vote
+        self.refresh_runoff(show_busy=False)
     
     def create_settings_tab(self):
         """Create the settings tab"""
@@ -339,11 +537,59 @@ class AdminPanel:
         db_info_frame = tk.LabelFrame(settings_frame, text="Database Information", font=('Arial', 12, 'bold'))
         db_info_frame.pack(fill='x', padx=10, pady=10)
         
-        db_info_text = scrolledtext.ScrolledText(db_info_frame, height=10, state='disabled')
-        db_info_text.pack(fill='x', padx=10, pady=10)
+        self.db_info_text = scrolledtext.ScrolledText(db_info_frame, height=10, state='disabled')
+        self.db_info_text.pack(fill='x', padx=10, pady=10)
         
-        # Display database info
-        stats = self.voting_system.get_statistics()
+        self.worker.submit(self.voting_system.get_statistics, on_success=self.show_database_info)
+        
+        # Per-operation call counts and latencies recorded by the database and voting layers
+        metrics_frame = tk.LabelFrame(settings_frame, text="Performance Metrics", font=('Arial', 12, 'bold'))
+        metrics_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        metrics_buttons = tk.Frame(metrics_frame)
+        metrics_buttons.pack(fill='x', padx=10, pady=(5, 0))
+        
+        self.refresh_metrics_btn = tk.Button(
+            metrics_buttons,
+            text="Refresh Metrics",
+            command=self.refresh_metrics,
+            bg='#3498db',
+            fg='white',
+            font=('Arial', 10)
+        )
+        self.refresh_metrics_btn.pack(side='left', padx=5)
+        
+        self.save_metrics_btn = tk.Button(
+            metrics_buttons,
+            text="Save Metrics...",
+            command=self.save_metrics,
+            bg='#27ae60',
+            fg='white',
+            font=('Arial', 10)
+        )
+        self.save_metrics_btn.pack(side='left', padx=5)
+        
+        self.metrics_label = tk.Label(metrics_buttons, text="", fg='#7f8c8d')
+        self.metrics_label.pack(side='right')
+        
+        metric_columns = tuple(self.METRIC_COLUMNS)
+        self.metrics_tree = ttk.Treeview(metrics_frame, columns=metric_columns, show='headings', height=8)
+        self.metrics_sync = TreeSync(self.metrics_tree)
+        
+        for col in metric_columns:
+            self.metrics_tree.heading(col, text=col)
+            self.metrics_tree.column(col, width=220 if col == 'Operation' else 70, anchor='w' if col == 'Operation' else 'e')
+        
+        metrics_scrollbar = ttk.Scrollbar(metrics_frame, orient='vertical', command=self.metrics_tree.yview)
+        self.metrics_tree.configure(yscrollcommand=metrics_scrollbar.set)
+        
+        self.metrics_tree.pack(side='left', fill='both', expand=True, padx=(10, 0), pady=10)
+        metrics_scrollbar.pack(side='right', fill='y', pady=10)
+        
+        self.refresh_metrics()
+    
+    def show_database_info(self, stats):
+        """Display database info"""
         info_content = f"""
 Database Status: Connected
 Database File: voting_database.db
@@ -362,13 +608,64 @@ Default Admin Credentials:
 System Information:
 • Offline Mode: Enabled
 • Database Type: SQLite
-• Security: Password Hashing (SHA-256)
+• Security: Password Hashing (PBKDF2-SHA256, {self.voting_system.db.hasher.iterations:,} iterations)
 • Vote Privacy: Anonymous voting
         """
         
-        db_info_text.config(state='normal')
-        db_info_text.insert('1.0', info_content)
-        db_info_text.config(state='disabled')
+        self.db_info_text.config(state='normal')
+        self.db_info_text.delete('1.0', tk.END)
+        self.db_info_text.insert('1.0', info_content)
+        self.db_info_text.config(state='disabled')
+    
+    def refresh_metrics(self):
+        """Reload the performance metrics table"""
+        return self.worker.submit(
+            self.voting_system.get_metrics,
+            on_success=self.show_metrics,
+            disable=(self.refresh_metrics_btn,),
+            key='metrics'
+        )
+    
+    def show_metrics(self, snapshot):
+        """Update the performance metrics table, busiest operations first"""
+        if not snapshot:
+            return
+        
+        operations = sorted(snapshot['operations'].items(), key=lambda item: (-item[1]['calls'], item[0]))
+        rows = []
+        for name, stats in operations:
+            values = [name]
+            for field in list(self.METRIC_COLUMNS.values())[1:]:
+                value = stats[field]
+                values.append(f"{value:,}" if field in ('calls', 'errors') else f"{value:.2f}")
+            rows.append((name, values))
+        self.metrics_sync.sync(rows)
+        
+        gauges = snapshot['gauges']
+        summary = f"Connections opened: {gauges.get('connections_opened', '?')}"
+        queue = gauges.get('vote_queue')
+        if isinstance(queue, dict):
+            summary += (f"  |  Vote queue: {queue['votes_per_second']:.1f} votes/s, "
+                        f"avg batch {queue['average_batch_size']:.1f}, {queue['pending']} pending")
+        self.metrics_label.config(text=f"{summary}  |  Since {snapshot['started'].replace('T', ' ')}")
+    
+    def save_metrics(self):
+        """Write the current metrics to a JSON file chosen by the admin"""
+        from tkinter import filedialog
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile="metrics.json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        self.worker.submit(
+            self.voting_system.dump_metrics, file_path,
+            on_success=self.on_data_exported,
+            disable=(self.save_metrics_btn,),
+            key='save_metrics'
+        )
     
     def add_candidate(self):
         """Add a new candidate"""
@@ -385,7 +682,17 @@ System Information:
             messagebox.showerror("Error", "Admin access required. Please login as admin first.")
             return
         
-        success, message = self.voting_system.add_candidate(name, party, description)
+        election_id = self.election_id
+        self.worker.submit(
+            lambda: self.voting_system.add_candidate(name, party, description, election_id=election_id),
+            on_success=self.on_candidate_added,
+            disable=(self.add_candidate_btn,),
+            key='add_candidate'
+        )
+    
+    def on_candidate_added(self, result):
+        """Show the outcome of adding a candidate"""
+        success, message = result
         
         if success:
             messagebox.showinfo("Success", message)
@@ -415,13 +722,22 @@ System Information:
         )
         
         if confirm:
-            success, message = self.voting_system.remove_candidate(candidate_id)
-            if success:
-                messagebox.showinfo("Success", message)
-                self.refresh_candidates_list()
-                self.refresh_statistics()
-            else:
-                messagebox.showerror("Error", message)
+            self.worker.submit(
+                self.voting_system.remove_candidate, candidate_id,
+                on_success=self.on_candidate_removed,
+                disable=(self.remove_candidate_btn,),
+                key='remove_candidate'
+            )
+    
+    def on_candidate_removed(self, result):
+        """Show the outcome of removing a candidate"""
+        success, message = result
+        if success:
+            messagebox.showinfo("Success", message)
+            self.refresh_candidates_list()
+            self.refresh_statistics()
+        else:
+            messagebox.showerror("Error", message)
     
     def register_voter(self):
         """Register a new voter"""
@@ -438,7 +754,67 @@ System Information:
             messagebox.showerror("Error", "Admin access required. Please login as admin first.")
             return
         
-        success, message = self.voting_system.register_voter(voter_id, name, password)
+        self.worker.submit(
+            self.voting_system.register_voter, voter_id, name, password,
+            on_success=self.on_voter_registered,
+            disable=(self.register_voter_btn,),
+            key='register_voter'
+        )
+    
+    def add_to_roll(self):
+        """Put voters on the selected election's roll, by ID or all at once"""
+        if self.election_id == DEFAULT_ELECTION_ID:
+            messagebox.showinfo("Election Roll", "The General Election's roll is every registered voter.")
+            return
+        
+        text = simpledialog.askstring(
+            "Election Roll",
+            "Voter IDs to add, separated by commas or spaces (* for every registered voter):",
+            parent=self.root
+        )
+        if not text or not text.strip():
+            return
+        voter_ids = None if text.strip() == '*' else text.replace(',', ' ').split()
+        
+        self.worker.submit(
+            self.voting_system.add_election_voters, self.election_id, voter_ids,
+            on_success=self.on_roll_changed,
+            disable=(self.add_to_roll_btn,),
+            key='roll'
+        )
+    
+    def remove_from_roll(self):
+        """Take the voters selected in the list off the selected election's roll"""
+        if self.election_id == DEFAULT_ELECTION_ID:
+            messagebox.showinfo("Election Roll", "The General Election's roll is every registered voter.")
+            return
+        
+        voter_ids = list(self.voters_tree.selection())
+        if not voter_ids:
+            messagebox.showwarning("Warning", "Please select voters to remove from the roll")
+            return
+        
+        self.worker.submit(
+            self.voting_system.remove_election_voters, self.election_id, voter_ids,
+            on_success=self.on_roll_changed,
+            disable=(self.remove_from_roll_btn,),
+            key='roll'
+        )
+    
+    def on_roll_changed(self, result):
+        """Show the outcome of a roll change and reload the roll"""
+        success, message = result
+        
+        if success:
+            messagebox.showinfo("Success", message)
+            self.reload_voters()
+            self.refresh_statistics()
+        else:
+            messagebox.showerror("Error", message)
+    
+    def on_voter_registered(self, result):
+        """Show the outcome of registering a voter"""
+        success, message = result
         
         if success:
             messagebox.showinfo("Success", message)
@@ -450,58 +826,297 @@ System Information:
         else:
             messagebox.showerror("Error", message)
     
-    def refresh_candidates_list(self):
+    def refresh_elections(self):
+        """Reload the elections offered in the header"""
+        return self.worker.submit(
+            self.voting_system.get_elections,
+            on_success=self.show_elections,
+            key='elections',
+            show_busy=False
+        )
+    
+    def show_elections(self, elections):
+        """Offer the loaded elections in the header, keeping the one shown"""
+        self.elections = {name: election_id for election_id, name, _, _ in elections}
+        self.election_box.config(values=list(self.elections))
+        for election_id, name, _, _ in elections:
+            if election_id == self.election_id:
+                self.election_var.set(name)
+    
+    def select_election(self):
+        """Show the election picked in the header"""
+        election_id = self.elections.get(self.election_var.get(), DEFAULT_ELECTION_ID)
+        if election_id != self.election_id:
+            self.show_election(election_id)
+    
+    def show_election(self, election_id):
+        """Reload every tab for another election"""
+        self.election_id = election_id
+        self.activity_votes = []
+        self.refresh_candidates_list()
+        self.reload_voters()
+        self.refresh_results()
+        self.refresh_recent_activity()
+        self.refresh_timeline()
+        self.refresh_runoff()
+        self.refresh_statistics()
+        # A refresh still running for the old election may land after these, so reload on the next probe too
+        self.change_token = None
+    
+    def new_election(self):
+        """Create an election, optionally putting every registered voter on its roll"""
+        if not self.voting_system.is_admin:
+            messagebox.showerror("Error", "Admin access required. Please login as admin first.")
+            return
+        
+        name = simpledialog.askstring("New Election", "Election name:", parent=self.root)
+        if not name or not name.strip():
+            return
+        description = simpledialog.askstring("New Election", "Description (optional):", parent=self.root) or ""
+        enroll_all = messagebox.askyesno("New Election", "Put every registered voter on this election's roll?")
+        
+        def create():
+            success, message, election_id = self.voting_system.create_election(name.strip(), description.strip())
+            if success and enroll_all:
+                _, enroll_message = self.voting_system.add_election_voters(election_id)
+                message = f"{message}\n{enroll_message}"
+            return success, message, election_id
+        
+        self.worker.submit(create, on_success=self.on_election_created, key='new_election')
+    
+    def on_election_created(self, result):
+        """Show the outcome of creating an election and switch to it"""
+        success, message, election_id = result
+        
+        if success:
+            messagebox.showinfo("Success", message)
+            self.refresh_elections()
+            self.show_election(election_id)
+        else:
+            messagebox.showerror("Error", message)
+    
+    def refresh_candidates_list(self, show_busy=True):
         """Refresh the candidates list"""
-        # Clear existing items
-        for item in self.candidates_tree.get_children():
-            self.candidates_tree.delete(item)
+        return self.worker.submit(
+            self.voting_system.get_candidates, self.election_id,
+            on_success=self.show_candidates,
+            key='candidates',
+            show_busy=show_busy
+        )
+    
+    def show_candidates(self, candidates):
+        """Update the candidates list with the rows that changed"""
+        self.candidates_sync.sync((candidate[0], candidate) for candidate in candidates)
+    
+    def voter_page_query(self):
+        """Current filter and sort as get_voters_page keyword arguments"""
+        heading, descending = self.voter_sort
+        return {
+            'filter': self.VOTER_FILTERS[self.voter_filter_var.get()],
+            'sort_by': self.VOTER_SORT_COLUMNS[heading],
+            'descending': descending,
+            'election_id': self.election_id,
+        }
+    
+    def reload_voters(self):
+        """Start the voters list again from the first page, e.g. after the filter or sort changed"""
+        # Pages still in flight for the previous filter or sort are ignored when they arrive
+        self.voters_generation += 1
+        self.voter_rows = []
+        self.voters_exhausted = False
+        self.voters_sync.clear()
+        self.voters_tree.yview_moveto(0)
+        self.load_more_voters()
+    
+    def load_more_voters(self):
+        """Fetch the page after the last loaded voter"""
+        if self.voters_exhausted:
+            return
         
-        # Add current candidates
-        candidates = self.voting_system.get_candidates()
-        for candidate in candidates:
-            self.candidates_tree.insert('', 'end', values=candidate)
+        query = self.voter_page_query()
+        if self.voter_rows:
+            last = self.voter_rows[-1]
+            query['after_id'] = last[0]
+            query['after_value'] = last[self.VOTER_ROW_FIELDS.index(query['sort_by'])]
+        generation = self.voters_generation
+        
+        self.worker.submit(
+            lambda: self.voting_system.get_voters_page(limit=self.VOTERS_PAGE_SIZE, **query),
+            on_success=lambda page: self.add_voters_page(page, generation),
+            key=('voters_page', generation)
+        )
+    
+    def add_voters_page(self, page, generation):
+        """Append a fetched page to the voters list"""
+        if generation != self.voters_generation:
+            return
+        
+        page = page or []
+        self.voters_exhausted = len(page) < self.VOTERS_PAGE_SIZE
+        self.voter_rows.extend(page)
+        self.show_voters()
+    
+    def on_voters_scroll(self, first, last):
+        """Move the scrollbar, loading the next page once the end of the list is in view"""
+        self.voters_scrollbar.set(first, last)
+        if float(last) >= 0.9 and self.voter_rows:
+            self.load_more_voters()
+    
+    def sort_voters(self, heading):
+        """Sort the voters list by a column, toggling direction on repeated clicks"""
+        current, descending = self.voter_sort
+        self.voter_sort = (heading, not descending if heading == current else False)
+        
+        for col in self.VOTER_SORT_COLUMNS:
+            arrow = ""
+            if col == heading:
+                arrow = " ▼" if self.voter_sort[1] else " ▲"
+            self.voters_tree.heading(col, text=col + arrow)
+        self.reload_voters()
     
     def refresh_voters_list(self):
-        """Refresh the voters list"""
-        # Clear existing items
-        for item in self.voters_tree.get_children():
-            self.voters_tree.delete(item)
-        
-        # Add current voters
-        voters = self.voting_system.get_all_voters()
-        for voter in voters:
+        """Refresh the voters list, re-reading as many rows as are already loaded"""
+        generation = self.voters_generation
+        limit = max(len(self.voter_rows), self.VOTERS_PAGE_SIZE)
+        query = self.voter_page_query()
+        
+        def replace_rows(rows):
+            if generation != self.voters_generation:
+                return
+            rows = rows or []
+            self.voters_exhausted = len(rows) < limit
+            self.voter_rows = rows
+            self.show_voters()
+        
+        return self.worker.submit(
+            lambda: self.voting_system.get_voters_page(limit=limit, **query),
+            on_success=replace_rows,
+            key=('voters_page', generation)
+        )
+    
+    def show_voters(self):
+        """Update the voters list with the rows that changed"""
+        rows = []
+        for voter in self.voter_rows:
             voter_id, name, has_voted, reg_date = voter
             status = "Yes" if has_voted else "No"
-            self.voters_tree.insert('', 'end', values=(voter_id, name, status, reg_date))
-    
-    def refresh_results(self):
-        """Refresh the results display"""
-        # Clear existing items
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+            rows.append((voter_id, (voter_id, name, status, reg_date)))
+        self.voters_sync.sync(rows)
         
-        # Add current results
-        results = self.voting_system.get_voting_results()
-        total_votes = self.voting_system.get_statistics()['total_votes']
+        more = "" if self.voters_exhausted else " (scroll for more)"
+        self.voters_loaded_label.config(text=f"{len(self.voter_rows):,} voters loaded{more}")
+    
+    def refresh_results(self, show_busy=True):
+        """
+        Refresh the results display
+        show_busy: False for automatic refreshes, which leave the busy indicator and button alone
+        """
+        election_id = self.election_id
+        
+        def load():
+            results = self.voting_system.get_voting_results(election_id=election_id)
+            return results, self.voting_system.get_statistics(election_id)['total_votes']
+        
+        return self.worker.submit(
+            load,
+            on_success=self.show_results,
+            disable=(self.refresh_results_btn,) if show_busy else (),
+            key='results',
+            show_busy=show_busy
+        )
+    
+    def show_results(self, loaded):
+        """Update the results display with the rows that changed"""
+        results, total_votes = loaded
         
-        for rank, (candidate_id, name, party, vote_count) in enumerate(results, 1):
+        rows = []
+        for rank, (candidate_id, name, party, vote_count) in enumerate(results or [], 1):
             percentage = (vote_count / max(total_votes, 1)) * 100
             party_display = party if party else "Independent"
-            self.results_tree.insert('', 'end', values=(rank, name, party_display, vote_count, f"{percentage:.1f}%"))
+            rows.append((candidate_id, (rank, name, party_display, vote_count, f"{percentage:.1f}%")))
+        self.results_sync.sync(rows)
     
-    def refresh_recent_activity(self):
-        """Refresh the recent activity display"""
-        if not hasattr(self, 'activity_tree'):
+    def refresh_runoff(self, show_busy=True):
+        """Recount the instant runoff on the background worker"""
+        if not hasattr(self, 'runoff_tree'):
+            return False
+        
+        election_id = self.election_id
+        return self.worker.submit(
+            lambda: self.voting_system.get_runoff_results(election_id=election_id),
+            on_success=self.show_runoff,
+            disable=(self.recount_runoff_btn,) if show_busy else (),
+            key='runoff',
+            show_busy=show_busy
+        )
+    
+    def show_runoff(self, result):
+        """Show each round's counts, who was eliminated and where their ballots went"""
+        if not result:
             return
-            
-        # Clear existing items
-        for item in self.activity_tree.get_children():
-            self.activity_tree.delete(item)
-        
-        # Add recent votes
-        recent_votes = self.voting_system.get_recent_votes(10)
-        if recent_votes:
-            for timestamp, candidate_name, party in recent_votes:
+        
+        names = result['names']
+        rows = []
+        for runoff_round in result['rounds']:
+            number = runoff_round['round']
+            eliminated = runoff_round['eliminated']
+            transfers = ", ".join(
+                f"{'exhausted' if candidate_id is None else names.get(candidate_id, candidate_id)} +{votes:,}"
+                for candidate_id, votes in runoff_round['transfers'].items()
+            )
+            ranked = sorted(runoff_round['counts'].items(), key=lambda item: -item[1])
+            for candidate_id, votes in ranked:
+                share = votes / max(runoff_round['continuing'], 1) * 100
+                if candidate_id == eliminated:
+                    outcome = f"Eliminated → {transfers}" if transfers else "Eliminated"
+                elif candidate_id == result['winner'] and eliminated is None:
+                    outcome = "Winner"
+                else:
+                    outcome = ""
+                values = (number, names.get(candidate_id, candidate_id), f"{votes:,}", f"{share:.1f}%", outcome)
+                rows.append(((number, candidate_id), values))
+        self.runoff_sync.sync(rows)
+        
+        if result['winner'] is not None:
+            summary = (f"Winner: {names.get(result['winner'], result['winner'])} after "
+                       f"{len(result['rounds'])} round(s)")
+        else:
+            summary = "No ballots counted yet"
+        self.runoff_label.config(text=f"{summary}  |  {result['ballots']:,} ballots, {result['exhausted']:,} exhausted")
+    
+    def refresh_recent_activity(self, full=True):
+        """
+        Refresh the recent activity display
+        full: False to fetch only votes newer than the newest one already shown
+        """
+        if not hasattr(self, 'activity_tree'):
+            return False
+        
+        after_vote_id = None
+        if not full and self.activity_votes:
+            after_vote_id = max(vote[0] for vote in self.activity_votes)
+        
+        election_id = self.election_id
+        return self.worker.submit(
+            lambda: self.voting_system.get_recent_votes(self.ACTIVITY_ROWS, include_ids=True, after_vote_id=after_vote_id,
+                                                        election_id=election_id),
+            on_success=lambda votes: self.show_recent_activity(votes, merge=after_vote_id is not None),
+            key='activity',
+            show_busy=False
+        )
+    
+    def show_recent_activity(self, recent_votes, merge=False):
+        """
+        Update the recent activity display with the votes that changed
+        merge: recent_votes are only the new votes, to be added above those already shown
+        """
+        if merge:
+            recent_votes = (recent_votes or []) + self.activity_votes
+        self.activity_votes = list(recent_votes or [])[:self.ACTIVITY_ROWS]
+        
+        rows = []
+        if self.activity_votes:
+            for vote_id, timestamp, candidate_name, party in self.activity_votes:
                 party_display = party if party else "Independent"
                 # Format timestamp
                 if timestamp:
@@ -517,50 +1132,179 @@ System Information:
                 else:
                     formatted_time = "Unknown"
                 
-                self.activity_tree.insert('', 'end', values=(formatted_time, candidate_name, party_display))
+                rows.append((vote_id, (formatted_time, candidate_name, party_display)))
+        
+        self.activity_sync.sync(rows)
+    
+    def refresh_timeline(self, show_busy=True):
+        """Reload the vote-rate chart at the selected bucket width"""
+        if not hasattr(self, 'timeline_canvas'):
+            return False
+        
+        bucket_minutes = self.TIMELINE_WIDTHS[self.timeline_width_var.get()]
+        election_id = self.election_id
+        
+        def load():
+            timeline = self.voting_system.get_vote_timeline(bucket_minutes, self.TIMELINE_BUCKETS, per_candidate=True,
+                                                            election_id=election_id)
+            total_voters = self.voting_system.get_statistics(election_id)['total_voters']
+            return timeline, total_voters, self.voting_system.get_candidates(election_id)
+        
+        return self.worker.submit(load, on_success=self.show_timeline, key='timeline', show_busy=show_busy)
+    
+    def show_timeline(self, loaded):
+        """Keep the loaded timeline for redraws and draw it"""
+        self.timeline = loaded
+        self.draw_timeline()
+    
+    def draw_timeline(self):
+        """Draw votes per bucket as bars (stacked by candidate) and cumulative turnout as a line"""
+        canvas = self.timeline_canvas
+        canvas.delete('all')
+        if not self.timeline:
+            return
+        
+        timeline, total_voters, candidates = self.timeline
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        if not timeline:
+            canvas.create_text(width / 2, height / 2, text="No votes yet", fill='#7f8c8d')
+            self.timeline_label.config(text="")
+            return
+        
+        left, right, top, bottom = 45, width - 45, 25, height - 20
+        if right <= left or bottom <= top:
+            return
+        
+        peak = max(row[1] for row in timeline) or 1
+        slot = (right - left) / len(timeline)
+        bar_width = max(slot * 0.8, 1)
+        colors = {candidate[0]: self.CHART_COLORS[index % len(self.CHART_COLORS)]
+                  for index, candidate in enumerate(candidates)}
+        by_candidate = self.timeline_by_candidate_var.get()
+        
+        for index, (bucket_start, votes, cumulative, counts) in enumerate(timeline):
+            x = left + index * slot + (slot - bar_width) / 2
+            y = bottom
+            segments = sorted(counts.items()) if by_candidate else [(None, votes)]
+            for candidate_id, count in segments:
+                bar_height = count / peak * (bottom - top)
+                canvas.create_rectangle(x, y - bar_height, x + bar_width, y,
+                                        fill=colors.get(candidate_id, '#95a5a6'), width=0)
+                y -= bar_height
+        
+        # Cumulative turnout against the right-hand axis; each voter casts at most one vote
+        if total_voters:
+            points = []
+            for index, row in enumerate(timeline):
+                points.extend((left + (index + 0.5) * slot, bottom - min(row[2] / total_voters, 1) * (bottom - top)))
+            if len(points) > 2:
+                canvas.create_line(*points, fill='#2c3e50', width=2)
+            canvas.create_text(right + 5, top, text="100%", anchor='nw', fill='#2c3e50', font=('Arial', 8))
+        
+        canvas.create_line(left, bottom, right, bottom, fill='#7f8c8d')
+        canvas.create_text(left - 5, top, text=str(peak), anchor='ne', fill='#7f8c8d', font=('Arial', 8))
+        canvas.create_text(left - 5, bottom, text="0", anchor='e', fill='#7f8c8d', font=('Arial', 8))
+        canvas.create_text(left, bottom + 3, text=timeline[0][0][11:16], anchor='nw', font=('Arial', 8))
+        canvas.create_text(right, bottom + 3, text=timeline[-1][0][11:16], anchor='ne', font=('Arial', 8))
+        
+        if by_candidate:
+            x = left
+            for candidate in candidates:
+                item = canvas.create_text(x, 5, text=f"■ {candidate[1]}", anchor='nw',
+                                          fill=colors[candidate[0]], font=('Arial', 8))
+                x = canvas.bbox(item)[2] + 10
+        
+        turnout = timeline[-1][2] / max(total_voters, 1) * 100
+        self.timeline_label.config(
+            text=f"Latest: {timeline[-1][1]} vote(s)  |  Turnout: {turnout:.1f}%  |  Times in UTC"
+        )
     
     def start_auto_refresh(self):
         """Start auto-refresh of results"""
-        self.auto_refresh_job = None
+        self.stop_auto_refresh()
         self.schedule_auto_refresh()
     
+    def stop_auto_refresh(self):
+        """Cancel any pending auto-refresh"""
+        if self.auto_refresh_job:
+            self.root.after_cancel(self.auto_refresh_job)
+            self.auto_refresh_job = None
+    
     def schedule_auto_refresh(self):
-        """Schedule the next auto-refresh"""
+        """Probe for changes now and schedule the next probe"""
         if hasattr(self, 'auto_refresh_var') and self.auto_refresh_var.get():
-            # Refresh data
-            self.refresh_results()
-            self.refresh_recent_activity()
-            
-            # Schedule next refresh in 5 seconds
-            self.auto_refresh_job = self.root.after(5000, self.schedule_auto_refresh)
+            # Only the change token is read here; the full queries run when it moves
+            self.worker.submit(
+                self.voting_system.get_change_token,
+                on_success=self.on_change_token,
+                key='change_probe',
+                show_busy=False
+            )
+            self.auto_refresh_job = self.root.after(self.refresh_interval, self.schedule_auto_refresh)
+    
+    def on_change_token(self, token):
+        """Refresh whatever the latest change token says is out of date"""
+        previous, self.change_token = self.change_token, token
+        if token is None or token == previous:
+            return
+        
+        last_vote_id, candidate_version, *roll = token
+        queued = []
+        if previous is None or candidate_version != previous[1]:
+            # The candidate set changed, so every view keyed or labelled by candidate is reloaded
+            queued.append(self.refresh_candidates_list(show_busy=False))
+            queued.append(self.refresh_results(show_busy=False))
+            queued.append(self.refresh_recent_activity())
+            queued.append(self.refresh_timeline(show_busy=False))
+        elif last_vote_id != previous[0]:
+            queued.append(self.refresh_results(show_busy=False))
+            queued.append(self.refresh_recent_activity(full=False))
+            queued.append(self.refresh_timeline(show_busy=False))
+        if previous is not None and roll != list(previous[2:]):
+            # Voters were registered, enrolled or removed, perhaps by an import running elsewhere
+            queued.append(self.refresh_voters_list())
+        queued.append(self.refresh_statistics(show_busy=False))
+        
+        if not all(queued):
+            # A refresh was already in flight and may have read older data, so retry on the next probe
+            self.change_token = previous
     
     def toggle_auto_refresh(self):
         """Toggle auto-refresh on/off"""
         if self.auto_refresh_var.get():
-            self.schedule_auto_refresh()
+            self.start_auto_refresh()
         else:
-            if hasattr(self, 'auto_refresh_job') and self.auto_refresh_job:
-                self.root.after_cancel(self.auto_refresh_job)
-                self.auto_refresh_job = None
+            self.stop_auto_refresh()
     
-    def refresh_statistics(self):
+    def refresh_statistics(self, show_busy=True):
         """Refresh the statistics display"""
-        # Get updated statistics
-        stats = self.voting_system.get_statistics()
-        
-        # Update the statistics cards if they exist
-        if hasattr(self, 'current_frame'):
-            # Find and update statistics frame
-            for widget in self.current_frame.winfo_children():
-                if isinstance(widget, tk.LabelFrame) and "System Overview" in str(widget.cget('text')):
-                    # Recreate statistics section
-                    widget.destroy()
-                    self.create_statistics_section()
-                    break
+        return self.worker.submit(
+            self.voting_system.get_statistics, self.election_id,
+            on_success=self.show_statistics,
+            key='statistics',
+            show_busy=show_busy
+        )
+    
+    def show_statistics(self, stats):
+        """Update the statistics cards"""
+        self.stat_labels['total_voters'].config(text=str(stats['total_voters']))
+        self.stat_labels['total_candidates'].config(text=str(stats['total_candidates']))
+        self.stat_labels['total_votes'].config(text=str(stats['total_votes']))
+        self.stat_labels['voter_turnout'].config(text=f"{stats['voter_turnout']:.1f}%")
     
     def export_results(self):
         """Export results summary"""
-        summary = self.voting_system.export_results_summary()
+        election_id = self.election_id
+        self.worker.submit(
+            lambda: self.voting_system.export_results_summary(election_id=election_id),
+            on_success=self.show_summary,
+            disable=(self.export_btn,),
+            key='export'
+        )
+    
+    def show_summary(self, summary):
+        """Display an exported results summary"""
         if summary:
             # Create a new window to display the summary
             export_window = tk.Toplevel(self.root)
@@ -584,20 +1328,59 @@ System Information:
     
     def save_summary_to_file(self, summary):
         """Save summary to a text file"""
-        try:
-            from tkinter import filedialog
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".txt",
-                filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
-            )
-            if file_path:
-                with open(file_path, 'w') as f:
-                    f.write(summary)
-                messagebox.showinfo("Success", f"Summary saved to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+        from tkinter import filedialog
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        def write():
+            with open(file_path, 'w') as f:
+                f.write(summary)
+        
+        self.worker.submit(
+            write,
+            on_success=lambda _: messagebox.showinfo("Success", f"Summary saved to {file_path}"),
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+        )
+    
+    def export_data(self, kind):
+        """Stream the selected election's results, turnout roll or vote audit to a file chosen by the admin"""
+        from tkinter import filedialog
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            initialfile=f"{kind}.csv",
+            filetypes=[
+                ("CSV", "*.csv"),
+                ("CSV (gzip)", "*.csv.gz"),
+                ("JSON Lines", "*.jsonl"),
+                ("JSON Lines (gzip)", "*.jsonl.gz"),
+                ("All files", "*.*"),
+            ]
+        )
+        if not file_path:
+            return
+        
+        election_id = self.election_id
+        self.worker.submit(
+            lambda: self.voting_system.export_data(kind, file_path, election_id=election_id),
+            on_success=self.on_data_exported,
+            disable=(self.export_data_btn,),
+            key='export_data'
+        )
+    
+    def on_data_exported(self, result):
+        """Show the outcome of a data export"""
+        success, message = result
+        if success:
+            messagebox.showinfo("Export Complete", message)
+        else:
+            messagebox.showerror("Error", message)
     
     def logout(self):
         """Logout and return to login screen"""
+        self.stop_auto_refresh()
         self.voting_system.logout()
         self.parent_gui.setup_login_screen()
\ No newline at end of file
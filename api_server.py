@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# Code created by https://linktr.ee/saran709
+"""
+Local JSON API for thin-client kiosks
+An asyncio HTTP/1.1 server built only on the standard library. Kiosks on the
+LAN log in, fetch candidates and cast votes through it, so only this process
+opens the SQLite file. Blocking VotingSystem calls run on a thread pool, so one
+slow query or password hash never holds up other connections.
+
+Endpoints (JSON bodies; send "Authorization: Bearer <token>" after login):
+    GET  /api/health
+    GET  /api/elections
+    POST /api/login        {"user_type": "voter" | "admin", "user_id": ..., "password": ...,
+                            "election_id": ...}                  (election_id optional, voters)
+    POST /api/logout
+    GET  /api/candidates
+    POST /api/vote         {"candidate_id": ...} or {"rankings": [...]}  (voter)
+    GET  /api/results                                             (admin)
+    GET  /api/runoff                                              (admin)
+    GET  /api/statistics                                          (admin)
+
+A voter's candidates and vote are for the election they logged in to. Admins
+pick one with ?election_id=N on the GET endpoints; without it the default
+election is used.
+
+Usage:
+    python api_server.py [--host 127.0.0.1] [--port 8080] [--db voting_database.db]
+    python api_server.py --host 0.0.0.0 --workers 16 --group-commit
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+from database_manager import DatabaseManager, DEFAULT_ELECTION_ID
+from voting_system import VotingSystem
+
+MAX_HEADERS = 100
+
+class ApiError(Exception):
+    """An error answered with the given HTTP status and message"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class ApiServer:
+    """
+    Serves VotingSystem over HTTP/JSON with keep-alive connections.
+    Each login gets a random session token; sessions expire after session_ttl
+    seconds without use.
+    """
+    
+    # (method, path) -> handler method name
+    ROUTES = {
+        ('GET', '/api/health'): 'handle_health',
+        ('GET', '/api/elections'): 'handle_elections',
+        ('POST', '/api/login'): 'handle_login',
+        ('POST', '/api/logout'): 'handle_logout',
+        ('GET', '/api/candidates'): 'handle_candidates',
+        ('POST', '/api/vote'): 'handle_vote',
+        ('GET', '/api/results'): 'handle_results',
+        ('GET', '/api/runoff'): 'handle_runoff',
+        ('GET', '/api/statistics'): 'handle_statistics',
+    }
+    
+    def __init__(self, voting_system, host="127.0.0.1", port=8080, max_workers=8,
+                 session_ttl=900, idle_timeout=30, max_body=65536):
+        """
+        max_workers: threads running blocking VotingSystem calls
+        session_ttl: seconds a session token stays valid without being used
+        idle_timeout: seconds an idle keep-alive connection is kept open
+        max_body: largest request body accepted, in bytes
+        """
+        self.voting_system = voting_system
+        self.host = host
+        self.port = port
+        self.session_ttl = session_ttl
+        self.idle_timeout = idle_timeout
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api-worker")
+        self.sessions = {}  # token -> (session, last used)
+        self.server = None
+        self._loop = None
+        self._thread = None
+        self._stopping = None
+        self.stats = {'connections': 0, 'requests': 0, 'errors': 0}
+    
+    # Server lifecycle
+    async def start(self):
+        """
+        Start listening
+        Returns: the bound port (useful with port=0)
+        """
+        self._loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+    
+    async def serve_forever(self):
+        """Start listening and serve until cancelled"""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+    
+    def run_in_thread(self):
+        """
+        Serve from a background thread with its own event loop, e.g. for tests
+        Returns: the bound port once the server is listening
+        """
+        ready = threading.Event()
+        failure = []
+        
+        def serve():
+            async def main():
+                self._stopping = asyncio.Event()
+                try:
+                    await self.start()
+                except Exception as e:
+                    failure.append(e)
+                    return
+                finally:
+                    ready.set()
+                await self._stopping.wait()
+                # Open keep-alive connections are cancelled when asyncio.run returns
+                self.server.close()
+            
+            asyncio.run(main())
+        
+        self._thread = threading.Thread(target=serve, name="api-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        return self.port
+    
+    def stop(self, timeout=5):
+        """Stop a server started with run_in_thread and shut down the worker threads"""
+        if self._thread is not None:
+            if self._stopping is not None:
+                self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join(timeout)
+            self._thread = None
+        self.executor.shutdown(wait=True)
+    
+    # HTTP handling
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until it closes or goes idle"""
+        self.stats['connections'] += 1
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                
+                try:
+                    method, path, query, version, headers, body = await self.read_request(request_line, reader)
+                except ApiError as e:
+                    await self.send(writer, e.status, {'ok': False, 'error': e.message}, keep_alive=False)
+                    break
+                
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                status, payload = await self.dispatch(method, path, headers, body, query)
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # Client went away mid-request, or sent a line longer than the stream limit
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+    
+    async def read_request(self, request_line, reader):
+        """
+        Parse the request line, headers and body
+        Returns: (method, path, query, version, headers, body)
+        """
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length < 0 or length > self.max_body:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        
+        body = await reader.readexactly(length) if length else b''
+        path, _, query = target.partition('?')
+        return method.upper(), path, query, version.upper(), headers, body
+    
+    async def send(self, writer, status, payload, keep_alive=True):
+        """Write one JSON response"""
+        status = HTTPStatus(status)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+    
+    async def dispatch(self, method, path, headers, body, query=""):
+        """
+        Route a request to its handler; query string parameters are added to the body's
+        Returns: (status, payload)
+        """
+        self.stats['requests'] += 1
+        handler = self.ROUTES.get((method, path))
+        try:
+            if handler is None:
+                if any(route_path == path for _, route_path in self.ROUTES):
+                    raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+                raise ApiError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+            
+            data = self.parse_body(body)
+            data.update(parse_qsl(query))
+            return await getattr(self, handler)(data, headers)
+        except ApiError as e:
+            self.stats['errors'] += 1
+            return e.status, {'ok': False, 'error': e.message}
+        except Exception as e:
+            self.stats['errors'] += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'ok': False, 'error': f"Internal error: {e}"}
+    
+    def parse_body(self, body):
+        """Decode a JSON object body; an empty body is an empty object"""
+        if not body:
+            return {}
+        try:
+            data = json.loads(body.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        return data
+    
+    async def run(self, function, *args):
+        """Run a blocking VotingSystem call on the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, lambda: function(*args))
+    
+    # Sessions
+    def get_session(self, headers, required=True):
+        """Look up the session named by the Authorization header"""
+        scheme, _, token = headers.get('authorization', '').partition(' ')
+        token = token.strip()
+        session, last_used = self.sessions.get(token, (None, 0)) if scheme.lower() == 'bearer' else (None, 0)
+        now = time.monotonic()
+        if session is not None and (now - last_used > self.session_ttl or not session.active):
+            del self.sessions[token]
+            session.close()
+            session = None
+        
+        if session is None:
+            if required:
+                raise ApiError(HTTPStatus.UNAUTHORIZED, "Please login first")
+            return None
+        self.sessions[token] = (session, now)
+        return session
+    
+    def require_admin(self, headers):
+        """Session for an admin-only endpoint"""
+        session = self.get_session(headers)
+        if not session.is_admin:
+            raise ApiError(HTTPStatus.FORBIDDEN, "Admin access required")
+        return session
+    
+    def election_id(self, data, session=None):
+        """Election a request is for: a voter's login election, otherwise the election_id parameter"""
+        if session is not None and session.voter_id is not None:
+            return session.election_id
+        election_id = data.get('election_id', DEFAULT_ELECTION_ID)
+        if isinstance(election_id, str) and election_id.isdigit():
+            election_id = int(election_id)
+        if not is_integer(election_id):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "election_id must be an integer")
+        return election_id
+    
+    def expire_sessions(self):
+        """Forget sessions that have not been used within session_ttl"""
+        cutoff = time.monotonic() - self.session_ttl
+        for token, (session, last_used) in list(self.sessions.items()):
+            if last_used < cutoff:
+                del self.sessions[token]
+                session.close()
+    
+    # Endpoints
+    async def handle_health(self, data, headers):
+        """Liveness check"""
+        return HTTPStatus.OK, {'ok': True, 'sessions': len(self.sessions)}
+    
+    async def handle_elections(self, data, headers):
+        """List the elections kiosks can log voters in to"""
+        elections = await self.run(self.voting_system.get_elections)
+        return HTTPStatus.OK, {'ok': True, 'elections': [
+            {'election_id': election_id, 'name': name, 'description': description or ""}
+            for election_id, name, description, _ in elections
+        ]}
+    
+    async def handle_login(self, data, headers):
+        """Log a voter or admin in and hand out a session token"""
+        user_type = data.get('user_type', 'voter')
+        user_id = str(data.get('user_id') or '').strip()
+        password = str(data.get('password') or '')
+        if user_type not in ('voter', 'admin'):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "user_type must be 'voter' or 'admin'")
+        if not user_id or not password:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "user_id and password are required")
+        
+        if user_type == 'admin':
+            success, message, session = await self.run(self.voting_system.login_admin_session, user_id, password)
+        else:
+            election_id = self.election_id(data)
+            success, message, session = await self.run(
+                self.voting_system.login_voter_session, user_id, password, election_id
+            )
+        if not success:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, message)
+        
+        self.expire_sessions()
+        self.sessions[session.session_id] = (session, time.monotonic())
+        return HTTPStatus.OK, {'ok': True, 'token': session.session_id, 'name': session.name, 'message': message}
+    
+    async def handle_logout(self, data, headers):
+        """End the caller's session"""
+        session = self.get_session(headers)
+        self.sessions.pop(session.session_id, None)
+        self.voting_system.logout(session)
+        return HTTPStatus.OK, {'ok': True}
+    
+    async def handle_candidates(self, data, headers):
+        """List the candidates on the ballot of the voter's election, or of ?election_id="""
+        election_id = self.election_id(data, self.get_session(headers, required=False))
+        candidates = await self.run(self.voting_system.get_candidates, election_id)
+        return HTTPStatus.OK, {'ok': True, 'candidates': [
+            {'candidate_id': candidate_id, 'name': name, 'party': party or "", 'description': description or ""}
+            for candidate_id, name, party, description in candidates
+        ]}
+    
+    async def handle_vote(self, data, headers):
+        """Cast the logged-in voter's ballot"""
+        session = self.get_session(headers)
+        if session.voter_id is None:
+            raise ApiError(HTTPStatus.FORBIDDEN, "Only voters can cast votes")
+        if 'rankings' in data:
+            rankings = data['rankings']
+            if not isinstance(rankings, list) or not all(is_integer(c) for c in rankings):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "rankings must be a list of candidate ids")
+            success, message = await self.run(self.voting_system.cast_ranked_vote, rankings, session)
+        else:
+            candidate_id = data.get('candidate_id')
+            if not is_integer(candidate_id):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "candidate_id must be an integer")
+            success, message = await self.run(self.voting_system.cast_vote, candidate_id, session)
+        if not success:
+            raise ApiError(HTTPStatus.CONFLICT, message)
+        return HTTPStatus.OK, {'ok': True, 'message': message}
+    
+    async def handle_results(self, data, headers):
+        """Ranked results (admin only)"""
+        session = self.require_admin(headers)
+        results = await self.run(self.voting_system.get_voting_results, session, self.election_id(data))
+        total_votes = sum(row[3] for row in results)
+        return HTTPStatus.OK, {'ok': True, 'total_votes': total_votes, 'results': [
+            {
+                'rank': rank,
+                'candidate_id': candidate_id,
+                'name': name,
+                'party': party or "",
+                'votes': votes,
+                'percentage': round(votes / max(total_votes, 1) * 100, 2),
+            }
+            for rank, (candidate_id, name, party, votes) in enumerate(results, 1)
+        ]}
+    
+    async def handle_runoff(self, data, headers):
+        """Instant-runoff count, round by round (admin only)"""
+        session = self.require_admin(headers)
+        result = await self.run(self.voting_system.get_runoff_results, session, self.election_id(data))
+        names = result['names']
+        return HTTPStatus.OK, {
+            'ok': True,
+            'winner': result['winner'],
+            'winner_name': names.get(result['winner']),
+            'ballots': result['ballots'],
+            'exhausted': result['exhausted'],
+            'rounds': [
+                {
+                    'round': runoff_round['round'],
+                    'continuing': runoff_round['continuing'],
+                    'exhausted': runoff_round['exhausted'],
+                    'eliminated': runoff_round['eliminated'],
+                    'counts': [
+                        {'candidate_id': candidate_id, 'name': names.get(candidate_id), 'votes': votes}
+                        for candidate_id, votes in sorted(runoff_round['counts'].items(), key=lambda item: -item[1])
+                    ],
+                    'transfers': [
+                        {'candidate_id': candidate_id, 'votes': votes}
+                        for candidate_id, votes in runoff_round['transfers'].items()
+                    ],
+                }
+                for runoff_round in result['rounds']
+            ],
+        }
+    
+    async def handle_statistics(self, data, headers):
+        """Turnout and totals (admin only)"""
+        self.require_admin(headers)
+        stats = await self.run(self.voting_system.get_statistics, self.election_id(data))
+        return HTTPStatus.OK, dict(stats, ok=True)
+
+def is_integer(value):
+    """Whether a decoded JSON value is an integer (JSON true/false decode as bool, a subclass of int)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Serve the voting system as a local JSON API")
+    parser.add_argument('--host', default="127.0.0.1", help="address to listen on (0.0.0.0 for the whole LAN)")
+    parser.add_argument('--port', type=int, default=8080, help="port to listen on")
+    parser.add_argument('--db', default="voting_database.db", help="path to the voting database")
+    parser.add_argument('--workers', type=int, default=8, help="threads running database calls")
+    parser.add_argument('--group-commit', action='store_true', help="commit concurrent votes in batches")
+    parser.add_argument('--session-ttl', type=int, default=900, help="seconds an unused session stays valid")
+    args = parser.parse_args(argv)
+    
+    db = DatabaseManager(args.db, pool_size=args.workers)
+    voting_system = VotingSystem(db, group_commit=args.group_commit)
+    server = ApiServer(voting_system, args.host, args.port, max_workers=args.workers, session_ttl=args.session_ttl)
+    
+    async def serve():
+        port = await server.start()
+        print(f"✓ Voting API listening on http://{args.host}:{port}/api/ (Ctrl+C to stop)")
+        await server.serve_forever()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+    except OSError as e:
+        print(f"❌ Could not start server: {e}")
+        return False
+    finally:
+        server.executor.shutdown(wait=True)
+        if voting_system.vote_writer is not None:
+            voting_system.vote_writer.stop()
+        db.close()
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
\ No newline at end of file
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# Code created by https://linktr.ee/saran709
+"""
+Benchmark suite for the Offline Voting System
+Generates databases with a synthetic voter roll at several sizes and measures
+the latency of the core operations against each of them.
+
+For every operation the suite records p50/p99/mean latency and the peak
+Python memory allocated while it ran, and writes the results as JSON so that
+two runs can be compared. Memory is traced in a separate short pass after the
+timed calls, since tracemalloc slows every allocation it records. Login throughput is also measured separately for
+each password KDF work factor.
+
+Usage:
+    python benchmark.py --sizes 10000 100000 1000000 --output bench.json
+    python benchmark.py --sizes 10000 --compare baseline.json
+    python benchmark.py --sizes --kdf-costs 100000 200000 600000 --login-threads 8
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from database_manager import DatabaseManager
+from voting_system import VotingSystem
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+CANDIDATE_COUNT = 5
+VOTED_FRACTION = 0.5
+VOTER_PASSWORD = "bench-password"
+# Generated rolls use a cheap KDF so the size runs measure the database, not hashing
+GENERATION_KDF_ITERATIONS = 1000
+DEFAULT_KDF_COSTS = (10000, 100000, 200000, 600000)
+# Calls per operation made under tracemalloc, after and apart from the timed ones
+MEMORY_ITERATIONS = 10
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(latencies, peak_bytes):
+    """Reduce raw latencies (seconds) to the reported figures"""
+    return {
+        'count': len(latencies),
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': sum(latencies) / max(len(latencies), 1) * 1000,
+        'peak_memory_kb': peak_bytes / 1024,
+    }
+
+def measure(operation, iterations, memory_iterations=MEMORY_ITERATIONS):
+    """
+    Call operation(i) for each iteration, timing every call, then call it for
+    the next memory_iterations indexes with tracemalloc on to find peak memory
+    Returns: summary dict for the operation
+    """
+    latencies = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - started)
+    
+    tracemalloc.start()
+    try:
+        for i in range(iterations, iterations + memory_iterations):
+            operation(i)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return summarize(latencies, peak)
+
+def voter_id_for(index):
+    """Synthetic voter ID for a roll position"""
+    return f"bench{index:08d}"
+
+def generate_database(path, voters, voted_fraction=VOTED_FRACTION, quiet=False,
+                      kdf_iterations=GENERATION_KDF_ITERATIONS):
+    """
+    Create a database with candidates, a synthetic roll and some votes already cast
+    kdf_iterations: password hashing cost of the generated roll
+    Returns: seconds spent generating
+    """
+    started = time.perf_counter()
+    db = DatabaseManager(path, kdf_iterations=kdf_iterations)
+    try:
+        for i in range(CANDIDATE_COUNT):
+            db.add_candidate(f"Benchmark Candidate {i + 1}", f"Party {i + 1}", "Synthetic candidate")
+        candidate_ids = [c[0] for c in db.get_all_candidates()]
+        
+        roll = ((voter_id_for(i), f"Benchmark Voter {i}", VOTER_PASSWORD) for i in range(voters))
+        db.register_voters_bulk(roll, chunk_size=5000)
+        
+        voted = int(voters * voted_fraction)
+        batch = []
+        for i in range(voted):
+            batch.append((voter_id_for(i), candidate_ids[i % len(candidate_ids)]))
+            if len(batch) == 5000:
+                db.record_votes_batch(batch)
+                batch = []
+        if batch:
+            db.record_votes_batch(batch)
+    finally:
+        db.close()
+    
+    elapsed = time.perf_counter() - started
+    if not quiet:
+        print(f"  generated {voters:,} voters ({voted:,} voted) in {elapsed:.1f}s")
+    return elapsed
+
+def benchmark_size(workdir, voters, iterations, quiet=False):
+    """Generate one database size and time every operation against it"""
+    path = os.path.join(workdir, f"bench_{voters}.db")
+    setup_seconds = generate_database(path, voters, quiet=quiet)
+    
+    db = DatabaseManager(path, kdf_iterations=GENERATION_KDF_ITERATIONS)
+    voting_system = VotingSystem(db)
+    try:
+        rng = random.Random(voters)
+        candidate_ids = [c[0] for c in db.get_all_candidates()]
+        first_unvoted = int(voters * VOTED_FRACTION)
+        memory_iterations = min(MEMORY_ITERATIONS, (voters - first_unvoted) // 2)
+        iterations = min(iterations, voters - first_unvoted - memory_iterations)
+        
+        # Log in voters who have not voted yet up front so cast_vote is timed on its own;
+        # the memory pass uses the voters after the timed ones, so it also casts real votes
+        sessions = []
+        for i in range(iterations + memory_iterations):
+            success, message, session = voting_system.login_voter_session(voter_id_for(first_unvoted + i), VOTER_PASSWORD)
+            sessions.append(session)
+        
+        operations = {
+            'register_voter': lambda i: db.register_voter(f"new{voters}_{i:08d}", "New Voter", VOTER_PASSWORD),
+            'authenticate_voter': lambda i: db.authenticate_voter(voter_id_for(rng.randrange(voters)), VOTER_PASSWORD),
+            'cast_vote': lambda i: voting_system.cast_vote(candidate_ids[i % len(candidate_ids)], session=sessions[i]),
+            'get_voting_results': lambda i: db.get_voting_results(),
+            'get_statistics': lambda i: db.get_statistics(),
+            'get_recent_votes': lambda i: db.get_recent_votes(10),
+        }
+        
+        results = {}
+        for name, operation in operations.items():
+            results[name] = measure(operation, iterations, memory_iterations)
+            if not quiet:
+                summary = results[name]
+                print(f"  {name:<20} p50 {summary['p50_ms']:8.3f} ms   p99 {summary['p99_ms']:8.3f} ms   "
+                      f"peak {summary['peak_memory_kb']:10.1f} KiB")
+    finally:
+        db.close()
+    
+    return {
+        'voters': voters,
+        'iterations': iterations,
+        'memory_iterations': memory_iterations,
+        'setup_seconds': setup_seconds,
+        'database_bytes': os.path.getsize(path),
+        'operations': results,
+    }
+
+def benchmark_login_throughput(workdir, iterations, logins, threads, hash_workers, quiet=False):
+    """
+    Time concurrent voter logins against a roll hashed at one KDF work factor
+    Returns: summary dict with logins_per_second and latency percentiles
+    """
+    path = os.path.join(workdir, f"bench_kdf_{iterations}.db")
+    db = DatabaseManager(path, kdf_iterations=iterations, hash_workers=hash_workers)
+    try:
+        voters = max(threads, 16)
+        db.register_voters_bulk((voter_id_for(i), f"Benchmark Voter {i}", VOTER_PASSWORD) for i in range(voters))
+        
+        latencies = []
+        lock = threading.Lock()
+        counter = iter(range(logins))
+        
+        def worker():
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                started = time.perf_counter()
+                db.authenticate_voter(voter_id_for(i % voters), VOTER_PASSWORD)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+        
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        wall = time.perf_counter() - started
+    finally:
+        db.close()
+    
+    summary = summarize(latencies, 0)
+    del summary['peak_memory_kb']
+    summary.update({
+        'kdf_iterations': iterations,
+        'threads': threads,
+        'hash_workers': hash_workers,
+        'logins_per_second': len(latencies) / wall if wall > 0 else 0.0,
+    })
+    if not quiet:
+        print(f"  {iterations:>8,} iterations   {summary['logins_per_second']:8.1f} logins/sec   "
+              f"p50 {summary['p50_ms']:8.3f} ms   p99 {summary['p99_ms']:8.3f} ms")
+    return summary
+
+def run_benchmarks(sizes, iterations, workdir=None, keep=False, quiet=False,
+                   kdf_costs=(), login_threads=4, hash_workers=4):
+    """Run the suite for every roll size and KDF cost and return the JSON-ready report"""
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="voting_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'runs': [],
+        'login_throughput': [],
+    }
+    try:
+        for voters in sizes:
+            if not quiet:
+                print(f"\nBenchmarking {voters:,} voters...")
+            report['runs'].append(benchmark_size(workdir, voters, iterations, quiet))
+        
+        if kdf_costs and not quiet:
+            print(f"\nLogin throughput ({login_threads} threads, {hash_workers} hash workers)...")
+        for cost in kdf_costs:
+            report['login_throughput'].append(
+                benchmark_login_throughput(workdir, cost, iterations, login_threads, hash_workers, quiet)
+            )
+    finally:
+        if own_workdir and not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    return report
+
+def compare_reports(baseline, current):
+    """
+    Compare two reports run by run
+    Returns: list of (voters, operation, metric, baseline, current, ratio)
+    """
+    rows = []
+    baseline_runs = {run['voters']: run for run in baseline.get('runs', [])}
+    for run in current.get('runs', []):
+        base_run = baseline_runs.get(run['voters'])
+        if base_run is None:
+            continue
+        for name, summary in run['operations'].items():
+            base_summary = base_run['operations'].get(name)
+            if base_summary is None:
+                continue
+            for metric in ('p50_ms', 'p99_ms', 'peak_memory_kb'):
+                before, after = base_summary[metric], summary[metric]
+                ratio = after / before if before else float('inf')
+                rows.append((run['voters'], name, metric, before, after, ratio))
+    return rows
+
+def print_comparison(rows):
+    """Print a comparison table, flagging regressions over 10%"""
+    print(f"\n{'Voters':>10} {'Operation':<20} {'Metric':<15} {'Baseline':>12} {'Current':>12} {'Ratio':>8}")
+    print("-" * 82)
+    for voters, name, metric, before, after, ratio in rows:
+        flag = " ⚠" if ratio > 1.1 else ""
+        print(f"{voters:>10,} {name:<20} {metric:<15} {before:>12.3f} {after:>12.3f} {ratio:>7.2f}x{flag}")
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark the Offline Voting System")
+    parser.add_argument('--sizes', type=int, nargs='*', default=list(DEFAULT_SIZES), help="voter roll sizes")
+    parser.add_argument('--iterations', type=int, default=200, help="timed calls per operation")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--compare', help="baseline JSON report to compare against")
+    parser.add_argument('--workdir', help="directory for generated databases")
+    parser.add_argument('--keep', action='store_true', help="keep generated databases")
+    parser.add_argument('--kdf-costs', type=int, nargs='*', default=list(DEFAULT_KDF_COSTS),
+                        help="PBKDF2 iteration counts to measure login throughput at")
+    parser.add_argument('--login-threads', type=int, default=4, help="concurrent logins for the KDF runs")
+    parser.add_argument('--hash-workers', type=int, default=4, help="password hashing pool size")
+    args = parser.parse_args(argv)
+    
+    report = run_benchmarks(args.sizes, args.iterations, args.workdir, args.keep,
+                            kdf_costs=args.kdf_costs, login_threads=args.login_threads,
+                            hash_workers=args.hash_workers)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print_comparison(compare_reports(baseline, report))
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
\ No newline at end of file
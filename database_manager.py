@@ -1,25 +1,266 @@
 # Code created by https://linktr.ee/saran709
 import sqlite3
-import hashlib
-from datetime import datetime
+import queue
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime, timezone
 import os
+from password_hasher import PasswordHasher
+from metrics import MetricsRegistry, instrument
+from irv import pack_ranking, unpack_ranking
 
+# Result codes returned by DatabaseManager.record_vote
+VOTE_ACCEPTED = "accepted"
+VOTE_ALREADY_CAST = "already_voted"
+VOTE_UNKNOWN_VOTER = "unknown_voter"
+VOTE_INVALID_CANDIDATE = "invalid_candidate"
+
+# Election that databases created before elections existed, and callers that name none, use.
+# Its roll is every registered voter (voters.has_voted); other elections list theirs in election_voters.
+DEFAULT_ELECTION_ID = 1
+
+# Minutes since the Unix epoch for a vote timestamp; the key of the vote_minutes rollup
+MINUTE_BUCKET = "CAST(strftime('%s', {}) AS INTEGER) / 60"
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections shared between threads
+    """
+    
+    def __init__(self, connect, max_size=8, timeout=30.0):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self.stats = {'hits': 0, 'misses': 0, 'waits': 0}
+    
+    def acquire(self):
+        """Take an idle connection, opening a new one while under max_size"""
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.stats['hits'] += 1
+            return conn
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            can_open = self._created < self.max_size
+            if can_open:
+                self._created += 1
+                self.stats['misses'] += 1
+            else:
+                self.stats['waits'] += 1
+        
+        if can_open:
+            try:
+                return self.connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        
+        # Pool exhausted - wait for another thread to release a connection
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a pooled database connection")
+    
+    def release(self, conn):
+        """Return a connection to the pool"""
+        if conn.in_transaction:
+            conn.rollback()
+        
+        with self._lock:
+            closed = self._closed
+            if closed:
+                self._created -= 1
+        
+        if closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+    
+    def close(self):
+        """Close all idle connections and refuse further acquisitions"""
+        with self._lock:
+            self._closed = True
+        
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+    
+    def get_stats(self):
+        """Get pool usage counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['open_connections'] = self._created
+        stats['idle_connections'] = self._idle.qsize()
+        return stats
+
+# connection() only hands out a pooled connection; the calls made through it are what get timed
+@instrument(exclude=('connection',))
 class DatabaseManager:
     """
     Handles all database operations for the voting system
+    Every public method is timed into self.metrics (see metrics.py)
     """
     
-    def __init__(self, db_path="voting_database.db"):
+    # Connection settings applied once when a pooled connection is opened
+    CONNECTION_PRAGMAS = (
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -8000",
+    )
+    BUSY_TIMEOUT = 30.0
+    STATEMENT_CACHE_SIZE = 256
+    JOURNAL_MODES = ('wal', 'delete', 'truncate', 'persist', 'memory')
+    CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+    # Columns get_voters_page can order by, and its voted-status filters
+    VOTER_SORT_COLUMNS = ('voter_id', 'name', 'has_voted', 'registration_date')
+    VOTER_FILTERS = {
+        None: None,
+        'voted': "{has_voted} = TRUE",
+        'not_voted': "{has_voted} = FALSE",
+    }
+    # Voter roll columns as read for elections other than the default, whose status is in election_voters
+    ELECTION_ROLL_COLUMNS = {
+        'voter_id': "ev.voter_id",
+        'name': "v.name",
+        'has_voted': "ev.has_voted",
+        'registration_date': "v.registration_date",
+    }
+    # Candidate names only need to be unique within their election
+    CANDIDATES_TABLE = f'''
+        CREATE TABLE IF NOT EXISTS {{table}} (
+            candidate_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            party TEXT,
+            description TEXT,
+            added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            election_id INTEGER NOT NULL DEFAULT {DEFAULT_ELECTION_ID},
+            UNIQUE (election_id, name),
+            FOREIGN KEY (election_id) REFERENCES elections (election_id)
+        )
+    '''
+    
+    def __init__(self, db_path="voting_database.db", pool_size=8, journal_mode="wal",
+                 wal_autocheckpoint=1000, busy_timeout=BUSY_TIMEOUT,
+                 kdf_iterations=PasswordHasher.DEFAULT_ITERATIONS, hash_workers=4, metrics=None):
+        """
+        journal_mode: SQLite journal mode; "wal" lets dashboard reads run alongside vote writes
+        wal_autocheckpoint: WAL size in pages that triggers an automatic checkpoint (0 disables)
+        busy_timeout: seconds to wait on a locked database or an exhausted pool
+        kdf_iterations: PBKDF2 work factor for new password hashes
+        hash_workers: password hashes computed in parallel
+        metrics: MetricsRegistry to record call counts and latencies in (default: a new one)
+        """
+        if journal_mode.lower() not in self.JOURNAL_MODES:
+            raise ValueError(f"Unsupported journal mode: {journal_mode}")
+        
         self.db_path = db_path
+        self.journal_mode = journal_mode.lower()
+        self.wal_autocheckpoint = int(wal_autocheckpoint)
+        self.busy_timeout = busy_timeout
+        self.connections_opened = 0
+        self._counter_lock = threading.Lock()
+        # (version, candidates, candidates_by_id, candidates_by_election) - see get_all_candidates
+        self._candidate_cache = None
+        self.candidate_cache_stats = {'hits': 0, 'misses': 0}
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.pool = ConnectionPool(self.get_connection, max_size=pool_size, timeout=busy_timeout)
+        self.hasher = PasswordHasher(kdf_iterations, max_workers=hash_workers)
+        self.metrics.add_gauge('connections_opened', lambda: self.connections_opened)
+        self.metrics.add_gauge('connection_pool', self.pool.get_stats)
+        self.metrics.add_gauge('password_hashing', self.hasher.get_stats)
         self.init_database()
     
     def get_connection(self):
-        """Create and return a database connection"""
-        return sqlite3.connect(self.db_path)
+        """Create and return a new configured database connection"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+            check_same_thread=False
+        )
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        # Auto-checkpoint threshold is a per-connection setting
+        conn.execute(f"PRAGMA wal_autocheckpoint = {self.wal_autocheckpoint}")
+        
+        with self._counter_lock:
+            self.connections_opened += 1
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a pooled connection for the duration of a with-block.
+        Commits on success and rolls back if the block raises.
+        """
+        conn = self.pool.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.pool.release(conn)
+    
+    def get_pool_stats(self):
+        """Get connection pool hit/miss/wait counters"""
+        stats = self.pool.get_stats()
+        stats['connections_opened'] = self.connections_opened
+        return stats
+    
+    def close(self):
+        """Close all pooled database connections and stop the hashing workers"""
+        self.pool.close()
+        self.hasher.close()
+    
+    def get_journal_mode(self):
+        """Get the journal mode currently in effect for the database file"""
+        with self.connection() as conn:
+            return conn.execute("PRAGMA journal_mode").fetchone()[0]
+    
+    def checkpoint(self, mode="PASSIVE"):
+        """
+        Copy committed WAL frames back into the main database file
+        mode: PASSIVE never blocks; FULL/RESTART/TRUNCATE wait for readers and writers
+        Returns: (busy, wal_frames, checkpointed_frames)
+        """
+        mode = mode.upper()
+        if mode not in self.CHECKPOINT_MODES:
+            raise ValueError(f"Unsupported checkpoint mode: {mode}")
+        
+        with self.connection() as conn:
+            return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
     
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = self.get_connection()
+        with self.connection() as conn:
+            # Journal mode is stored in the database file, so setting it once applies to every connection
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            self._create_schema(conn)
+        
+        # Create default admin if not exists
+        self.create_default_admin()
+    
+    def _create_schema(self, conn):
+        """Create tables on the given connection"""
         cursor = conn.cursor()
         
         # Create voters table
@@ -33,23 +274,44 @@ class DatabaseManager:
             )
         ''')
         
-        # Create candidates table
+        # Create elections table; every database has the default election
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS candidates (
-                candidate_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            CREATE TABLE IF NOT EXISTS elections (
+                election_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL UNIQUE,
-                party TEXT,
                 description TEXT,
-                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        cursor.execute(
+            "INSERT OR IGNORE INTO elections (election_id, name) VALUES (?, 'General Election')",
+            (DEFAULT_ELECTION_ID,)
+        )
         
-        # Create votes table
+        # Roll and voted flag of each election other than the default one
         cursor.execute('''
+            CREATE TABLE IF NOT EXISTS election_voters (
+                election_id INTEGER NOT NULL,
+                voter_id TEXT NOT NULL,
+                has_voted BOOLEAN NOT NULL DEFAULT FALSE,
+                PRIMARY KEY (election_id, voter_id),
+                FOREIGN KEY (election_id) REFERENCES elections (election_id),
+                FOREIGN KEY (voter_id) REFERENCES voters (voter_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        self._migrate_to_elections(cursor)
+        
+        # Create candidates table
+        cursor.execute(self.CANDIDATES_TABLE.format(table="candidates"))
+        
+        # Create votes table; election_id repeats the candidate's election so per-election reads use an index
+        cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS votes (
                 vote_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 candidate_id INTEGER NOT NULL,
                 vote_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                election_id INTEGER NOT NULL DEFAULT {DEFAULT_ELECTION_ID},
                 FOREIGN KEY (candidate_id) REFERENCES candidates (candidate_id)
             )
         ''')
@@ -63,217 +325,1020 @@ class DatabaseManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Create per-candidate tally table, kept current by triggers on votes
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vote_tally'")
+        tally_exists = cursor.fetchone() is not None
         
-        # Create default admin if not exists
-        self.create_default_admin()
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS vote_tally (
+                candidate_id INTEGER PRIMARY KEY,
+                vote_count INTEGER NOT NULL DEFAULT 0,
+                election_id INTEGER NOT NULL DEFAULT {DEFAULT_ELECTION_ID}
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS votes_tally_insert
+            AFTER INSERT ON votes
+            BEGIN
+                INSERT OR IGNORE INTO vote_tally (candidate_id, vote_count, election_id)
+                VALUES (NEW.candidate_id, 0, NEW.election_id);
+                UPDATE vote_tally SET vote_count = vote_count + 1 WHERE candidate_id = NEW.candidate_id;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS votes_tally_delete
+            AFTER DELETE ON votes
+            BEGIN
+                UPDATE vote_tally SET vote_count = vote_count - 1 WHERE candidate_id = OLD.candidate_id;
+            END
+        ''')
+        
+        # Databases created before the tally existed need it filled from raw votes
+        if not tally_exists:
+            self._rebuild_tally(cursor)
+        
+        # Per-minute, per-candidate vote counts for the turnout and vote-rate timeline
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vote_minutes'")
+        minutes_exist = cursor.fetchone() is not None
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vote_minutes (
+                election_id INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                candidate_id INTEGER NOT NULL,
+                vote_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (election_id, bucket, candidate_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Votes whose timestamp cannot be parsed are left out of the timeline rather than rejected
+        new_bucket = MINUTE_BUCKET.format("NEW.vote_timestamp")
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS votes_minutes_insert
+            AFTER INSERT ON votes
+            WHEN {new_bucket} IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO vote_minutes (election_id, bucket, candidate_id, vote_count)
+                VALUES (NEW.election_id, {new_bucket}, NEW.candidate_id, 0);
+                UPDATE vote_minutes SET vote_count = vote_count + 1
+                WHERE election_id = NEW.election_id AND bucket = {new_bucket} AND candidate_id = NEW.candidate_id;
+            END
+        ''')
+        
+        old_bucket = MINUTE_BUCKET.format("OLD.vote_timestamp")
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS votes_minutes_delete
+            AFTER DELETE ON votes
+            WHEN {old_bucket} IS NOT NULL
+            BEGIN
+                UPDATE vote_minutes SET vote_count = vote_count - 1
+                WHERE election_id = OLD.election_id AND bucket = {old_bucket} AND candidate_id = OLD.candidate_id;
+            END
+        ''')
+        
+        if not minutes_exist:
+            self._rebuild_vote_minutes(cursor)
+        
+        # Full preference order of ranked ballots, packed as an array of candidate ids (see irv.py);
+        # the vote row keeps the first choice, so plurality results and turnout are unchanged
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ranked_ballots (
+                vote_id INTEGER PRIMARY KEY,
+                rankings BLOB NOT NULL,
+                FOREIGN KEY (vote_id) REFERENCES votes (vote_id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS votes_ranked_delete
+            AFTER DELETE ON votes
+            BEGIN
+                DELETE FROM ranked_ballots WHERE vote_id = OLD.vote_id;
+            END
+        ''')
+        
+        # Change counters shared by every process using this database file
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS metadata (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO metadata (key, value) VALUES ('candidate_version', 0)")
+        
+        # Any change to the candidate list bumps its version
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS candidates_version_{event.lower()}
+                AFTER {event} ON candidates
+                BEGIN
+                    UPDATE metadata SET value = value + 1 WHERE key = 'candidate_version';
+                END
+            ''')
+        
+        # Enrolling or removing voters bumps the roll version; votes flip has_voted and move the vote watermark instead
+        cursor.execute("INSERT OR IGNORE INTO metadata (key, value) VALUES ('roll_version', 0)")
+        for event in ('INSERT', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS election_voters_version_{event.lower()}
+                AFTER {event} ON election_voters
+                BEGIN
+                    UPDATE metadata SET value = value + 1 WHERE key = 'roll_version';
+                END
+            ''')
+        
+        # Secondary indexes for the hot queries (idempotent on existing databases)
+        # - recent activity orders one election's votes by timestamp
+        # - the runoff count groups one election's votes by candidate
+        # - tally rebuild/verify groups votes by candidate
+        # - turnout counts and voted/not-voted filters on the roll, per election
+        # - an election's total votes sum only its rows of the tally
+        cursor.execute("DROP INDEX IF EXISTS idx_votes_timestamp")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_election_timestamp ON votes (election_id, vote_timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_election_candidate ON votes (election_id, candidate_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_candidate ON votes (candidate_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_voters_has_voted ON voters (has_voted, voter_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_election_voters_voted ON election_voters (election_id, has_voted)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vote_tally_election ON vote_tally (election_id, vote_count)")
+        # Keyset paging of the roll by name or registration date, with and without a voted-status filter
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_voters_name ON voters (name, voter_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_voters_registration ON voters (registration_date, voter_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_voters_status_name ON voters (has_voted, name, voter_id)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_voters_status_registration ON voters (has_voted, registration_date, voter_id)"
+        )
+    
+    def _columns(self, cursor, table):
+        """Column names of a table, or an empty set if it does not exist"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        return {row[1] for row in cursor.fetchall()}
+    
+    def _migrate_to_elections(self, cursor):
+        """
+        Add election_id to databases created before elections existed;
+        everything already in them belongs to the default election
+        """
+        candidate_columns = self._columns(cursor, 'candidates')
+        if candidate_columns and 'election_id' not in candidate_columns:
+            # Names were unique across the database, so the table is rebuilt to make them unique per election
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'candidates'")
+            sequence = cursor.fetchone()
+            cursor.execute(self.CANDIDATES_TABLE.format(table="candidates_migrated"))
+            cursor.execute('''
+                INSERT INTO candidates_migrated (candidate_id, name, party, description, added_date)
+                SELECT candidate_id, name, party, description, added_date FROM candidates
+            ''')
+            cursor.execute("DROP TABLE candidates")
+            cursor.execute("ALTER TABLE candidates_migrated RENAME TO candidates")
+            # Removed candidates keep their votes in the tally, so their ids must not be handed out again
+            if sequence is not None:
+                cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'candidates'", sequence)
+        
+        for table in ('votes', 'vote_tally'):
+            columns = self._columns(cursor, table)
+            if columns and 'election_id' not in columns:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN election_id INTEGER NOT NULL DEFAULT {DEFAULT_ELECTION_ID}")
+                # Recreated below with the election_id column
+                cursor.execute("DROP TRIGGER IF EXISTS votes_tally_insert")
+        
+        # The timeline is derived data, so it is simply dropped and rebuilt by election
+        minute_columns = self._columns(cursor, 'vote_minutes')
+        if minute_columns and 'election_id' not in minute_columns:
+            cursor.execute("DROP TRIGGER IF EXISTS votes_minutes_insert")
+            cursor.execute("DROP TRIGGER IF EXISTS votes_minutes_delete")
+            cursor.execute("DROP TABLE vote_minutes")
     
     def hash_password(self, password):
-        """Hash a password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash a password with salted PBKDF2-SHA256 on the hashing pool"""
+        return self.hasher.hash(password)
+    
+    def _check_password(self, table, key_column, key, password, stored_hash):
+        """
+        Verify a password, replacing a legacy or weaker hash after a successful match
+        Returns: True if the password matches
+        """
+        if stored_hash is None:
+            return self.hasher.verify_missing(password)
+        
+        matches, needs_rehash = self.hasher.verify(password, stored_hash)
+        if matches and needs_rehash:
+            new_hash = self.hash_password(password)
+            with self.connection() as conn:
+                # Only replace the hash we verified, in case it changed meanwhile
+                conn.execute(
+                    f"UPDATE {table} SET password_hash = ? WHERE {key_column} = ? AND password_hash = ?",
+                    (new_hash, key, stored_hash)
+                )
+        return matches
     
     def create_default_admin(self):
         """Create a default admin account"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Check if admin exists
-        cursor.execute("SELECT COUNT(*) FROM admin")
-        admin_count = cursor.fetchone()[0]
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Check if admin exists
+            cursor.execute("SELECT COUNT(*) FROM admin")
+            admin_count = cursor.fetchone()[0]
+            
+            if admin_count == 0:
+                # Create default admin (admin/admin123)
+                admin_id = "admin"
+                password_hash = self.hash_password("admin123")
+                cursor.execute(
+                    "INSERT INTO admin (admin_id, password_hash, name) VALUES (?, ?, ?)",
+                    (admin_id, password_hash, "System Administrator")
+                )
+    
+    # Election Management
+    def create_election(self, name, description=""):
+        """
+        Add an election; its roll starts empty (see add_election_voters)
+        Returns: (success, message, election_id)
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("INSERT INTO elections (name, description) VALUES (?, ?)", (name, description))
+                return True, "Election created successfully", cursor.lastrowid
+            except sqlite3.IntegrityError:
+                return False, "Election name already exists", None
+    
+    def get_elections(self):
+        """Get all elections as (election_id, name, description, created_date)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT election_id, name, description, created_date FROM elections ORDER BY election_id")
+            return cursor.fetchall()
+    
+    def add_election_voters(self, election_id, voter_ids=None, chunk_size=1000):
+        """
+        Put registered voters on an election's roll, in chunked transactions
+        voter_ids: iterable of voter IDs, or None for every registered voter;
+        unknown IDs and voters already on the roll are skipped
+        Returns: number of voters added
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            self._check_roll_election(cursor, election_id)
+            if voter_ids is None:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO election_voters (election_id, voter_id) SELECT ?, voter_id FROM voters",
+                    (election_id,)
+                )
+                return cursor.rowcount
         
-        if admin_count == 0:
-            # Create default admin (admin/admin123)
-            admin_id = "admin"
-            password_hash = self.hash_password("admin123")
-            cursor.execute(
-                "INSERT INTO admin (admin_id, password_hash, name) VALUES (?, ?, ?)",
-                (admin_id, password_hash, "System Administrator")
-            )
-            conn.commit()
+        added = 0
+        voter_ids = iter(voter_ids)
+        while True:
+            chunk = list(islice(voter_ids, chunk_size))
+            if not chunk:
+                break
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                added += self._enroll_voters(cursor, election_id, chunk)
+        return added
+    
+    def remove_election_voters(self, election_id, voter_ids, chunk_size=1000):
+        """
+        Take voters off an election's roll, in chunked transactions
+        Voters who have already voted in the election stay on it, so turnout still matches the votes cast
+        Returns: number of voters removed
+        """
+        with self.connection() as conn:
+            self._check_roll_election(conn.cursor(), election_id)
         
-        conn.close()
+        removed = 0
+        voter_ids = iter(voter_ids)
+        while True:
+            chunk = list(islice(voter_ids, chunk_size))
+            if not chunk:
+                break
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                for start in range(0, len(chunk), 500):
+                    batch = chunk[start:start + 500]
+                    placeholders = ", ".join("?" * len(batch))
+                    cursor.execute(f'''
+                        DELETE FROM election_voters
+                        WHERE election_id = ? AND NOT has_voted AND voter_id IN ({placeholders})
+                    ''', [election_id] + batch)
+                    removed += cursor.rowcount
+        return removed
+    
+    def _check_roll_election(self, cursor, election_id):
+        """Raise ValueError unless election_id is an existing election with its own roll"""
+        if election_id == DEFAULT_ELECTION_ID:
+            raise ValueError("Every registered voter is already on the default election's roll")
+        cursor.execute("SELECT 1 FROM elections WHERE election_id = ?", (election_id,))
+        if cursor.fetchone() is None:
+            raise ValueError(f"No such election: {election_id}")
+    
+    def _enroll_voters(self, cursor, election_id, voter_ids, lookup_size=500):
+        """Put registered voter_ids on an election's roll inside the caller's transaction, in bounded IN lists"""
+        added = 0
+        for start in range(0, len(voter_ids), lookup_size):
+            batch = voter_ids[start:start + lookup_size]
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO election_voters (election_id, voter_id)
+                SELECT ?, voter_id FROM voters WHERE voter_id IN ({placeholders})
+            ''', [election_id] + batch)
+            added += cursor.rowcount
+        return added
     
     # Voter Management
     def register_voter(self, voter_id, name, password):
         """Register a new voter"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        password_hash = self.hash_password(password)
         
-        try:
-            password_hash = self.hash_password(password)
-            cursor.execute(
-                "INSERT INTO voters (voter_id, name, password_hash) VALUES (?, ?, ?)",
-                (voter_id, name, password_hash)
-            )
-            conn.commit()
-            return True, "Voter registered successfully"
-        except sqlite3.IntegrityError:
-            return False, "Voter ID already exists"
-        finally:
-            conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    "INSERT INTO voters (voter_id, name, password_hash) VALUES (?, ?, ?)",
+                    (voter_id, name, password_hash)
+                )
+                return True, "Voter registered successfully"
+            except sqlite3.IntegrityError:
+                return False, "Voter ID already exists"
     
-    def authenticate_voter(self, voter_id, password):
-        """Authenticate a voter"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def register_voters_bulk(self, voters, chunk_size=1000, progress=None, election_id=DEFAULT_ELECTION_ID):
+        """
+        Register voters from an iterable of (voter_id, name, password) tuples.
+        Rows are inserted in chunked transactions; IDs that already exist or repeat
+        within the input are skipped and reported instead of aborting the batch.
+        progress, if given, is called as progress(processed, registered, duplicates) per chunk.
+        election_id: also put every voter in the input, new or already registered, on this
+        election's roll in the same transactions
+        Returns: (registered_count, duplicate_voter_ids)
+        """
+        if election_id != DEFAULT_ELECTION_ID:
+            with self.connection() as conn:
+                self._check_roll_election(conn.cursor(), election_id)
         
-        password_hash = self.hash_password(password)
-        cursor.execute(
-            "SELECT name, has_voted FROM voters WHERE voter_id = ? AND password_hash = ?",
-            (voter_id, password_hash)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        registered = 0
+        processed = 0
+        duplicates = []
+        voters = iter(voters)
+        
+        while True:
+            chunk = list(islice(voters, chunk_size))
+            if not chunk:
+                break
+            
+            # Hash in parallel outside the transaction so the write lock is held only for the inserts
+            hashes = self.hasher.hash_many([password for _, _, password in chunk])
+            rows = [(voter_id, name, password_hash) for (voter_id, name, _), password_hash in zip(chunk, hashes)]
+            
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                existing = self._existing_voter_ids(cursor, [row[0] for row in rows])
+                
+                # Earlier chunks are committed, so only repeats within this chunk need tracking here
+                seen = set()
+                new_rows = []
+                for row in rows:
+                    if row[0] in existing or row[0] in seen:
+                        duplicates.append(row[0])
+                    else:
+                        seen.add(row[0])
+                        new_rows.append(row)
+                
+                cursor.executemany(
+                    "INSERT INTO voters (voter_id, name, password_hash) VALUES (?, ?, ?)",
+                    new_rows
+                )
+                if election_id != DEFAULT_ELECTION_ID:
+                    self._enroll_voters(cursor, election_id, [row[0] for row in rows])
+            
+            registered += len(new_rows)
+            processed += len(chunk)
+            if progress:
+                progress(processed, registered, len(duplicates))
+        
+        return registered, duplicates
+    
+    def _existing_voter_ids(self, cursor, voter_ids, lookup_size=500):
+        """Return the subset of voter_ids already present, querying in bounded IN lists"""
+        existing = set()
+        for start in range(0, len(voter_ids), lookup_size):
+            batch = voter_ids[start:start + lookup_size]
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(f"SELECT voter_id FROM voters WHERE voter_id IN ({placeholders})", batch)
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
+    
+    def authenticate_voter(self, voter_id, password, election_id=DEFAULT_ELECTION_ID):
+        """
+        Authenticate a voter
+        Returns: (success, name, has_voted in the election); has_voted is None if the
+        voter is not on that election's roll
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            if election_id == DEFAULT_ELECTION_ID:
+                cursor.execute(
+                    "SELECT name, has_voted, password_hash FROM voters WHERE voter_id = ?",
+                    (voter_id,)
+                )
+            else:
+                cursor.execute('''
+                    SELECT v.name, ev.has_voted, v.password_hash
+                    FROM voters v
+                    LEFT JOIN election_voters ev ON ev.election_id = ? AND ev.voter_id = v.voter_id
+                    WHERE v.voter_id = ?
+                ''', (election_id, voter_id))
+            result = cursor.fetchone()
         
-        if result:
+        # Verification runs after the connection is back in the pool
+        stored_hash = result[2] if result else None
+        if self._check_password("voters", "voter_id", voter_id, password, stored_hash):
             return True, result[0], result[1]  # Success, name, has_voted
         return False, None, None
     
     def mark_voter_as_voted(self, voter_id):
         """Mark a voter as having voted"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            conn.execute(
+                "UPDATE voters SET has_voted = TRUE WHERE voter_id = ?",
+                (voter_id,)
+            )
+    
+    def has_voter_voted(self, voter_id, election_id=DEFAULT_ELECTION_ID):
+        """
+        Check whether a voter has already voted in an election
+        Returns: True/False, or None if the voter is not on the election's roll
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            if election_id == DEFAULT_ELECTION_ID:
+                cursor.execute("SELECT has_voted FROM voters WHERE voter_id = ?", (voter_id,))
+            else:
+                cursor.execute(
+                    "SELECT has_voted FROM election_voters WHERE election_id = ? AND voter_id = ?",
+                    (election_id, voter_id)
+                )
+            result = cursor.fetchone()
         
-        cursor.execute(
-            "UPDATE voters SET has_voted = TRUE WHERE voter_id = ?",
-            (voter_id,)
-        )
-        conn.commit()
-        conn.close()
+        if result is None:
+            return None
+        return bool(result[0])
     
     def get_all_voters(self):
         """Get all registered voters"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT voter_id, name, has_voted, registration_date FROM voters")
-        voters = cursor.fetchall()
-        conn.close()
-        return voters
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT voter_id, name, has_voted, registration_date FROM voters")
+            return cursor.fetchall()
     
-    # Candidate Management
-    def add_candidate(self, name, party="", description=""):
-        """Add a new candidate"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_voters_page(self, after_id=None, limit=100, filter=None, sort_by="voter_id",
+                        descending=False, after_value=None, election_id=DEFAULT_ELECTION_ID):
+        """
+        Get one page of an election's voter roll using keyset pagination.
+        Pass the voter_id of the last row already shown as after_id (and, when sorting
+        by another column, that row's value of the column as after_value) to get the
+        rows that follow it; each page costs the same however deep into the roll it is.
+        filter: None for every voter, "voted" or "not_voted"
+        Returns: list of (voter_id, name, has_voted, registration_date); has_voted is the
+        voter's status in that election
+        """
+        if sort_by not in self.VOTER_SORT_COLUMNS:
+            raise ValueError(f"Cannot sort voters by: {sort_by}")
+        if filter not in self.VOTER_FILTERS:
+            raise ValueError(f"Unknown voter filter: {filter}")
         
-        try:
+        if election_id == DEFAULT_ELECTION_ID:
+            columns = {column: column for column in self.VOTER_SORT_COLUMNS}
+            source = "voters"
+            conditions = []
+            params = []
+        else:
+            columns = self.ELECTION_ROLL_COLUMNS
+            source = "election_voters ev JOIN voters v ON v.voter_id = ev.voter_id"
+            conditions = ["ev.election_id = ?"]
+            params = [election_id]
+        
+        if self.VOTER_FILTERS[filter]:
+            conditions.append(self.VOTER_FILTERS[filter].format(**columns))
+            if sort_by == "has_voted":
+                # Every filtered row has the same status, so voter_id alone sets the order
+                sort_by = "voter_id"
+        
+        direction = "DESC" if descending else "ASC"
+        comparison = "<" if descending else ">"
+        voter_id, sort_column = columns['voter_id'], columns[sort_by]
+        if sort_by == "voter_id":
+            order_by = f"{voter_id} {direction}"
+            if after_id is not None:
+                conditions.append(f"{voter_id} {comparison} ?")
+                params.append(after_id)
+        else:
+            # voter_id breaks ties so rows sharing a name or date are neither skipped nor repeated
+            order_by = f"{sort_column} {direction}, {voter_id} {direction}"
+            if after_id is not None:
+                conditions.append(f"({sort_column}, {voter_id}) {comparison} (?, ?)")
+                params.extend((after_value, after_id))
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        selected = ", ".join(columns[column] for column in self.VOTER_SORT_COLUMNS)
+        with self.connection() as conn:
+            cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO candidates (name, party, description) VALUES (?, ?, ?)",
-                (name, party, description)
+                f"SELECT {selected} FROM {source} {where} ORDER BY {order_by} LIMIT ?",
+                params + [limit]
             )
-            conn.commit()
-            return True, "Candidate added successfully"
-        except sqlite3.IntegrityError:
-            return False, "Candidate name already exists"
-        finally:
-            conn.close()
+            return cursor.fetchall()
     
-    def get_all_candidates(self):
-        """Get all candidates"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    # Candidate Management
+    def add_candidate(self, name, party="", description="", election_id=DEFAULT_ELECTION_ID):
+        """Add a new candidate to an election"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM elections WHERE election_id = ?", (election_id,))
+            if cursor.fetchone() is None:
+                return False, "Election not found"
+            try:
+                cursor.execute(
+                    "INSERT INTO candidates (name, party, description, election_id) VALUES (?, ?, ?, ?)",
+                    (name, party, description, election_id)
+                )
+                return True, "Candidate added successfully"
+            except sqlite3.IntegrityError:
+                return False, "Candidate name already exists"
+    
+    def get_all_candidates(self, election_id=DEFAULT_ELECTION_ID):
+        """
+        Get an election's candidates (served from the versioned candidate cache)
+        election_id: None for the candidates of every election
+        """
+        cache = self._get_candidate_cache()
+        if election_id is None:
+            return list(cache[1])
+        return list(cache[3].get(election_id, ()))
+    
+    def get_candidate(self, candidate_id):
+        """Get one candidate by ID from the candidate cache, or None"""
+        return self._get_candidate_cache()[2].get(candidate_id)
+    
+    def get_candidate_version(self):
+        """Get the candidate list version, bumped on every add, update or remove"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM metadata WHERE key = 'candidate_version'")
+            return cursor.fetchone()[0]
+    
+    def _get_candidate_cache(self):
+        """
+        Return the cached (version, candidates, candidates_by_id, candidates_by_election), reloading it when
+        the stored version has moved on, including changes made by other processes
+        """
+        cache = self._candidate_cache
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            # Read version and rows from one snapshot so they always agree
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT value FROM metadata WHERE key = 'candidate_version'")
+            version = cursor.fetchone()[0]
+            
+            if cache is not None and cache[0] == version:
+                with self._counter_lock:
+                    self.candidate_cache_stats['hits'] += 1
+                return cache
+            
+            cursor.execute("SELECT candidate_id, name, party, description, election_id FROM candidates")
+            rows = cursor.fetchall()
         
-        cursor.execute("SELECT candidate_id, name, party, description FROM candidates")
-        candidates = cursor.fetchall()
-        conn.close()
-        return candidates
+        candidates = tuple(row[:4] for row in rows)
+        by_election = {}
+        for candidate, row in zip(candidates, rows):
+            by_election.setdefault(row[4], []).append(candidate)
+        by_election = {election_id: tuple(members) for election_id, members in by_election.items()}
+        cache = (version, candidates, {c[0]: c for c in candidates}, by_election)
+        with self._counter_lock:
+            self.candidate_cache_stats['misses'] += 1
+        self._candidate_cache = cache
+        return cache
     
     def remove_candidate(self, candidate_id):
         """Remove a candidate"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM candidates WHERE candidate_id = ?", (candidate_id,))
-        rows_affected = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM candidates WHERE candidate_id = ?", (candidate_id,))
+            rows_affected = cursor.rowcount
         
         return rows_affected > 0
     
     # Voting Operations
-    def cast_vote(self, candidate_id):
-        """Cast a vote for a candidate"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def record_vote(self, voter_id, candidate_id, rankings=None, election_id=DEFAULT_ELECTION_ID):
+        """
+        Atomically validate the candidate, mark the voter as voted and store the vote.
+        rankings: full preference order of a ranked ballot, starting with candidate_id
+        election_id: election the vote is for; candidates and the voter must belong to it
+        Returns one of VOTE_ACCEPTED, VOTE_ALREADY_CAST, VOTE_UNKNOWN_VOTER or VOTE_INVALID_CANDIDATE
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Take the write lock up front so concurrent kiosks serialize here
+            # instead of failing to upgrade a shared lock later
+            cursor.execute("BEGIN IMMEDIATE")
+            result = self._record_vote(cursor, voter_id, candidate_id, rankings, election_id)
+            
+            if result != VOTE_ACCEPTED:
+                conn.rollback()
+            return result
+    
+    def record_votes_batch(self, votes):
+        """
+        Record many (voter_id, candidate_id[, rankings[, election_id]]) votes
+        in one transaction and one commit.
+        Each vote runs under its own savepoint, so a failing vote does not undo the others.
+        Returns: list with a VOTE_* result code or the raised exception for each vote
+        """
+        results = []
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            for vote in votes:
+                cursor.execute("SAVEPOINT batch_vote")
+                try:
+                    results.append(self._record_vote(cursor, *vote))
+                except sqlite3.Error as e:
+                    cursor.execute("ROLLBACK TO batch_vote")
+                    results.append(e)
+                cursor.execute("RELEASE batch_vote")
+        
+        return results
+    
+    def _record_vote(self, cursor, voter_id, candidate_id, rankings=None, election_id=DEFAULT_ELECTION_ID):
+        """Record one vote inside the caller's open transaction"""
+        if rankings is None:
+            cursor.execute(
+                "SELECT 1 FROM candidates WHERE candidate_id = ? AND election_id = ?",
+                (candidate_id, election_id)
+            )
+            if cursor.fetchone() is None:
+                return VOTE_INVALID_CANDIDATE
+        else:
+            # Every ranked candidate must exist, once each, with candidate_id first
+            rankings = tuple(rankings)
+            if not rankings or rankings[0] != candidate_id or len(set(rankings)) != len(rankings):
+                return VOTE_INVALID_CANDIDATE
+            placeholders = ", ".join("?" * len(rankings))
+            cursor.execute(
+                f"SELECT COUNT(*) FROM candidates WHERE candidate_id IN ({placeholders}) AND election_id = ?",
+                rankings + (election_id,)
+            )
+            if cursor.fetchone()[0] != len(rankings):
+                return VOTE_INVALID_CANDIDATE
+        
+        # Conditional flip - only one transaction can move has_voted from FALSE to TRUE
+        if election_id == DEFAULT_ELECTION_ID:
+            cursor.execute(
+                "UPDATE voters SET has_voted = TRUE WHERE voter_id = ? AND NOT has_voted",
+                (voter_id,)
+            )
+        else:
+            cursor.execute(
+                "UPDATE election_voters SET has_voted = TRUE WHERE election_id = ? AND voter_id = ? AND NOT has_voted",
+                (election_id, voter_id)
+            )
+        if cursor.rowcount == 0:
+            if election_id == DEFAULT_ELECTION_ID:
+                cursor.execute("SELECT 1 FROM voters WHERE voter_id = ?", (voter_id,))
+            else:
+                cursor.execute(
+                    "SELECT 1 FROM election_voters WHERE election_id = ? AND voter_id = ?",
+                    (election_id, voter_id)
+                )
+            if cursor.fetchone() is None:
+                return VOTE_UNKNOWN_VOTER
+            return VOTE_ALREADY_CAST
         
-        # Insert vote with current timestamp
         cursor.execute(
-            "INSERT INTO votes (candidate_id, vote_timestamp) VALUES (?, CURRENT_TIMESTAMP)",
-            (candidate_id,)
+            "INSERT INTO votes (candidate_id, election_id, vote_timestamp) VALUES (?, ?, CURRENT_TIMESTAMP)",
+            (candidate_id, election_id)
         )
-        conn.commit()
-        conn.close()
+        # A ranking of one is an ordinary vote, so only longer rankings need storing
+        if rankings is not None and len(rankings) > 1:
+            cursor.execute(
+                "INSERT INTO ranked_ballots (vote_id, rankings) VALUES (?, ?)",
+                (cursor.lastrowid, pack_ranking(rankings))
+            )
+        return VOTE_ACCEPTED
+    
+    def cast_vote(self, candidate_id):
+        """Cast a vote for a candidate"""
+        with self.connection() as conn:
+            # Insert vote with current timestamp, in the candidate's election
+            conn.execute(
+                "INSERT INTO votes (candidate_id, election_id, vote_timestamp) "
+                "SELECT candidate_id, election_id, CURRENT_TIMESTAMP FROM candidates WHERE candidate_id = ?",
+                (candidate_id,)
+            )
         return True
     
-    def get_voting_results(self):
-        """Get voting results"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+    def get_voting_results(self, election_id=DEFAULT_ELECTION_ID):
+        """Get an election's results from the maintained tally"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT c.candidate_id, c.name, c.party, COALESCE(t.vote_count, 0) as vote_count
+                FROM candidates c
+                LEFT JOIN vote_tally t ON c.candidate_id = t.candidate_id
+                WHERE c.election_id = ?
+                ORDER BY vote_count DESC, c.candidate_id
+            ''', (election_id,))
+            return cursor.fetchall()
+    
+    # Streaming Reads
+    def _stream(self, sql, params=(), chunk_size=1000):
+        """
+        Yield the rows of a query, fetching chunk_size rows at a time.
+        The pooled connection (and its read snapshot) is held until the generator
+        is exhausted or closed.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+    
+    def iter_voter_roll(self, chunk_size=1000, election_id=DEFAULT_ELECTION_ID):
+        """
+        Yield (voter_id, name, has_voted, registration_date) for every voter on an election's roll,
+        in voter_id order; has_voted is the voter's status in that election
+        """
+        if election_id == DEFAULT_ELECTION_ID:
+            return self._stream(
+                "SELECT voter_id, name, has_voted, registration_date FROM voters ORDER BY voter_id",
+                chunk_size=chunk_size
+            )
+        return self._stream('''
+            SELECT v.voter_id, v.name, ev.has_voted, v.registration_date
+            FROM election_voters ev
+            JOIN voters v ON v.voter_id = ev.voter_id
+            WHERE ev.election_id = ?
+            ORDER BY ev.voter_id
+        ''', (election_id,), chunk_size=chunk_size)
+    
+    def iter_vote_audit(self, chunk_size=1000, election_id=DEFAULT_ELECTION_ID):
+        """
+        Yield (vote_id, election_id, vote_timestamp, candidate_id, name, party) for every vote
+        in an election, in vote_id order
+        """
+        return self._stream('''
+            SELECT v.vote_id, v.election_id, v.vote_timestamp, v.candidate_id, c.name, c.party
+            FROM votes v
+            LEFT JOIN candidates c ON v.candidate_id = c.candidate_id
+            WHERE v.election_id = ?
+            ORDER BY v.vote_id
+        ''', (election_id,), chunk_size=chunk_size)
+    
+    def iter_ranked_ballots(self, chunk_size=1000, election_id=DEFAULT_ELECTION_ID):
+        """
+        Yield (ranking, count) for every distinct ballot in an election; identical ballots are grouped in
+        SQLite so the runoff count sees each ranking once. A single-choice vote ranks
+        only its candidate.
+        """
+        rows = self._stream('''
+            SELECT r.rankings, v.candidate_id, COUNT(*)
+            FROM votes v
+            LEFT JOIN ranked_ballots r ON r.vote_id = v.vote_id
+            WHERE v.election_id = ?
+            GROUP BY r.rankings, v.candidate_id
+        ''', (election_id,), chunk_size=chunk_size)
+        for rankings, candidate_id, count in rows:
+            yield (unpack_ranking(rankings) if rankings is not None else (candidate_id,)), count
+    
+    # Tally Maintenance
+    def rebuild_tally(self):
+        """
+        Recompute the vote tally and the per-minute timeline from the raw votes table
+        Returns: number of candidates with a tally row
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            self._rebuild_vote_minutes(cursor)
+            return self._rebuild_tally(cursor)
+    
+    def _rebuild_tally(self, cursor):
+        """Recompute the vote tally inside the caller's transaction"""
+        cursor.execute("DELETE FROM vote_tally")
         cursor.execute('''
-            SELECT c.candidate_id, c.name, c.party, COUNT(v.vote_id) as vote_count
-            FROM candidates c
-            LEFT JOIN votes v ON c.candidate_id = v.candidate_id
-            GROUP BY c.candidate_id, c.name, c.party
-            ORDER BY vote_count DESC
+            INSERT INTO vote_tally (candidate_id, vote_count, election_id)
+            SELECT candidate_id, COUNT(*), MAX(election_id) FROM votes GROUP BY candidate_id
         ''')
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        cursor.execute("SELECT COUNT(*) FROM vote_tally")
+        return cursor.fetchone()[0]
     
-    def get_total_votes(self):
-        """Get total number of votes cast"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM votes")
-        total = cursor.fetchone()[0]
-        conn.close()
-        return total
+    def _rebuild_vote_minutes(self, cursor):
+        """Recompute the per-minute timeline inside the caller's transaction"""
+        bucket = MINUTE_BUCKET.format("vote_timestamp")
+        cursor.execute("DELETE FROM vote_minutes")
+        cursor.execute(f'''
+            INSERT INTO vote_minutes (election_id, bucket, candidate_id, vote_count)
+            SELECT election_id, {bucket} AS minute, candidate_id, COUNT(*)
+            FROM votes
+            WHERE minute IS NOT NULL
+            GROUP BY election_id, minute, candidate_id
+        ''')
+    
+    def verify_tally(self):
+        """
+        Compare the maintained tally against a full recount of the votes table
+        Returns: list of (candidate_id, tally_count, actual_count) mismatches
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT candidate_id, SUM(tally_count), SUM(actual_count)
+                FROM (
+                    SELECT candidate_id, vote_count as tally_count, 0 as actual_count FROM vote_tally
+                    UNION ALL
+                    SELECT candidate_id, 0, COUNT(*) FROM votes GROUP BY candidate_id
+                )
+                GROUP BY candidate_id
+                HAVING SUM(tally_count) != SUM(actual_count)
+                ORDER BY candidate_id
+            ''')
+            return cursor.fetchall()
+    
+    def get_total_votes(self, election_id=DEFAULT_ELECTION_ID):
+        """Get the number of votes cast in an election from the maintained tally"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(SUM(vote_count), 0) FROM vote_tally WHERE election_id = ?", (election_id,))
+            return cursor.fetchone()[0]
     
     # Admin Authentication
     def authenticate_admin(self, admin_id, password):
         """Authenticate an admin"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        password_hash = self.hash_password(password)
-        cursor.execute(
-            "SELECT name FROM admin WHERE admin_id = ? AND password_hash = ?",
-            (admin_id, password_hash)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT password_hash FROM admin WHERE admin_id = ?", (admin_id,))
+            result = cursor.fetchone()
         
-        return result is not None
+        return self._check_password("admin", "admin_id", admin_id, password, result[0] if result else None)
     
     # Database Statistics
-    def get_statistics(self):
-        """Get voting statistics"""
+    def get_statistics(self, election_id=DEFAULT_ELECTION_ID):
+        """Get an election's voting statistics using aggregate queries in a single round trip"""
+        if election_id == DEFAULT_ELECTION_ID:
+            roll = "(SELECT COUNT(*) FROM voters), (SELECT COUNT(*) FROM voters WHERE has_voted = TRUE)"
+            params = (election_id, election_id)
+        else:
+            roll = '''(SELECT COUNT(*) FROM election_voters WHERE election_id = ?),
+                    (SELECT COUNT(*) FROM election_voters WHERE election_id = ? AND has_voted = TRUE)'''
+            params = (election_id,) * 4
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT
+                    (SELECT COUNT(*) FROM candidates WHERE election_id = ?),
+                    (SELECT COALESCE(SUM(vote_count), 0) FROM vote_tally WHERE election_id = ?),
+                    {roll}
+            ''', params)
+            total_candidates, total_votes, total_voters, voters_who_voted = cursor.fetchone()
+        
         stats = {}
-        stats['total_voters'] = len(self.get_all_voters())
-        stats['total_candidates'] = len(self.get_all_candidates())
-        stats['total_votes'] = self.get_total_votes()
-        stats['voters_who_voted'] = len([v for v in self.get_all_voters() if v[2]])
+        stats['total_voters'] = total_voters
+        stats['total_candidates'] = total_candidates
+        stats['total_votes'] = total_votes
+        stats['voters_who_voted'] = voters_who_voted
         stats['voter_turnout'] = (stats['voters_who_voted'] / max(stats['total_voters'], 1)) * 100
         
         return stats
     
-    def get_recent_votes(self, limit=10):
-        """Get recent votes with candidate information"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_recent_votes(self, limit=10, include_ids=False, after_vote_id=None, election_id=DEFAULT_ELECTION_ID):
+        """
+        Get an election's recent votes with candidate information
+        include_ids: prefix each row with its vote_id, for callers that track rows by key
+        after_vote_id: only return votes newer than this one
+        """
+        columns = "v.vote_id, v.vote_timestamp, c.name, c.party" if include_ids else "v.vote_timestamp, c.name, c.party"
+        where = "WHERE v.election_id = ?"
+        params = (election_id, limit)
+        if after_vote_id is not None:
+            where += " AND v.vote_id > ?"
+            params = (election_id, after_vote_id, limit)
         
-        cursor.execute('''
-            SELECT v.vote_timestamp, c.name, c.party
-            FROM votes v
-            JOIN candidates c ON v.candidate_id = c.candidate_id
-            ORDER BY v.vote_timestamp DESC
-            LIMIT ?
-        ''', (limit,))
-        
-        recent_votes = cursor.fetchall()
-        conn.close()
-        return recent_votes
\ No newline at end of file
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT {columns}
+                FROM votes v
+                JOIN candidates c ON v.candidate_id = c.candidate_id
+                {where}
+                ORDER BY v.vote_timestamp DESC, v.vote_id DESC
+                LIMIT ?
+            ''', params)
+            return cursor.fetchall()
+    
+    # Timeline Analytics
+    def get_vote_timeline(self, bucket_minutes=1, buckets=None, per_candidate=False, election_id=DEFAULT_ELECTION_ID):
+        """
+        An election's votes per time bucket, read from the per-minute rollup instead of the votes table,
+        so the cost grows with the minutes covered rather than the number of votes
+        bucket_minutes: width of each bucket; buckets start on multiples of it (UTC)
+        buckets: only the most recent this many buckets, with empty ones filled in
+            (None for the whole election, listing only buckets that have votes)
+        per_candidate: add a {candidate_id: votes} dict to each row
+        Returns: list of (bucket_start, votes, cumulative_votes[, votes_by_candidate]);
+        bucket_start uses the same format as vote_timestamp
+        """
+        bucket_minutes = int(bucket_minutes)
+        if bucket_minutes < 1:
+            raise ValueError("bucket_minutes must be at least 1")
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            # One read snapshot, so the running total lines up with the buckets
+            cursor.execute("BEGIN")
+            cursor.execute('''
+                SELECT
+                    (SELECT MIN(bucket) FROM vote_minutes WHERE election_id = ?),
+                    (SELECT MAX(bucket) FROM vote_minutes WHERE election_id = ?)
+            ''', (election_id, election_id))
+            first, last = cursor.fetchone()
+            if first is None:
+                return []
+            
+            first -= first % bucket_minutes
+            last -= last % bucket_minutes
+            if buckets:
+                first = max(first, last - (buckets - 1) * bucket_minutes)
+            
+            cursor.execute(
+                "SELECT COALESCE(SUM(vote_count), 0) FROM vote_minutes WHERE election_id = ? AND bucket < ?",
+                (election_id, first)
+            )
+            cumulative = cursor.fetchone()[0]
+            if per_candidate:
+                cursor.execute('''
+                    SELECT bucket, candidate_id, vote_count FROM vote_minutes
+                    WHERE election_id = ? AND bucket >= ? AND vote_count != 0
+                ''', (election_id, first))
+            else:
+                cursor.execute('''
+                    SELECT bucket, NULL, SUM(vote_count) FROM vote_minutes
+                    WHERE election_id = ? AND bucket >= ?
+                    GROUP BY bucket
+                ''', (election_id, first))
+            rows = cursor.fetchall()
+        
+        # Fold minutes into buckets; the rollup is small, so this is cheap
+        totals = {}
+        by_candidate = {}
+        for minute, candidate_id, votes in rows:
+            start = minute - minute % bucket_minutes
+            totals[start] = totals.get(start, 0) + votes
+            if per_candidate:
+                counts = by_candidate.setdefault(start, {})
+                counts[candidate_id] = counts.get(candidate_id, 0) + votes
+        
+        if buckets:
+            starts = range(first, last + 1, bucket_minutes)
+        else:
+            # The whole election can span days of idle minutes, so gaps are left for the caller to fill
+            starts = sorted(start for start, votes in totals.items() if votes)
+        
+        timeline = []
+        for start in starts:
+            votes = totals.get(start, 0)
+            cumulative += votes
+            bucket_start = datetime.fromtimestamp(start * 60, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            row = (bucket_start, votes, cumulative)
+            if per_candidate:
+                row += (by_candidate.get(start, {}),)
+            timeline.append(row)
+        return timeline
+    
+    def get_change_token(self):
+        """
+        Cheap probe for whether results, activity or statistics may have changed.
+        Each part is a single index lookup, so it can be polled many times a second.
+        Returns: (last_vote_id, candidate_version, last_voter_rowid, roll_version)
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT
+                    (SELECT MAX(vote_id) FROM votes),
+                    (SELECT value FROM metadata WHERE key = 'candidate_version'),
+                    (SELECT MAX(rowid) FROM voters),
+                    (SELECT value FROM metadata WHERE key = 'roll_version')
+            ''')
+            return tuple(cursor.fetchone())
\ No newline at end of file
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Code created by https://linktr.ee/saran709
+"""
+Database maintenance commands for the Offline Voting System
+
+Usage:
+    python db_maintenance.py verify-tally [--db voting_database.db]
+    python db_maintenance.py rebuild-tally [--db voting_database.db]
+    python db_maintenance.py checkpoint [--mode TRUNCATE] [--db voting_database.db]
+"""
+
+import argparse
+import sys
+from database_manager import DatabaseManager
+
+def verify_tally(db, args):
+    """Check the maintained tally against a full recount of the votes"""
+    mismatches = db.verify_tally()
+    
+    if not mismatches:
+        print("✓ Vote tally matches the recorded votes")
+        return True
+    
+    print(f"❌ Vote tally differs from recorded votes for {len(mismatches)} candidate(s):")
+    print(f"{'Candidate ID':<14} {'Tally':>8} {'Recount':>8}")
+    for candidate_id, tally_count, actual_count in mismatches:
+        print(f"{candidate_id:<14} {tally_count:>8} {actual_count:>8}")
+    print("Run 'python db_maintenance.py rebuild-tally' to repair it.")
+    return False
+
+def rebuild_tally(db, args):
+    """Recompute the tally and timeline tables from the raw votes"""
+    rows = db.rebuild_tally()
+    print(f"✓ Vote tally and timeline rebuilt for {rows} candidate(s)")
+    return True
+
+def checkpoint(db, args):
+    """Checkpoint the write-ahead log into the main database file"""
+    if db.get_journal_mode() != 'wal':
+        print("ℹ Database is not in WAL mode; nothing to checkpoint")
+        return True
+    
+    busy, wal_frames, checkpointed = db.checkpoint(args.mode)
+    if busy:
+        print(f"⚠ Checkpoint ({args.mode}) could not complete: database busy, "
+              f"{checkpointed} of {wal_frames} WAL frames copied")
+        return False
+    
+    print(f"✓ Checkpoint ({args.mode}) copied {checkpointed} of {wal_frames} WAL frames")
+    return True
+
+COMMANDS = {
+    'verify-tally': verify_tally,
+    'rebuild-tally': rebuild_tally,
+    'checkpoint': checkpoint,
+}
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Offline Voting System database maintenance")
+    parser.add_argument('command', choices=sorted(COMMANDS), help="maintenance command to run")
+    parser.add_argument('--db', default="voting_database.db", help="path to the voting database")
+    parser.add_argument('--mode', default="PASSIVE", choices=DatabaseManager.CHECKPOINT_MODES,
+                        help="checkpoint mode (checkpoint command only)")
+    args = parser.parse_args(argv)
+    
+    db = DatabaseManager(args.db)
+    try:
+        return COMMANDS[args.command](db, args)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
\ No newline at end of file
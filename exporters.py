@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# Code created by https://linktr.ee/saran709
+"""
+Streaming exports of voting data
+Writes the results, the turnout roll or the per-vote audit table as CSV or
+JSON Lines, optionally gzip-compressed. Rows are read from the database in
+fetchmany chunks and written as they arrive, so memory use does not grow with
+the number of voters or votes. Each export covers one election, the general
+election unless --election picks another.
+
+Usage:
+    python exporters.py results results.csv
+    python exporters.py audit votes.jsonl.gz [--db voting_database.db] [--chunk-size 5000]
+    python exporters.py turnout roll.csv --gzip
+    python exporters.py results council.csv --election 2
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+import time
+from database_manager import DatabaseManager, DEFAULT_ELECTION_ID
+
+FORMATS = ('csv', 'jsonl')
+
+def results_rows(db, chunk_size=1000, election_id=DEFAULT_ELECTION_ID):
+    """Yield ranked results rows; one row per candidate, so this is always small"""
+    results = db.get_voting_results(election_id)
+    total_votes = sum(row[3] for row in results)
+    for rank, (candidate_id, name, party, vote_count) in enumerate(results, 1):
+        percentage = round(vote_count / max(total_votes, 1) * 100, 2)
+        yield rank, candidate_id, name, party or "", vote_count, percentage
+
+def turnout_rows(db, chunk_size=1000, election_id=DEFAULT_ELECTION_ID):
+    """Yield the election's turnout roll without password hashes"""
+    for voter_id, name, has_voted, registration_date in db.iter_voter_roll(chunk_size, election_id):
+        yield voter_id, name, bool(has_voted), registration_date
+
+def audit_rows(db, chunk_size=1000, election_id=DEFAULT_ELECTION_ID):
+    """Yield one row per vote; votes are not linked to voters, so the audit stays anonymous"""
+    return db.iter_vote_audit(chunk_size, election_id)
+
+# Export name -> (column names, row generator)
+EXPORTS = {
+    'results': (('rank', 'candidate_id', 'name', 'party', 'votes', 'percentage'), results_rows),
+    'turnout': (('voter_id', 'name', 'has_voted', 'registration_date'), turnout_rows),
+    'audit': (('vote_id', 'election_id', 'vote_timestamp', 'candidate_id', 'candidate_name', 'party'), audit_rows),
+}
+
+def detect_format(path):
+    """
+    Guess format and compression from the file name
+    Returns: (file_format, compress)
+    """
+    name = path.lower()
+    compress = name.endswith('.gz')
+    if compress:
+        name = name[:-3]
+    file_format = 'jsonl' if name.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+    return file_format, compress
+
+def open_output(path, compress=False):
+    """Open a text file for writing, gzip-compressed if asked"""
+    if compress:
+        return gzip.open(path, 'wt', newline='', encoding='utf-8')
+    return open(path, 'w', newline='', encoding='utf-8')
+
+def write_csv(file, columns, rows):
+    """Write rows as CSV with a header, returning the row count"""
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_jsonl(file, columns, rows):
+    """Write rows as one JSON object per line, returning the row count"""
+    count = 0
+    for row in rows:
+        file.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+        file.write("\n")
+        count += 1
+    return count
+
+WRITERS = {
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+}
+
+def export(db, kind, path, file_format=None, compress=None, chunk_size=1000, election_id=DEFAULT_ELECTION_ID):
+    """
+    Stream one election's export to a file
+    file_format and compress default to what the file name suggests
+    Returns: number of rows written
+    """
+    if kind not in EXPORTS:
+        raise ValueError(f"Unknown export: {kind}")
+    if election_id not in {election[0] for election in db.get_elections()}:
+        raise ValueError(f"No such election: {election_id}")
+    detected_format, detected_compress = detect_format(path)
+    file_format = file_format or detected_format
+    compress = detected_compress if compress is None else compress
+    if file_format not in WRITERS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    
+    columns, rows = EXPORTS[kind]
+    with open_output(path, compress) as file:
+        return WRITERS[file_format](file, columns, rows(db, chunk_size, election_id))
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Export voting data as CSV or JSON Lines")
+    parser.add_argument('kind', choices=sorted(EXPORTS), help="what to export")
+    parser.add_argument('path', help="output file (.csv, .jsonl, optionally .gz)")
+    parser.add_argument('--format', choices=FORMATS, help="file format (default: from extension)")
+    parser.add_argument('--gzip', action='store_true', help="compress the output even without a .gz extension")
+    parser.add_argument('--db', default="voting_database.db", help="path to the voting database")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="rows fetched per database round trip")
+    parser.add_argument('--election', type=int, default=DEFAULT_ELECTION_ID,
+                        help="election to export (default: 1, the general election)")
+    args = parser.parse_args(argv)
+    
+    db = DatabaseManager(args.db)
+    started = time.perf_counter()
+    try:
+        count = export(db, args.kind, args.path, args.format, True if args.gzip else None, args.chunk_size, args.election)
+    except (OSError, ValueError) as e:
+        print(f"❌ Export failed: {e}")
+        return False
+    finally:
+        db.close()
+    
+    print(f"✓ Exported {count:,} {args.kind} rows to {args.path} in {time.perf_counter() - started:.1f}s")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
\ No newline at end of file
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# Code created by https://linktr.ee/saran709
+"""
+Federated tally across polling-station databases
+Each station runs its own voting_database.db. This counts any number of
+station files in parallel worker processes, checks that they all ran the same
+candidate list, and prints merged results with a per-station breakdown.
+
+Station files are opened read-only, so counting never changes them. Votes are
+recounted from the raw votes table and compared against each station's
+maintained tally; --trust-tally skips the recount. Stations without a
+maintained tally are always recounted. Stations holding several
+elections are counted for one of them, the general election unless --election
+picks another.
+
+Usage:
+    python federated_tally.py stations/ [--workers 8] [--json report.json]
+    python federated_tally.py north.db south.db east.db --trust-tally
+    python federated_tally.py stations/ --election 2
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from database_manager import DEFAULT_ELECTION_ID
+
+STATION_PATTERN = "*.db"
+
+def open_read_only(path):
+    """Open a station database without any chance of writing to it"""
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No such station database: {path}")
+    return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+
+def read_station(path, recount=True, election_id=DEFAULT_ELECTION_ID):
+    """
+    Count one election in a station database; runs in a worker process
+    Returns: dict with the candidate list, votes per candidate name, turnout,
+    and an 'error' message if the file could not be read
+    """
+    station = {'path': path, 'error': None}
+    try:
+        conn = open_read_only(path)
+        try:
+            cursor = conn.cursor()
+            # Stations from before elections were added only hold the general election
+            cursor.execute("PRAGMA table_info(candidates)")
+            if any(column[1] == 'election_id' for column in cursor.fetchall()):
+                scope, params = "election_id = ?", (election_id,)
+            elif election_id == DEFAULT_ELECTION_ID:
+                scope, params = "1", ()
+            else:
+                raise sqlite3.OperationalError(f"station has no election {election_id}")
+            
+            cursor.execute(f"""
+                SELECT candidate_id, name, COALESCE(party, '') FROM candidates WHERE {scope} ORDER BY candidate_id
+            """, params)
+            candidates = cursor.fetchall()
+            names = {candidate_id: name for candidate_id, name, _ in candidates}
+            
+            # Stations from before the maintained tally was added have only their votes to count
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vote_tally'")
+            has_tally = cursor.fetchone() is not None
+            if has_tally:
+                cursor.execute(f"SELECT candidate_id, vote_count FROM vote_tally WHERE {scope} AND vote_count != 0", params)
+                tally = dict(cursor.fetchall())
+            station['tally_mismatches'] = None
+            if recount or not has_tally:
+                cursor.execute(f"SELECT candidate_id, COUNT(*) FROM votes WHERE {scope} GROUP BY candidate_id", params)
+                counts = dict(cursor.fetchall())
+                if has_tally:
+                    mismatches = sorted(set(tally.items()) ^ set(counts.items()))
+                    station['tally_mismatches'] = len({candidate_id for candidate_id, _ in mismatches})
+            else:
+                counts = tally
+            
+            # The general election's roll is every registered voter; others list theirs in election_voters
+            if election_id == DEFAULT_ELECTION_ID:
+                cursor.execute("SELECT COUNT(*), COALESCE(SUM(has_voted), 0) FROM voters")
+            else:
+                cursor.execute("""
+                    SELECT COUNT(*), COALESCE(SUM(has_voted), 0) FROM election_voters WHERE election_id = ?
+                """, (election_id,))
+            station['registered'], station['voted'] = cursor.fetchone()
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error) as e:
+        station['error'] = str(e)
+        return station
+    
+    station['candidates'] = [(name, party) for _, name, party in candidates]
+    station['votes'] = {name: counts.get(candidate_id, 0) for candidate_id, name in names.items()}
+    # Votes for candidate ids that are not on the station's list cannot be merged by name
+    station['unknown_votes'] = sum(count for candidate_id, count in counts.items() if candidate_id not in names)
+    station['total_votes'] = sum(counts.values())
+    return station
+
+def expand_paths(paths):
+    """Expand directories to the station files inside them, dropping duplicates"""
+    expanded = []
+    seen = set()
+    for path in paths:
+        if os.path.isdir(path):
+            found = sorted(str(p) for p in Path(path).glob(STATION_PATTERN))
+        else:
+            found = [path]
+        for station_path in found:
+            real_path = os.path.realpath(station_path)
+            if real_path not in seen:
+                seen.add(real_path)
+                expanded.append(station_path)
+    return expanded
+
+def check_compatibility(stations):
+    """
+    Compare every station's candidate list with the list most stations share
+    Candidate ids are assigned per station, so lists are matched by name and party
+    Returns: (reference candidates, accepted stations, [(path, reason)] rejected)
+    """
+    readable = [station for station in stations if station['error'] is None]
+    rejected = [(station['path'], station['error']) for station in stations if station['error'] is not None]
+    if not readable:
+        return [], [], rejected
+    
+    lists = Counter(frozenset(station['candidates']) for station in readable)
+    reference = max(lists, key=lambda key: lists[key])
+    
+    accepted = []
+    for station in readable:
+        candidates = set(station['candidates'])
+        if candidates == reference:
+            accepted.append(station)
+            continue
+        problems = []
+        missing = sorted(name for name, _ in reference - candidates)
+        extra = sorted(name for name, _ in candidates - reference)
+        if missing:
+            problems.append(f"missing {', '.join(missing)}")
+        if extra:
+            problems.append(f"unexpected {', '.join(extra)}")
+        rejected.append((station['path'], f"candidate list differs: {'; '.join(problems)}"))
+    
+    # Report candidates in the order the first compatible station lists them
+    reference_order = [candidate for candidate in accepted[0]['candidates'] if candidate in reference]
+    return reference_order, accepted, rejected
+
+def merge_results(candidates, stations):
+    """
+    Add up compatible stations' votes
+    Returns: list of (name, party, votes) ordered by votes, highest first
+    """
+    totals = Counter()
+    for station in stations:
+        totals.update(station['votes'])
+    results = [(name, party, totals[name]) for name, party in candidates]
+    order = {name: index for index, (name, _) in enumerate(candidates)}
+    return sorted(results, key=lambda row: (-row[2], order[row[0]]))
+
+def federated_tally(paths, workers=None, recount=True, election_id=DEFAULT_ELECTION_ID):
+    """
+    Count one election across station databases in parallel and merge the compatible ones
+    workers: worker processes (default: one per CPU; 1 counts in this process)
+    Returns: report dict with merged results, accepted stations and rejected stations
+    """
+    paths = expand_paths(paths)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    started = time.perf_counter()
+    
+    count = partial(read_station, recount=recount, election_id=election_id)
+    if workers == 1:
+        stations = [count(path) for path in paths]
+    else:
+        # Hand out stations in batches so hundreds of small files don't cost a round trip each
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            stations = list(pool.map(count, paths, chunksize=chunksize))
+    
+    candidates, accepted, rejected = check_compatibility(stations)
+    results = merge_results(candidates, accepted)
+    return {
+        'results': results,
+        'total_votes': sum(votes for _, _, votes in results),
+        'registered': sum(station['registered'] for station in accepted),
+        'voted': sum(station['voted'] for station in accepted),
+        'stations': accepted,
+        'rejected': rejected,
+        'workers': workers,
+        'elapsed': time.perf_counter() - started,
+    }
+
+def print_report(report):
+    """Print merged results, the per-station breakdown and any rejected stations"""
+    total_votes = report['total_votes']
+    print("=" * 60)
+    print(f"FEDERATED RESULTS - {len(report['stations'])} station(s)")
+    print("=" * 60)
+    for rank, (name, party, votes) in enumerate(report['results'], 1):
+        percentage = votes / max(total_votes, 1) * 100
+        label = f"{name} ({party})" if party else name
+        print(f"{rank:>3}. {label:<36} {votes:>10,} {percentage:6.2f}%")
+    turnout = report['voted'] / max(report['registered'], 1) * 100
+    print(f"\nTotal votes: {total_votes:,}  |  Turnout: {report['voted']:,}/{report['registered']:,} ({turnout:.1f}%)")
+    
+    print("\nPer station:")
+    for station in report['stations']:
+        leader = max(station['votes'].items(), key=lambda item: item[1], default=("-", 0))[0]
+        print(f"  {station['path']:<40} {station['total_votes']:>8,} votes  leader: {leader}")
+        if station['tally_mismatches']:
+            print(f"    ⚠ maintained tally disagrees with the recount for {station['tally_mismatches']} candidate(s)")
+        if station['unknown_votes']:
+            print(f"    ⚠ {station['unknown_votes']:,} vote(s) for candidates not on the station's list")
+    
+    if report['rejected']:
+        print("\n❌ Not counted:")
+        for path, reason in report['rejected']:
+            print(f"  {path}: {reason}")
+    
+    print(f"\nCounted with {report['workers']} worker process(es) in {report['elapsed']:.2f}s")
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Merge results from many polling-station databases")
+    parser.add_argument('paths', nargs='+', help=f"station database files, or directories of {STATION_PATTERN} files")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--trust-tally', action='store_true',
+                        help="read each station's maintained tally instead of recounting its votes")
+    parser.add_argument('--election', type=int, default=DEFAULT_ELECTION_ID,
+                        help="election to count (default: 1, the general election)")
+    parser.add_argument('--json', dest='json_path', help="also write the full report to this JSON file")
+    args = parser.parse_args(argv)
+    
+    report = federated_tally(args.paths, workers=args.workers, recount=not args.trust_tally,
+                             election_id=args.election)
+    if not report['stations'] and not report['rejected']:
+        print("❌ No station databases found")
+        return False
+    print_report(report)
+    
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✓ Report written to {args.json_path}")
+    
+    # Results are still printed, but a count with stations left out needs attention
+    return not report['rejected']
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
\ No newline at end of file
@@ -2,14 +2,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from voting_system import VotingSystem
+from database_manager import DEFAULT_ELECTION_ID
 from admin_panel import AdminPanel
+from ui_worker import BackgroundWorker
 
 class VotingGUI:
     """
     Main GUI interface for the voting system
     """
     
-    def __init__(self):
+    def __init__(self, refresh_interval=AdminPanel.DEFAULT_REFRESH_INTERVAL):
+        """refresh_interval: milliseconds between the admin dashboard's checks for changes"""
         self.voting_system = VotingSystem()
         self.root = tk.Tk()
         self.root.title("Offline Voting System")
@@ -22,9 +25,16 @@ class VotingGUI:
         
         # Variables
         self.current_frame = None
+        self.elections = {}
+        self.election_id = DEFAULT_ELECTION_ID
+        
+        # Database calls run on a background worker so the window stays responsive
+        self.create_status_bar()
+        self.worker = BackgroundWorker(self.root, on_busy=self.set_busy)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         
         # Initialize admin panel
-        self.admin_panel = AdminPanel(self, self.voting_system)
+        self.admin_panel = AdminPanel(self, self.voting_system, refresh_interval)
         
         # Initialize the interface
         self.setup_login_screen()
@@ -34,6 +44,28 @@ class VotingGUI:
         if self.current_frame:
             self.current_frame.destroy()
     
+    def create_status_bar(self):
+        """Create the busy indicator shown while a background call is running"""
+        status_frame = tk.Frame(self.root, bg='#f0f0f0')
+        status_frame.pack(side='bottom', fill='x', padx=20, pady=(0, 5))
+        
+        self.busy_progress = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+        self.busy_progress.pack(side='right')
+        
+        self.status_label = tk.Label(status_frame, text="", font=('Arial', 9), bg='#f0f0f0', fg='#7f8c8d')
+        self.status_label.pack(side='right', padx=10)
+    
+    def set_busy(self, busy):
+        """Show or hide the busy indicator"""
+        if busy:
+            self.status_label.config(text="Working...")
+            self.busy_progress.start(15)
+            self.root.config(cursor='watch')
+        else:
+            self.status_label.config(text="")
+            self.busy_progress.stop()
+            self.root.config(cursor='')
+    
     def setup_login_screen(self):
         """Setup the login screen"""
         self.clear_frame()
@@ -73,7 +105,14 @@ class VotingGUI:
         self.voter_password_entry = tk.Entry(voter_frame, show="*", font=('Arial', 11))
         self.voter_password_entry.pack(pady=5, padx=10, fill='x')
         
-        voter_login_btn = tk.Button(
+        # Election to vote in; filled in once the list has loaded
+        tk.Label(voter_frame, text="Election:", bg='#f0f0f0').pack(pady=5)
+        self.election_var = tk.StringVar()
+        self.election_box = ttk.Combobox(voter_frame, textvariable=self.election_var, state='readonly')
+        self.election_box.pack(pady=5, padx=10, fill='x')
+        self.worker.submit(self.voting_system.get_elections, on_success=self.show_elections, key='elections', show_busy=False)
+        
+        self.voter_login_btn = tk.Button(
             voter_frame, 
             text="Login as Voter", 
             command=self.voter_login,
@@ -82,7 +121,7 @@ class VotingGUI:
             font=('Arial', 11, 'bold'),
             pady=10
         )
-        voter_login_btn.pack(pady=10, padx=10, fill='x')
+        self.voter_login_btn.pack(pady=10, padx=10, fill='x')
         
         # Admin Login Section
         admin_frame = tk.LabelFrame(
@@ -102,7 +141,7 @@ class VotingGUI:
         self.admin_password_entry = tk.Entry(admin_frame, show="*", font=('Arial', 11))
         self.admin_password_entry.pack(pady=5, padx=10, fill='x')
         
-        admin_login_btn = tk.Button(
+        self.admin_login_btn = tk.Button(
             admin_frame, 
             text="Login as Admin", 
             command=self.admin_login,
@@ -111,7 +150,7 @@ class VotingGUI:
             font=('Arial', 11, 'bold'),
             pady=10
         )
-        admin_login_btn.pack(pady=10, padx=10, fill='x')
+        self.admin_login_btn.pack(pady=10, padx=10, fill='x')
         
         # Information Section
         info_frame = tk.Frame(self.current_frame, bg='#f0f0f0')
@@ -153,6 +192,13 @@ Contact your system administrator for login credentials if needed.
         # Bind Enter key to login
         self.root.bind('<Return>', lambda event: self.voter_login())
     
+    def show_elections(self, elections):
+        """Offer the loaded elections on the login screen, keeping the current choice"""
+        self.elections = {name: election_id for election_id, name, _, _ in elections}
+        self.election_box.config(values=list(self.elections))
+        if self.election_var.get() not in self.elections and elections:
+            self.election_var.set(elections[0][1])
+    
     def voter_login(self):
         """Handle voter login"""
         voter_id = self.voter_id_entry.get().strip()
@@ -162,11 +208,27 @@ Contact your system administrator for login credentials if needed.
             messagebox.showerror("Error", "Please enter both Voter ID and Password")
             return
         
-        success, message, voter_name = self.voting_system.login_voter(voter_id, password)
+        self.election_id = election_id = self.elections.get(self.election_var.get(), DEFAULT_ELECTION_ID)
+        
+        def login():
+            success, message, voter_name = self.voting_system.login_voter(voter_id, password, election_id)
+            candidates = self.voting_system.get_candidates(election_id) if success else None
+            return success, message, voter_name, candidates
+        
+        self.worker.submit(
+            login,
+            on_success=self.on_voter_login,
+            disable=(self.voter_login_btn, self.admin_login_btn),
+            key='login'
+        )
+    
+    def on_voter_login(self, result):
+        """Show the outcome of a voter login"""
+        success, message, voter_name, candidates = result
         
         if success:
             messagebox.showinfo("Success", message)
-            self.setup_voting_screen(voter_name)
+            self.setup_voting_screen(voter_name, candidates)
         else:
             messagebox.showerror("Login Failed", message)
     
@@ -179,7 +241,16 @@ Contact your system administrator for login credentials if needed.
             messagebox.showerror("Error", "Please enter both Admin ID and Password")
             return
         
-        success, message = self.voting_system.login_admin(admin_id, password)
+        self.worker.submit(
+            self.voting_system.login_admin, admin_id, password,
+            on_success=self.on_admin_login,
+            disable=(self.voter_login_btn, self.admin_login_btn),
+            key='login'
+        )
+    
+    def on_admin_login(self, result):
+        """Show the outcome of an admin login"""
+        success, message = result
         
         if success:
             messagebox.showinfo("Success", message)
@@ -187,7 +258,7 @@ Contact your system administrator for login credentials if needed.
         else:
             messagebox.showerror("Login Failed", message)
     
-    def setup_voting_screen(self, voter_name):
+    def setup_voting_screen(self, voter_name, candidates=None):
         """Setup the voting screen for voters"""
         self.clear_frame()
         
@@ -236,8 +307,9 @@ Contact your system administrator for login credentials if needed.
         )
         candidates_frame.pack(fill='both', expand=True, pady=10)
         
-        # Get candidates
-        candidates = self.voting_system.get_candidates()
+        # Get candidates (normally already loaded by the login call)
+        if candidates is None:
+            candidates = self.voting_system.get_candidates(self.election_id)
         
         if not candidates:
             no_candidates_label = tk.Label(
@@ -302,7 +374,7 @@ Contact your system administrator for login credentials if needed.
                 desc_label.pack(anchor='w')
         
         # Vote button
-        vote_btn = tk.Button(
+        self.vote_btn = tk.Button(
             self.current_frame, 
             text="Cast Vote", 
             command=self.cast_vote,
@@ -311,7 +383,7 @@ Contact your system administrator for login credentials if needed.
             font=('Arial', 14, 'bold'),
             pady=15
         )
-        vote_btn.pack(pady=20, padx=50, fill='x')
+        self.vote_btn.pack(pady=20, padx=50, fill='x')
     
     def cast_vote(self):
         """Handle vote casting"""
@@ -319,11 +391,16 @@ Contact your system administrator for login credentials if needed.
             messagebox.showerror("Error", "Please select a candidate before casting your vote")
             return
         
-        # Confirm vote
         candidate_id = self.selected_candidate.get()
-        candidates = self.voting_system.get_candidates()
-        candidate_info = next((c for c in candidates if c[0] == candidate_id), None)
-        
+        self.worker.submit(
+            self.voting_system.get_candidate, candidate_id,
+            on_success=lambda candidate_info: self.confirm_vote(candidate_id, candidate_info),
+            disable=(self.vote_btn,),
+            key='vote'
+        )
+    
+    def confirm_vote(self, candidate_id, candidate_info):
+        """Ask the voter to confirm their choice, then cast the vote"""
         if not candidate_info:
             messagebox.showerror("Error", "Invalid candidate selection")
             return
@@ -347,7 +424,16 @@ Contact your system administrator for login credentials if needed.
             return
         
         # Cast the vote
-        success, message = self.voting_system.cast_vote(candidate_id)
+        self.worker.submit(
+            self.voting_system.cast_vote, candidate_id,
+            on_success=lambda result: self.on_vote_cast(result, candidate_name, candidate_party),
+            disable=(self.vote_btn,),
+            key='vote'
+        )
+    
+    def on_vote_cast(self, result, candidate_name, candidate_party):
+        """Show the outcome of casting a vote"""
+        success, message = result
         
         if success:
             messagebox.showinfo("Success", message)
@@ -439,6 +525,12 @@ Contact your system administrator for login credentials if needed.
         self.voting_system.logout()
         self.setup_login_screen()
     
+    def close(self):
+        """Stop background work and close the window"""
+        self.admin_panel.stop_auto_refresh()
+        self.worker.shutdown()
+        self.root.destroy()
+    
     def run(self):
         """Start the GUI application"""
         self.root.mainloop()
\ No newline at end of file
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# Code created by https://linktr.ee/saran709
+"""
+Import a voter roll into the voting system database
+Streams a CSV or JSON Lines file through DatabaseManager.register_voters_bulk,
+so the whole roll is never held in memory.
+
+CSV files need a header row with voter_id, name and password columns.
+JSONL files need one object per line with the same keys.
+
+With --election, every voter in the file is also put on that election's roll,
+including voters who were already registered.
+
+Usage:
+    python import_voters.py roll.csv [--db voting_database.db] [--chunk-size 1000]
+    python import_voters.py roll.jsonl --format jsonl
+    python import_voters.py council_roll.csv --election 2
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from database_manager import DatabaseManager, DEFAULT_ELECTION_ID
+
+REQUIRED_FIELDS = ('voter_id', 'name', 'password')
+
+def read_csv_rows(file):
+    """Yield (line_number, record) for each voter in a CSV file with a header row"""
+    reader = csv.DictReader(file)
+    missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+    
+    for row in reader:
+        yield reader.line_num, row
+
+def read_jsonl_rows(file):
+    """Yield (line_number, record) for each voter in a JSON Lines file"""
+    for line_number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number} is not valid JSON: {e}")
+        yield line_number, record
+
+READERS = {
+    'csv': read_csv_rows,
+    'jsonl': read_jsonl_rows,
+}
+
+def detect_format(path):
+    """Guess the roll format from the file extension"""
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+def voter_tuples(records, invalid):
+    """
+    Convert (line_number, record) pairs to (voter_id, name, password) tuples,
+    collecting (line_number, record) for rows that are incomplete or not objects
+    """
+    for line_number, record in records:
+        if not isinstance(record, dict):
+            invalid.append((line_number, record))
+            continue
+        values = tuple(str(record.get(field) or '').strip() for field in REQUIRED_FIELDS)
+        if all(values):
+            yield values
+        else:
+            invalid.append((line_number, record))
+
+class ProgressReporter:
+    """
+    Prints rows processed and rows/sec while an import runs
+    """
+    
+    def __init__(self, interval=1.0, stream=sys.stdout):
+        self.interval = interval
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.last_report = 0.0
+    
+    def __call__(self, processed, registered, duplicates):
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(processed, registered, duplicates, now)
+    
+    def report(self, processed, registered, duplicates, now=None):
+        """Write one progress line"""
+        elapsed = max((now or time.perf_counter()) - self.started, 1e-9)
+        self.stream.write(
+            f"\r  {processed:,} rows | {registered:,} registered | "
+            f"{duplicates:,} duplicates | {processed / elapsed:,.0f} rows/sec"
+        )
+        self.stream.flush()
+
+def import_roll(db, path, file_format=None, chunk_size=1000, quiet=False, election_id=DEFAULT_ELECTION_ID):
+    """
+    Stream a roll file into the database, putting its voters on election_id's roll
+    Returns: dict with processed, registered, duplicates, invalid (line_number, record)
+    pairs and elapsed seconds
+    """
+    file_format = file_format or detect_format(path)
+    invalid = []
+    reporter = None if quiet else ProgressReporter()
+    started = time.perf_counter()
+    
+    with open(path, newline='', encoding='utf-8') as file:
+        records = voter_tuples(READERS[file_format](file), invalid)
+        registered, duplicates = db.register_voters_bulk(records, chunk_size, reporter, election_id)
+    
+    elapsed = time.perf_counter() - started
+    processed = registered + len(duplicates)
+    if reporter:
+        reporter.report(processed, registered, len(duplicates))
+        print()
+    
+    return {
+        'processed': processed,
+        'registered': registered,
+        'duplicates': duplicates,
+        'invalid': invalid,
+        'elapsed': elapsed,
+    }
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Import a voter roll from CSV or JSON Lines")
+    parser.add_argument('path', help="roll file to import")
+    parser.add_argument('--format', choices=sorted(READERS), help="file format (default: from extension)")
+    parser.add_argument('--db', default="voting_database.db", help="path to the voting database")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="rows per transaction")
+    parser.add_argument('--quiet', action='store_true', help="suppress progress output")
+    parser.add_argument('--election', type=int, default=DEFAULT_ELECTION_ID,
+                        help="also put the file's voters on this election's roll (default: 1, which includes everyone)")
+    args = parser.parse_args(argv)
+    
+    print(f"Importing voters from {args.path}...")
+    db = DatabaseManager(args.db)
+    try:
+        summary = import_roll(db, args.path, args.format, args.chunk_size, args.quiet, args.election)
+    except (OSError, ValueError) as e:
+        print(f"❌ Import failed: {e}")
+        return False
+    finally:
+        db.close()
+    
+    rate = summary['processed'] / max(summary['elapsed'], 1e-9)
+    print(f"✓ Registered {summary['registered']:,} voters in {summary['elapsed']:.1f}s ({rate:,.0f} rows/sec)")
+    if args.election != DEFAULT_ELECTION_ID:
+        print(f"✓ Voters in the file are on election {args.election}'s roll")
+    if summary['duplicates']:
+        print(f"⚠ Skipped {len(summary['duplicates']):,} duplicate voter ID(s)")
+        for voter_id in summary['duplicates'][:10]:
+            print(f"  - {voter_id}")
+        if len(summary['duplicates']) > 10:
+            print(f"  ... and {len(summary['duplicates']) - 10:,} more")
+    if summary['invalid']:
+        print(f"⚠ Skipped {len(summary['invalid']):,} row(s) with missing fields or that are not objects")
+        for line_number, record in summary['invalid'][:10]:
+            print(f"  - line {line_number}: {record!r}")
+        if len(summary['invalid']) > 10:
+            print(f"  ... and {len(summary['invalid']) - 10:,} more")
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
\ No newline at end of file
@@ -0,0 +1,145 @@
+# Code created by https://linktr.ee/saran709
+"""
+Instant-runoff (ranked-choice) counting
+Ranked ballots are stored as packed arrays of candidate ids. The count keeps
+every ballot's preferences in one flat array with a pointer to its current
+choice, and each candidate holds the list of ballots counting for them. When
+a candidate is eliminated only their ballots are moved on, so each ballot is
+looked at once per preference it uses instead of once per round.
+"""
+
+import sys
+from array import array
+
+# Rankings are stored as little-endian unsigned 32-bit candidate ids, most preferred first
+RANKING_TYPECODE = 'I'
+
+def pack_ranking(candidate_ids):
+    """Pack a ranking into the compact blob stored in ranked_ballots"""
+    ranking = array(RANKING_TYPECODE, candidate_ids)
+    if sys.byteorder == 'big':
+        ranking.byteswap()
+    return ranking.tobytes()
+
+def unpack_ranking(blob):
+    """Unpack a stored ranking into an array of candidate ids"""
+    ranking = array(RANKING_TYPECODE)
+    ranking.frombytes(blob)
+    if sys.byteorder == 'big':
+        ranking.byteswap()
+    return ranking
+
+def instant_runoff(ballots, candidate_ids=None):
+    """
+    Count ranked ballots by instant runoff
+    ballots: iterable of (ranking, count); a ranking lists candidate ids, most preferred first
+    candidate_ids: candidates standing (default: everyone ranked on some ballot);
+    preferences for anyone else are skipped
+
+    Each round, a candidate with more than half of the continuing ballots wins. Otherwise the
+    last-placed candidate is eliminated and their ballots move to their next continuing preference.
+    A tie for last place goes against whoever had fewer votes in the latest earlier round that
+    separates them, then against the candidate listed later.
+    Returns: dict with winner (candidate id, or None without votes), ballots, exhausted and rounds;
+    each round has counts {candidate_id: votes}, continuing, exhausted, eliminated and
+    transfers {candidate_id or None for exhausted: votes}
+    """
+    ids = []
+    positions = {}
+    for candidate_id in candidate_ids or ():
+        if candidate_id not in positions:
+            positions[candidate_id] = len(ids)
+            ids.append(candidate_id)
+    standing = len(ids) if candidate_ids is not None else None
+    
+    # Ballot b prefers prefs[pointer[b]:ends[b]] in order; pointer[b] is the choice it counts for
+    prefs = array('I')
+    pointer = array('Q')
+    ends = array('Q')
+    weights = array('Q')
+    for ranking, count in ballots:
+        if count <= 0:
+            continue
+        pointer.append(len(prefs))
+        for candidate_id in ranking:
+            position = positions.get(candidate_id)
+            if position is None:
+                position = positions[candidate_id] = len(ids)
+                ids.append(candidate_id)
+            prefs.append(position)
+        ends.append(len(prefs))
+        weights.append(count)
+    
+    continuing = bytearray(len(ids))
+    for position in range(len(ids) if standing is None else standing):
+        continuing[position] = 1
+    counts = [0] * len(ids)
+    piles = [array('Q') for _ in ids]
+    exhausted = 0
+    
+    def advance(ballot):
+        """Move a ballot to its highest continuing preference; returns that position, or None if exhausted"""
+        nonlocal exhausted
+        index = pointer[ballot]
+        end = ends[ballot]
+        while index < end and not continuing[prefs[index]]:
+            index += 1
+        pointer[ballot] = index
+        if index == end:
+            exhausted += weights[ballot]
+            return None
+        position = prefs[index]
+        piles[position].append(ballot)
+        counts[position] += weights[ballot]
+        return position
+    
+    for ballot in range(len(weights)):
+        advance(ballot)
+    
+    rounds = []
+    history = []
+    winner = None
+    while True:
+        active = [position for position in range(len(ids)) if continuing[position]]
+        if not active:
+            break
+        votes = sum(counts[position] for position in active)
+        current = {
+            'round': len(rounds) + 1,
+            'counts': {ids[position]: counts[position] for position in active},
+            'continuing': votes,
+            'exhausted': exhausted,
+            'eliminated': None,
+            'transfers': {},
+        }
+        rounds.append(current)
+        if votes == 0:
+            break
+        
+        leader = max(active, key=lambda position: counts[position])
+        if counts[leader] * 2 > votes or len(active) == 1:
+            winner = ids[leader]
+            break
+        
+        loser = min(active, key=lambda position: (
+            counts[position], [earlier[position] for earlier in reversed(history)], -position
+        ))
+        history.append(list(counts))
+        continuing[loser] = 0
+        moved, piles[loser] = piles[loser], array('Q')
+        counts[loser] = 0
+        
+        transfers = {}
+        for ballot in moved:
+            position = advance(ballot)
+            key = ids[position] if position is not None else None
+            transfers[key] = transfers.get(key, 0) + weights[ballot]
+        current['eliminated'] = ids[loser]
+        current['transfers'] = transfers
+    
+    return {
+        'winner': winner,
+        'ballots': sum(weights),
+        'exhausted': exhausted,
+        'rounds': rounds,
+    }
\ No newline at end of file
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# Code created by https://linktr.ee/saran709
+"""
+Concurrent kiosk load generator
+Simulates many voters at once. Each simulated voter logs in with real
+credentials, fetches the ballot and casts a vote, either against
+VotingSystem in this process or over the JSON API (api_server.py). For each
+phase it reports throughput, p50/p95/p99 latency and how many calls failed
+on a locked database, which shows how many kiosks one machine can serve.
+
+Credentials come from a freshly seeded synthetic roll (--seed) or from a roll
+file in the import_voters.py format (--roll) matching the target database.
+
+Usage:
+    python load_generator.py --seed 2000 --concurrency 32
+    python load_generator.py --seed 2000 --concurrency 32 --serve --output load.json
+    python load_generator.py --roll roll.csv --api http://127.0.0.1:8080 --concurrency 64
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+from api_server import ApiServer
+from benchmark import generate_database, percentile, voter_id_for, VOTER_PASSWORD
+from database_manager import DatabaseManager
+from import_voters import READERS, detect_format
+from password_hasher import PasswordHasher
+from voting_system import VotingSystem
+
+PHASES = ('login', 'ballot', 'vote')
+
+class DirectClient:
+    """One simulated kiosk calling a shared VotingSystem in this process"""
+    
+    def __init__(self, voting_system):
+        self.voting_system = voting_system
+        self.session = None
+    
+    def login(self, voter_id, password):
+        """Returns: (success, message)"""
+        success, message, self.session = self.voting_system.login_voter_session(voter_id, password)
+        return success, message
+    
+    def ballot(self):
+        """Returns: list of candidate ids"""
+        return [candidate[0] for candidate in self.voting_system.get_candidates()]
+    
+    def vote(self, candidate_id):
+        """Returns: (success, message)"""
+        return self.voting_system.cast_vote(candidate_id, session=self.session)
+    
+    def logout(self):
+        """End the current session"""
+        if self.session is not None:
+            self.voting_system.logout(self.session)
+            self.session = None
+    
+    def close(self):
+        """Nothing to release for in-process calls"""
+        self.logout()
+
+class ApiClient:
+    """One simulated kiosk talking to the JSON API over a keep-alive connection"""
+    
+    def __init__(self, host, port, timeout=60):
+        self.conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.token = None
+    
+    def request(self, method, path, payload=None):
+        """
+        Send one request
+        Returns: (status, decoded body)
+        """
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        body = json.dumps(payload) if payload is not None else None
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read() or b'{}')
+    
+    def login(self, voter_id, password):
+        """Returns: (success, message)"""
+        status, body = self.request('POST', '/api/login', {'user_id': voter_id, 'password': password})
+        self.token = body.get('token')
+        return status == 200, body.get('message') or body.get('error', f"HTTP {status}")
+    
+    def ballot(self):
+        """Returns: list of candidate ids"""
+        status, body = self.request('GET', '/api/candidates')
+        if status != 200:
+            raise RuntimeError(body.get('error', f"HTTP {status}"))
+        return [candidate['candidate_id'] for candidate in body['candidates']]
+    
+    def vote(self, candidate_id):
+        """Returns: (success, message)"""
+        status, body = self.request('POST', '/api/vote', {'candidate_id': candidate_id})
+        return status == 200, body.get('message') or body.get('error', f"HTTP {status}")
+    
+    def logout(self):
+        """End the current session"""
+        if self.token:
+            self.request('POST', '/api/logout')
+            self.token = None
+    
+    def close(self):
+        """Close the connection"""
+        self.conn.close()
+
+class LoadRecorder:
+    """
+    Collects per-phase latencies and failures from all simulated voters
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {phase: {'latencies': [], 'errors': 0, 'lock_errors': 0} for phase in PHASES}
+        self.error_samples = []
+    
+    def record(self, phase, elapsed, error=None):
+        """Add one timed call; error is the failure message, if it failed"""
+        with self._lock:
+            stats = self.phases[phase]
+            stats['latencies'].append(elapsed)
+            if error is None:
+                return
+            stats['errors'] += 1
+            if is_lock_error(error):
+                stats['lock_errors'] += 1
+            if len(self.error_samples) < 10:
+                self.error_samples.append(f"{phase}: {error}")
+    
+    def report(self, wall, voters, concurrency, target):
+        """Summarize the run as a JSON-friendly dict"""
+        phases = {}
+        for phase, stats in self.phases.items():
+            latencies = stats['latencies']
+            ok = len(latencies) - stats['errors']
+            phases[phase] = {
+                'count': len(latencies),
+                'ok': ok,
+                'errors': stats['errors'],
+                'lock_errors': stats['lock_errors'],
+                'per_second': ok / wall if wall > 0 else 0.0,
+                'p50_ms': percentile(latencies, 0.50) * 1000,
+                'p95_ms': percentile(latencies, 0.95) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+                'mean_ms': sum(latencies) / max(len(latencies), 1) * 1000,
+                'max_ms': max(latencies, default=0.0) * 1000,
+            }
+        return {
+            'target': target,
+            'concurrency': concurrency,
+            'voters': voters,
+            'votes_cast': phases['vote']['ok'],
+            'wall_seconds': wall,
+            'votes_per_second': phases['vote']['ok'] / wall if wall > 0 else 0.0,
+            'phases': phases,
+            'error_samples': self.error_samples,
+        }
+
+def is_lock_error(message):
+    """Whether a failure came from SQLite lock contention"""
+    message = str(message).lower()
+    return 'locked' in message or 'busy' in message
+
+def timed_call(recorder, phase, call):
+    """
+    Time call() as one phase; a (success, message) result or an exception counts as a failure
+    Returns: the call's result, or None if it failed
+    """
+    started = time.perf_counter()
+    try:
+        result = call()
+    except Exception as e:
+        recorder.record(phase, time.perf_counter() - started, f"{type(e).__name__}: {e}")
+        return None
+    
+    elapsed = time.perf_counter() - started
+    if isinstance(result, tuple) and not result[0]:
+        recorder.record(phase, elapsed, result[1])
+        return None
+    recorder.record(phase, elapsed)
+    return result
+
+def simulate_voter(client, voter_id, password, rng, recorder):
+    """Log in, fetch the ballot and vote, stopping at the first phase that fails"""
+    try:
+        if timed_call(recorder, 'login', lambda: client.login(voter_id, password)) is None:
+            return
+        candidate_ids = timed_call(recorder, 'ballot', client.ballot)
+        if not candidate_ids:
+            return
+        timed_call(recorder, 'vote', lambda: client.vote(rng.choice(candidate_ids)))
+    finally:
+        try:
+            client.logout()
+        except Exception:
+            pass
+
+def run_load(make_client, credentials, concurrency, target="direct"):
+    """
+    Run one simulated voter per credential on concurrency threads, each with its own client
+    Returns: report dict (see LoadRecorder.report)
+    """
+    recorder = LoadRecorder()
+    lock = threading.Lock()
+    pending = iter(credentials)
+    
+    def kiosk(number):
+        rng = random.Random(number)
+        client = make_client()
+        try:
+            while True:
+                with lock:
+                    credential = next(pending, None)
+                if credential is None:
+                    return
+                simulate_voter(client, credential[0], credential[1], rng, recorder)
+        finally:
+            client.close()
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=kiosk, args=(i,), name=f"kiosk-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    
+    return recorder.report(wall, len(credentials), concurrency, target)
+
+def load_credentials(path, file_format=None, limit=None):
+    """Read (voter_id, password) pairs from a roll file in the import_voters.py format"""
+    credentials = []
+    with open(path, newline='', encoding='utf-8') as file:
+        for _, record in READERS[file_format or detect_format(path)](file):
+            if not isinstance(record, dict):
+                continue
+            voter_id = str(record.get('voter_id') or '').strip()
+            password = str(record.get('password') or '')
+            if voter_id and password:
+                credentials.append((voter_id, password))
+            if limit and len(credentials) >= limit:
+                break
+    return credentials
+
+def print_report(report):
+    """Print the per-phase table"""
+    print(f"\n{report['voters']:,} voters, {report['concurrency']} concurrent kiosks ({report['target']}): "
+          f"{report['votes_cast']:,} votes in {report['wall_seconds']:.2f}s "
+          f"= {report['votes_per_second']:,.1f} votes/sec")
+    print(f"{'Phase':<8} {'Count':>7} {'Errors':>7} {'Locked':>7} {'ops/sec':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for phase, stats in report['phases'].items():
+        print(f"{phase:<8} {stats['count']:>7,} {stats['errors']:>7,} {stats['lock_errors']:>7,} "
+              f"{stats['per_second']:>9,.1f} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}")
+    if report['error_samples']:
+        print("\nSample failures:")
+        for sample in report['error_samples']:
+            print(f"  - {sample}")
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Simulate many kiosks voting at once")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--seed', type=int, metavar='VOTERS', help="seed a fresh synthetic roll of this many voters")
+    source.add_argument('--roll', help="roll file (CSV/JSONL with voter_id and password) for an existing database")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--api', metavar='URL', help="vote through a running API server, e.g. http://127.0.0.1:8080")
+    target.add_argument('--serve', action='store_true', help="start a local API server for the run and vote through it")
+    parser.add_argument('--db', help="database to use (default: a temporary one when seeding)")
+    parser.add_argument('--concurrency', type=int, default=16, help="simulated kiosks voting at once")
+    parser.add_argument('--limit', type=int, help="simulate at most this many voters from --roll")
+    parser.add_argument('--kdf-iterations', type=int, default=PasswordHasher.DEFAULT_ITERATIONS,
+                        help="password hashing cost of the seeded roll")
+    parser.add_argument('--group-commit', action='store_true', help="commit concurrent votes in batches")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--keep', action='store_true', help="keep a temporary seeded database")
+    args = parser.parse_args(argv)
+    
+    if args.roll and not args.db and not args.api:
+        parser.error("--roll needs the --db its voters are registered in (or --api)")
+    
+    temp_dir = None
+    db = None
+    server = None
+    voting_system = None
+    try:
+        db_path = args.db
+        if args.seed:
+            if db_path and os.path.exists(db_path):
+                print(f"❌ {db_path} already exists; --seed needs a new database file")
+                return False
+            if not db_path:
+                temp_dir = tempfile.mkdtemp(prefix="voting_load_")
+                db_path = os.path.join(temp_dir, "load.db")
+            print(f"Seeding {args.seed:,} voters into {db_path} ({args.kdf_iterations:,} KDF iterations)...")
+            generate_database(db_path, args.seed, voted_fraction=0, kdf_iterations=args.kdf_iterations)
+            credentials = [(voter_id_for(i), VOTER_PASSWORD) for i in range(args.seed)]
+        else:
+            credentials = load_credentials(args.roll, limit=args.limit)
+            if not credentials:
+                print(f"❌ No voter credentials found in {args.roll}")
+                return False
+        
+        if args.api:
+            url = urlsplit(args.api if "//" in args.api else f"http://{args.api}")
+            host, port, target = url.hostname, url.port or 80, args.api
+        else:
+            db = DatabaseManager(db_path, pool_size=max(8, args.concurrency), kdf_iterations=args.kdf_iterations)
+            voting_system = VotingSystem(db, group_commit=args.group_commit)
+            target = "direct"
+            if args.serve:
+                server = ApiServer(voting_system, port=0, max_workers=args.concurrency)
+                host, port = "127.0.0.1", server.run_in_thread()
+                target = f"api (local server on port {port})"
+        
+        if args.api or args.serve:
+            make_client = lambda: ApiClient(host, port)
+        else:
+            make_client = lambda: DirectClient(voting_system)
+        
+        print(f"Running {len(credentials):,} simulated voters on {args.concurrency} kiosks ({target})...")
+        report = run_load(make_client, credentials, args.concurrency, target)
+    except (OSError, ValueError) as e:
+        print(f"❌ Load run failed: {e}")
+        return False
+    finally:
+        if server is not None:
+            server.stop()
+        if voting_system is not None and voting_system.vote_writer is not None:
+            voting_system.vote_writer.stop()
+        if db is not None:
+            db.close()
+        if temp_dir and not args.keep:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.output}")
+    # Every simulated voter should get through to a counted vote
+    return report['votes_cast'] == report['voters']
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
\ No newline at end of file
@@ -8,7 +8,15 @@ This is a secure offline voting system that uses SQLite for data storage.
 Features include voter authentication, candidate management, and real-time results.
 
 Usage:
-    python main.py
+    python main.py [--metrics-file metrics.json] [--refresh-ms 1000]
+    python main.py --headless tally stations/ [--workers 8]
+    python main.py --headless import roll.csv
+    python main.py --headless export results results.csv
+    python main.py --headless stats [--db voting_database.db] [--election 2] [--json]
+    python main.py --headless serve [--host 0.0.0.0] [--port 8080]
+
+Headless commands never import tkinter, so they run on servers without a
+display and start quickly. Each accepts --help.
 
 Requirements:
     - Python 3.7 or higher
@@ -18,9 +26,22 @@ Author: Voting System Development Team
 Version: 1.0
 """
 
+import argparse
+import importlib
+import json
 import sys
 import os
-from gui import VotingGUI
+
+# Headless command -> (module whose main(argv) runs it, description); stats is handled here
+HEADLESS_COMMANDS = {
+    'tally': ('federated_tally', "merge results from polling-station databases"),
+    'import': ('import_voters', "import a voter roll from CSV or JSON Lines"),
+    'export': ('exporters', "export results, the turnout roll or the vote audit"),
+    'maintenance': ('db_maintenance', "verify or rebuild the tally, checkpoint the WAL"),
+    'stats': (None, "print turnout and results"),
+    'serve': ('api_server', "serve the JSON API for thin-client kiosks"),
+    'load': ('load_generator', "simulate many kiosks voting at once"),
+}
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -30,35 +51,82 @@ def check_python_version():
         sys.exit(1)
 
 def check_tkinter():
-    """Check if tkinter is available"""
+    """
+    Check if tkinter is available
+    VotingGUI creates the real window, so no throwaway Tk root is opened here
+    """
     try:
-        import tkinter as tk
-        # Test if tkinter is working
-        test_root = tk.Tk()
-        test_root.withdraw()  # Hide the test window
-        test_root.destroy()
+        import tkinter
         return True
     except ImportError:
         print("Error: tkinter is not available.")
         print("Please install tkinter or use a Python distribution that includes it.")
+        print("Headless commands still work: python main.py --headless --help")
         return False
-    except Exception as e:
-        print(f"Error: tkinter test failed: {e}")
+
+def show_stats(argv):
+    """Print turnout and results straight from the database"""
+    parser = argparse.ArgumentParser(prog="main.py --headless stats", description="Print turnout and results")
+    parser.add_argument('--db', default="voting_database.db", help="path to the voting database")
+    parser.add_argument('--election', type=int, default=1, help="election to report (default: 1, the general election)")
+    parser.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
         return False
+    
+    from database_manager import DatabaseManager
+    db = DatabaseManager(args.db)
+    try:
+        if args.election not in {election[0] for election in db.get_elections()}:
+            print(f"❌ No such election: {args.election}")
+            return False
+        stats = db.get_statistics(args.election)
+        results = db.get_voting_results(args.election)
+    finally:
+        db.close()
+    
+    if args.json:
+        stats['results'] = [
+            {'candidate_id': candidate_id, 'name': name, 'party': party or "", 'votes': votes}
+            for candidate_id, name, party, votes in results
+        ]
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+        return True
+    
+    print(f"Voters: {stats['total_voters']:,}  |  Votes: {stats['total_votes']:,}  |  "
+          f"Turnout: {stats['voter_turnout']:.1f}%")
+    for rank, (candidate_id, name, party, votes) in enumerate(results, 1):
+        percentage = votes / max(stats['total_votes'], 1) * 100
+        label = f"{name} ({party})" if party else name
+        print(f"{rank:>3}. {label:<40} {votes:>8,} {percentage:6.1f}%")
+    return True
 
-def main():
-    """Main application entry point"""
-    print("Starting Offline Voting System...")
+def run_headless(command, argv):
+    """Run one headless command; its module is only imported when it is used"""
+    module_name = HEADLESS_COMMANDS[command][0]
+    if module_name is None:
+        return show_stats(argv)
     
-    # Check system requirements
-    check_python_version()
+    module = importlib.import_module(module_name)
+    return module.main(argv)
+
+def run_gui(args):
+    """Start the Tk interface"""
+    print("Starting Offline Voting System...")
     
     if not check_tkinter():
-        sys.exit(1)
+        return False
     
     try:
+        # Imported here so headless commands never load tkinter
+        from gui import VotingGUI
+        
         # Create and run the GUI application
-        app = VotingGUI()
+        app = VotingGUI(refresh_interval=args.refresh_ms)
+        if args.metrics_file:
+            app.voting_system.metrics.dump_at_exit(args.metrics_file)
         print("Application initialized successfully.")
         print("Contact system administrator for admin credentials.")
         print("GUI is now running...")
@@ -67,7 +135,6 @@ def main():
         
     except KeyboardInterrupt:
         print("\nApplication interrupted by user.")
-        sys.exit(0)
     except Exception as e:
         print(f"Error: Failed to start application: {e}")
         print("Please check that all required files are present:")
@@ -75,7 +142,40 @@ def main():
         print("- voting_system.py") 
         print("- gui.py")
         print("- admin_panel.py")
-        sys.exit(1)
+        print("Without a display, use: python main.py --headless --help")
+        return False
+    
+    return True
+
+def main(argv=None):
+    """Main application entry point"""
+    commands = "\n".join(f"  {name:<12} {description}" for name, (_, description) in HEADLESS_COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        description="Offline Voting System",
+        epilog=f"headless commands:\n{commands}",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--headless', action='store_true', help="run a command without the GUI")
+    parser.add_argument('--metrics-file', help="write per-operation timings to this JSON file on exit (GUI)")
+    parser.add_argument('--refresh-ms', type=int, default=1000,
+                        help="milliseconds between the admin dashboard's checks for changes (GUI, default: 1000)")
+    parser.add_argument('command', nargs='?', choices=list(HEADLESS_COMMANDS), help=argparse.SUPPRESS)
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    # Check system requirements
+    check_python_version()
+    
+    if args.headless:
+        if not args.command:
+            parser.error("--headless needs a command")
+        return run_headless(args.command, args.args)
+    if args.command:
+        parser.error(f"'{args.command}' is a headless command; use --headless {args.command}")
+    if args.refresh_ms < 1:
+        parser.error("--refresh-ms must be at least 1")
+    
+    return run_gui(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(0 if main() else 1)
\ No newline at end of file
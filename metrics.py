@@ -0,0 +1,194 @@
+# Code created by https://linktr.ee/saran709
+import atexit
+import functools
+import inspect
+import json
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from types import GeneratorType
+
+# Upper bounds of the latency histogram buckets, in milliseconds; slower calls go in a final overflow bucket
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class OperationStats:
+    """
+    Call count, error count and latency histogram for one operation.
+    Fixed buckets keep recording O(1) and memory constant however many calls are made.
+    """
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    
+    def record(self, elapsed_ms, error=False):
+        """Add one call that took elapsed_ms"""
+        self.calls += 1
+        if error:
+            self.errors += 1
+        self.total += elapsed_ms
+        if elapsed_ms > self.max:
+            self.max = elapsed_ms
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+    
+    def percentile(self, p):
+        """Estimate a latency percentile as the upper bound of the bucket it falls in"""
+        if not self.calls:
+            return 0.0
+        rank = p / 100 * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return min(LATENCY_BUCKETS_MS[index], self.max)
+                break
+        return self.max
+    
+    def to_dict(self):
+        """Summary with histogram, suitable for JSON"""
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / max(self.calls, 1), 3),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max, 3),
+            'histogram': {label: count for label, count in zip(labels, self.buckets) if count},
+        }
+
+class MetricsRegistry:
+    """
+    Thread-safe collection of per-operation stats plus gauges read when a snapshot is taken
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations = {}
+        self.gauges = {}
+        self.started = datetime.now()
+    
+    def record(self, name, elapsed_ms, error=False):
+        """Record one call of the named operation"""
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats()
+            stats.record(elapsed_ms, error)
+    
+    def add_gauge(self, name, read):
+        """Report read() under name in every snapshot (e.g. connections opened)"""
+        self.gauges[name] = read
+    
+    def snapshot(self):
+        """
+        Get the current counters
+        Returns: dict of started, uptime_seconds, operations (name -> summary) and gauges
+        """
+        with self._lock:
+            operations = {name: stats.to_dict() for name, stats in sorted(self.operations.items())}
+        
+        gauges = {}
+        for name, read in self.gauges.items():
+            try:
+                gauges[name] = read()
+            except Exception as e:
+                gauges[name] = f"unavailable: {e}"
+        
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'uptime_seconds': round((datetime.now() - self.started).total_seconds(), 1),
+            'operations': operations,
+            'gauges': gauges,
+        }
+    
+    def reset(self):
+        """Forget all recorded calls"""
+        with self._lock:
+            self.operations = {}
+            self.started = datetime.now()
+    
+    def dump(self, path):
+        """Write a snapshot to a JSON file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, default=str)
+    
+    def dump_at_exit(self, path):
+        """Write a snapshot to path when the interpreter exits"""
+        atexit.register(self.dump, path)
+
+def _record(instance, name, elapsed, error):
+    """Record one call in instance.metrics, if it has any"""
+    metrics = getattr(instance, 'metrics', None)
+    if metrics is not None:
+        metrics.record(name, elapsed * 1000, error)
+
+def _timed_stream(instance, name, rows, elapsed):
+    """
+    Pass through a generator's items, adding the time spent producing each one to elapsed.
+    The call is recorded when the generator is exhausted, fails or is closed early;
+    time the consumer spends between items is not counted.
+    """
+    error = True
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(rows)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            yield item
+        error = False
+    except GeneratorExit:
+        # The consumer stopped reading early, which is not a failure
+        error = False
+        raise
+    finally:
+        rows.close()
+        _record(instance, name, elapsed, error)
+
+def _timed(name, function):
+    """Wrap a method so each call is recorded in self.metrics"""
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = function(self, *args, **kwargs)
+        except BaseException:
+            _record(self, name, time.perf_counter() - started, True)
+            raise
+        elapsed = time.perf_counter() - started
+        if isinstance(result, GeneratorType):
+            # Streaming methods do their work as they are read, so timing continues in the stream
+            return _timed_stream(self, name, result, elapsed)
+        _record(self, name, elapsed, False)
+        return result
+    
+    return wrapper
+
+def instrument(exclude=()):
+    """
+    Class decorator that times every public method of the class.
+    Calls are recorded in the instance's metrics attribute as "<Class>.<method>";
+    an exception counts as an error. A method that returns a generator is timed
+    while the generator is read, and an exception raised while reading it also
+    counts as an error. Properties, private methods and names in exclude are
+    left alone.
+    """
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith('_') or attr in exclude or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, _timed(f"{cls.__name__}.{attr}", value))
+        return cls
+    
+    return decorate
\ No newline at end of file
@@ -0,0 +1,129 @@
+# Code created by https://linktr.ee/saran709
+import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+LEGACY_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+class PasswordHasher:
+    """
+    Salted PBKDF2-HMAC-SHA256 password hashing run on a bounded worker pool.
+    Hashes are stored as "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>".
+    Unsalted SHA-256 hex digests from older databases still verify, and are
+    flagged so the caller can replace them with a KDF hash.
+    """
+    
+    ALGORITHM = "pbkdf2_sha256"
+    DEFAULT_ITERATIONS = 200000
+    SALT_BYTES = 16
+    
+    def __init__(self, iterations=DEFAULT_ITERATIONS, max_workers=4, max_pending=None):
+        """
+        iterations: PBKDF2 work factor; each verification costs this many HMAC rounds
+        max_workers: threads hashing at once (hashlib releases the GIL while it works)
+        max_pending: most hash jobs queued or running before callers block
+        """
+        if iterations < 1:
+            raise ValueError("iterations must be at least 1")
+        
+        self.iterations = int(iterations)
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self._slots = threading.BoundedSemaphore(max_pending or max_workers * 4)
+        self._lock = threading.Lock()
+        # Compared against when an account does not exist, so misses cost as much as hits
+        self._dummy_hash = None
+        self.stats = {'hashed': 0, 'verified': 0, 'failed': 0, 'legacy_verified': 0}
+    
+    def _submit(self, function, *args):
+        """Run function on the pool once a slot is free"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    def _count(self, key):
+        """Bump one of the stats counters"""
+        with self._lock:
+            self.stats[key] += 1
+    
+    def _derive(self, password, salt, iterations):
+        """Run PBKDF2-HMAC-SHA256"""
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    
+    def _hash(self, password):
+        """Hash a password with a fresh salt at the current work factor"""
+        salt = os.urandom(self.SALT_BYTES)
+        digest = self._derive(password, salt, self.iterations)
+        self._count('hashed')
+        return f"{self.ALGORITHM}${self.iterations}${salt.hex()}${digest.hex()}"
+    
+    def _verify(self, password, stored_hash):
+        """Verify a KDF or legacy SHA-256 hash on a worker thread"""
+        if stored_hash and LEGACY_HASH.match(stored_hash):
+            ok = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored_hash)
+            self._count('legacy_verified' if ok else 'failed')
+            return ok, ok
+        
+        try:
+            algorithm, iterations, salt, digest = stored_hash.split("$")
+            iterations = int(iterations)
+            salt = bytes.fromhex(salt)
+            digest = bytes.fromhex(digest)
+        except (AttributeError, ValueError):
+            self._count('failed')
+            return False, False
+        if algorithm != self.ALGORITHM:
+            self._count('failed')
+            return False, False
+        
+        ok = hmac.compare_digest(self._derive(password, salt, iterations), digest)
+        self._count('verified' if ok else 'failed')
+        # Rehash hashes made with a lower work factor than the current setting
+        return ok, ok and iterations < self.iterations
+    
+    def hash(self, password):
+        """Hash a password on the worker pool"""
+        return self._submit(self._hash, password).result()
+    
+    def hash_many(self, passwords):
+        """Hash several passwords in parallel, keeping their order"""
+        futures = [self._submit(self._hash, password) for password in passwords]
+        return [future.result() for future in futures]
+    
+    def verify(self, password, stored_hash):
+        """
+        Check a password against a stored hash on the worker pool
+        Returns: (matches, needs_rehash)
+        """
+        return self.submit_verify(password, stored_hash).result()
+    
+    def submit_verify(self, password, stored_hash):
+        """Queue a verification and return a Future for (matches, needs_rehash)"""
+        return self._submit(self._verify, password, stored_hash)
+    
+    def verify_missing(self, password):
+        """Spend one verification's worth of work for an unknown account"""
+        if self._dummy_hash is None:
+            self._dummy_hash = self.hash("")
+        self.verify(password, self._dummy_hash)
+        return False
+    
+    def get_stats(self):
+        """Get hash and verification counters"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['iterations'] = self.iterations
+        stats['max_workers'] = self.max_workers
+        return stats
+    
+    def close(self):
+        """Finish queued work and stop the worker threads"""
+        self._executor.shutdown(wait=True)
\ No newline at end of file
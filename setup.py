@@ -55,12 +55,12 @@ def setup_sample_data():
     ]
     
     print("\nRegistering sample voters...")
+    registered, duplicates = voting_system.register_voters_bulk(voters_data)
     for voter_id, name, password in voters_data:
-        success, msg = voting_system.register_voter(voter_id, name, password)
-        if success:
-            print(f"✓ Registered voter: {voter_id} ({name})")
+        if voter_id in duplicates:
+            print(f"⚠ Failed to register {voter_id}: Voter ID already exists")
         else:
-            print(f"⚠ Failed to register {voter_id}: {msg}")
+            print(f"✓ Registered voter: {voter_id} ({name})")
     
     # Display system statistics
     stats = voting_system.get_statistics()
@@ -9,6 +9,7 @@ import tkinter as tk
 from tkinter import messagebox
 from voting_system import VotingSystem
 from admin_panel import AdminPanel
+from ui_worker import BackgroundWorker
 
 def test_admin_gui():
     """Test admin functionality in GUI"""
@@ -27,6 +28,7 @@ def test_admin_gui():
         def __init__(self):
             self.current_frame = None
             self.root = root
+            self.worker = BackgroundWorker(root)
         
         def clear_frame(self):
             if self.current_frame:
@@ -0,0 +1,1256 @@
+#!/usr/bin/env python3
+# Code created by https://linktr.ee/saran709
+"""
+Test script for DatabaseManager internals
+Covers connection pooling and other storage-level behaviour that the
+end-to-end checks in test_system.py do not exercise directly.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+import hashlib
+import csv
+import gzip
+import json
+import sqlite3
+import tracemalloc
+import exporters
+import federated_tally
+import irv
+from metrics import MetricsRegistry, OperationStats, instrument
+from vote_queue import GroupCommitWriter
+from voting_system import VotingSystem
+from database_manager import (
+    DatabaseManager, DEFAULT_ELECTION_ID, VOTE_ACCEPTED, VOTE_ALREADY_CAST, VOTE_UNKNOWN_VOTER, VOTE_INVALID_CANDIDATE
+)
+
+# Keeps password hashing cheap so tests that register many voters stay fast
+TEST_KDF_ITERATIONS = 1000
+
+def create_test_database(name="test_database_manager.db", **kwargs):
+    """Create a DatabaseManager on a fresh database in a temporary directory"""
+    temp_dir = tempfile.mkdtemp()
+    kwargs.setdefault('kdf_iterations', TEST_KDF_ITERATIONS)
+    return DatabaseManager(os.path.join(temp_dir, name), **kwargs), temp_dir
+
+def cleanup_test_database(db, temp_dir):
+    """Close the database and remove its temporary directory"""
+    db.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_connection_pool_reuse():
+    """Test that repeated calls reuse pooled connections"""
+    print("Testing connection pool reuse...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        opened_after_init = db.get_pool_stats()['connections_opened']
+        
+        db.add_candidate("Pool Candidate", "Pool Party")
+        db.register_voter("pool001", "Pool Voter", "password123")
+        for _ in range(50):
+            db.get_all_candidates()
+            db.authenticate_voter("pool001", "password123")
+            db.get_total_votes()
+        
+        stats = db.get_pool_stats()
+        assert stats['connections_opened'] == opened_after_init, \
+            f"Sequential calls should not open new connections, opened {stats['connections_opened']}"
+        assert stats['hits'] >= 150, f"Expected pool hits for every call, got {stats['hits']}"
+        assert stats['waits'] == 0, f"Sequential calls should never wait, got {stats['waits']}"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Connection pool reuse test passed")
+
+def test_connection_pool_bounded():
+    """Test that concurrent callers never exceed the pool size"""
+    print("Testing connection pool bound under concurrency...")
+    db, temp_dir = create_test_database(pool_size=2)
+    
+    try:
+        db.add_candidate("Bounded Candidate")
+        errors = []
+        
+        def worker():
+            try:
+                for _ in range(100):
+                    db.get_all_candidates()
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        stats = db.get_pool_stats()
+        assert not errors, f"Concurrent pooled reads failed: {errors[0]}"
+        assert stats['open_connections'] <= 2, f"Pool grew past its bound: {stats['open_connections']}"
+        assert stats['connections_opened'] <= 2, f"Opened too many connections: {stats['connections_opened']}"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Connection pool bound test passed")
+
+def test_connection_rollback_on_error():
+    """Test that a failing block does not leave a half-written transaction"""
+    print("Testing pooled connection rollback...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        try:
+            with db.connection() as conn:
+                conn.execute("INSERT INTO candidates (name) VALUES ('Rolled Back')")
+                raise RuntimeError("simulated failure")
+        except RuntimeError:
+            pass
+        
+        names = [c[1] for c in db.get_all_candidates()]
+        assert "Rolled Back" not in names, "Insert should have been rolled back"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Pooled connection rollback test passed")
+
+def test_record_vote_result_codes():
+    """Test that record_vote reports each outcome and only changes state on success"""
+    print("Testing atomic vote result codes...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        db.add_candidate("Atomic Candidate")
+        candidate_id = db.get_all_candidates()[0][0]
+        db.register_voter("atomic001", "Atomic Voter", "password123")
+        
+        result = db.record_vote("atomic001", candidate_id + 100)
+        assert result == VOTE_INVALID_CANDIDATE, f"Expected invalid candidate, got {result}"
+        assert db.has_voter_voted("atomic001") is False, "Rejected vote must not mark the voter"
+        
+        result = db.record_vote("nobody", candidate_id)
+        assert result == VOTE_UNKNOWN_VOTER, f"Expected unknown voter, got {result}"
+        
+        result = db.record_vote("atomic001", candidate_id)
+        assert result == VOTE_ACCEPTED, f"Expected accepted vote, got {result}"
+        assert db.has_voter_voted("atomic001") is True, "Accepted vote must mark the voter"
+        
+        result = db.record_vote("atomic001", candidate_id)
+        assert result == VOTE_ALREADY_CAST, f"Expected already voted, got {result}"
+        assert db.get_total_votes() == 1, f"Expected 1 stored vote, got {db.get_total_votes()}"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Atomic vote result codes test passed")
+
+def test_record_vote_concurrent_double_vote():
+    """Test that concurrent kiosks cannot cast two votes for one voter"""
+    print("Testing concurrent double-vote prevention...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        db.add_candidate("Race Candidate")
+        candidate_id = db.get_all_candidates()[0][0]
+        db.register_voter("race001", "Race Voter", "password123")
+        
+        results = []
+        barrier = threading.Barrier(8)
+        
+        def kiosk():
+            barrier.wait()
+            results.append(db.record_vote("race001", candidate_id))
+        
+        threads = [threading.Thread(target=kiosk) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results.count(VOTE_ACCEPTED) == 1, f"Exactly one vote should be accepted, got {results}"
+        assert db.get_total_votes() == 1, f"Expected 1 stored vote, got {db.get_total_votes()}"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Concurrent double-vote prevention test passed")
+
+def test_vote_tally_maintenance():
+    """Test that the tally follows votes and can be verified and rebuilt"""
+    print("Testing maintained vote tally...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        db.add_candidate("Tally One")
+        db.add_candidate("Tally Two")
+        first_id, second_id = [c[0] for c in db.get_all_candidates()]
+        for i in range(5):
+            db.register_voter(f"tally{i:03d}", f"Tally Voter {i}", "password123")
+        
+        for i in range(3):
+            assert db.record_vote(f"tally{i:03d}", first_id) == VOTE_ACCEPTED
+        assert db.record_vote("tally003", second_id) == VOTE_ACCEPTED
+        
+        results = {r[0]: r[3] for r in db.get_voting_results()}
+        assert results == {first_id: 3, second_id: 1}, f"Unexpected tally results: {results}"
+        assert db.verify_tally() == [], "Tally should match the recount"
+        
+        # Corrupt the tally and check it is detected and repaired
+        with db.connection() as conn:
+            conn.execute("UPDATE vote_tally SET vote_count = 99 WHERE candidate_id = ?", (first_id,))
+        mismatches = db.verify_tally()
+        assert mismatches == [(first_id, 99, 3)], f"Unexpected mismatches: {mismatches}"
+        
+        db.rebuild_tally()
+        assert db.verify_tally() == [], "Rebuilt tally should match the recount"
+        assert db.get_voting_results()[0][3] == 3, "Rebuilt tally should restore the winner's count"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Maintained vote tally test passed")
+
+def test_vote_timeline():
+    """Test time-bucketed vote counts from the per-minute rollup"""
+    print("Testing vote timeline...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        assert db.get_vote_timeline() == [], "No votes should give an empty timeline"
+        db.add_candidate("Early")
+        db.add_candidate("Late")
+        early_id, late_id = [c[0] for c in db.get_all_candidates()]
+        votes = [
+            ("2024-05-01 08:00:05", early_id), ("2024-05-01 08:00:59", early_id),
+            ("2024-05-01 08:01:30", late_id), ("2024-05-01 08:04:00", early_id),
+            ("2024-05-01 08:07:10", late_id), ("2024-05-01 08:07:11", late_id),
+        ]
+        with db.connection() as conn:
+            conn.executemany("INSERT INTO votes (vote_timestamp, candidate_id) VALUES (?, ?)", votes)
+            # Unparseable timestamps are counted in the tally but stay out of the timeline
+            conn.execute("INSERT INTO votes (vote_timestamp, candidate_id) VALUES ('not a time', ?)", (late_id,))
+        
+        timeline = db.get_vote_timeline()
+        assert [row[1] for row in timeline] == [2, 1, 1, 2], f"Unexpected per-minute counts: {timeline}"
+        assert timeline[0][0] == "2024-05-01 08:00:00" and timeline[-1] == ("2024-05-01 08:07:00", 2, 6)
+        assert [row[1] for row in db.get_vote_timeline(buckets=8)] == [2, 1, 0, 0, 1, 0, 0, 2], \
+            "A bucket window should fill in empty buckets"
+        
+        timeline = db.get_vote_timeline(5, per_candidate=True)
+        assert timeline == [
+            ("2024-05-01 08:00:00", 4, 4, {early_id: 3, late_id: 1}),
+            ("2024-05-01 08:05:00", 2, 6, {late_id: 2}),
+        ], f"Unexpected 5-minute buckets: {timeline}"
+        
+        # Only the most recent buckets, with the running total carried in from earlier ones
+        assert db.get_vote_timeline(2, buckets=2) == [("2024-05-01 08:04:00", 1, 4), ("2024-05-01 08:06:00", 2, 6)]
+        
+        # Deleting votes is followed, and a rebuild from the raw votes gives the same rollup
+        with db.connection() as conn:
+            conn.execute("DELETE FROM votes WHERE vote_timestamp = '2024-05-01 08:00:05'")
+        expected = db.get_vote_timeline(per_candidate=True)
+        assert expected[0][1] == 1, "Deleted vote should leave the timeline"
+        with db.connection() as conn:
+            conn.execute("DELETE FROM vote_minutes")
+        db.rebuild_tally()
+        assert db.get_vote_timeline(per_candidate=True) == expected, "Rebuilt timeline should match the triggers"
+        
+        # Votes cast through the normal path land in the current minute
+        db.register_voter("time001", "Timeline Voter", "password123")
+        assert db.record_vote("time001", early_id) == VOTE_ACCEPTED
+        assert db.get_vote_timeline(buckets=1)[0][1:] == (1, 6)
+        assert len(db.get_vote_timeline()) == 5, "Idle minutes since 2024 should not be listed"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Vote timeline test passed")
+
+def test_statistics_aggregates():
+    """Test that aggregate statistics match counts taken from the full tables"""
+    print("Testing aggregate statistics...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        db.add_candidate("Stats One")
+        db.add_candidate("Stats Two")
+        candidate_ids = [c[0] for c in db.get_all_candidates()]
+        for i in range(10):
+            db.register_voter(f"stats{i:03d}", f"Stats Voter {i}", "password123")
+        for i in range(4):
+            db.record_vote(f"stats{i:03d}", candidate_ids[i % 2])
+        
+        stats = db.get_statistics()
+        voters = db.get_all_voters()
+        assert list(stats) == ['total_voters', 'total_candidates', 'total_votes', 'voters_who_voted', 'voter_turnout'], \
+            f"Statistics keys changed: {list(stats)}"
+        assert stats['total_voters'] == len(voters) == 10, f"Unexpected voter count: {stats}"
+        assert stats['total_candidates'] == 2, f"Unexpected candidate count: {stats}"
+        assert stats['total_votes'] == 4, f"Unexpected vote count: {stats}"
+        assert stats['voters_who_voted'] == len([v for v in voters if v[2]]) == 4, f"Unexpected turnout: {stats}"
+        assert stats['voter_turnout'] == 40.0, f"Expected 40% turnout, got {stats['voter_turnout']}"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Aggregate statistics test passed")
+
+def test_bulk_voter_registration():
+    """Test chunked bulk registration and duplicate reporting"""
+    print("Testing bulk voter registration...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        db.register_voter("bulk0003", "Existing Voter", "password123")
+        
+        def roll():
+            for i in range(25):
+                yield (f"bulk{i:04d}", f"Bulk Voter {i}", "password123")
+            yield ("bulk0010", "Repeated Voter", "password123")
+            # Repeated within one chunk, before either copy is committed
+            yield ("bulk0030", "Late Voter", "password123")
+            yield ("bulk0030", "Late Voter Again", "password123")
+        
+        progress_calls = []
+        registered, duplicates = db.register_voters_bulk(
+            roll(), chunk_size=10, progress=lambda *args: progress_calls.append(args)
+        )
+        
+        assert registered == 25, f"Expected 25 new voters, got {registered}"
+        assert sorted(duplicates) == ["bulk0003", "bulk0010", "bulk0030"], f"Unexpected duplicates: {duplicates}"
+        assert len(progress_calls) == 3, f"Expected one progress call per chunk, got {len(progress_calls)}"
+        assert progress_calls[-1] == (28, 25, 3), f"Unexpected final progress: {progress_calls[-1]}"
+        assert db.get_statistics()['total_voters'] == 26, "Roll should contain 26 voters"
+        
+        success, name, has_voted = db.authenticate_voter("bulk0020", "password123")
+        assert success and name == "Bulk Voter 20", "Bulk registered voter should be able to log in"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Bulk voter registration test passed")
+
+def test_import_voters_csv():
+    """Test streaming a CSV roll through the importer"""
+    print("Testing CSV roll import...")
+    from import_voters import import_roll
+    db, temp_dir = create_test_database()
+    
+    try:
+        roll_path = os.path.join(temp_dir, "roll.csv")
+        with open(roll_path, "w", newline="") as f:
+            f.write("voter_id,name,password\n")
+            for i in range(30):
+                f.write(f"csv{i:04d},CSV Voter {i},pass{i:04d}\n")
+            f.write("csv0001,Duplicate,pass\n")
+            f.write("csv9999,,missingname\n")
+        
+        summary = import_roll(db, roll_path, chunk_size=7, quiet=True)
+        assert summary['registered'] == 30, f"Expected 30 imported voters, got {summary['registered']}"
+        assert summary['duplicates'] == ["csv0001"], f"Unexpected duplicates: {summary['duplicates']}"
+        assert [line for line, _ in summary['invalid']] == [33], f"Unexpected invalid rows: {summary['invalid']}"
+        assert db.authenticate_voter("csv0029", "pass0029")[0], "Imported voter should be able to log in"
+        
+        # JSON lines that are not objects are skipped as invalid rows
+        jsonl_path = os.path.join(temp_dir, "roll.jsonl")
+        with open(jsonl_path, "w") as f:
+            f.write('{"voter_id": "json0001", "name": "JSON Voter", "password": "pass0001"}\n\n[1, 2]\n"x"\n')
+        summary = import_roll(db, jsonl_path, quiet=True)
+        assert summary['registered'] == 1 and summary['invalid'] == [(3, [1, 2]), (4, "x")], \
+            f"Unexpected invalid rows: {summary['invalid']}"
+        
+        # Importing into another election also puts the new voters on its roll
+        _, _, council = db.create_election("Import Council")
+        with open(roll_path, "w", newline="") as f:
+            f.write("voter_id,name,password\n")
+            for i in range(30, 40):
+                f.write(f"csv{i:04d},CSV Voter {i},pass{i:04d}\n")
+        summary = import_roll(db, roll_path, chunk_size=4, quiet=True, election_id=council)
+        assert summary['registered'] == 10 and db.get_statistics(council)['total_voters'] == 10
+        assert db.authenticate_voter("csv0035", "pass0035", council) == (True, "CSV Voter 35", False), "Imported voter should be on the roll"
+        try:
+            import_roll(db, roll_path, quiet=True, election_id=999)
+            assert False, "Unknown elections should be rejected before importing"
+        except ValueError:
+            pass
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ CSV roll import test passed")
+
+# Tables small enough (one row per candidate) that a full scan is expected
+SMALL_TABLES = {'candidates', 'c', 'vote_tally', 't'}
+
+def capture_statements(db, calls):
+    """Run calls against a single-connection pool and return the SQL they executed"""
+    statements = []
+    with db.connection() as conn:
+        conn.set_trace_callback(statements.append)
+    try:
+        for call in calls:
+            call()
+    finally:
+        with db.connection() as conn:
+            conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith(('SELECT', 'UPDATE'))]
+
+def query_plan(db, sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    with db.connection() as conn:
+        # Older Python versions trace unexpanded SQL; bind placeholder values
+        params = [1] * sql.count('?')
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+def test_hot_queries_use_indexes():
+    """Test via EXPLAIN QUERY PLAN that hot queries never full-scan votes or voters"""
+    print("Testing query plans of hot queries...")
+    db, temp_dir = create_test_database(pool_size=1)
+    
+    try:
+        db.add_candidate("Plan Candidate")
+        candidate_id = db.get_all_candidates()[0][0]
+        db.register_voter("plan001", "Plan Voter", "password123")
+        _, _, election_id = db.create_election("Plan Election")
+        db.add_candidate("Plan Candidate", election_id=election_id)
+        other_id = db.get_all_candidates(election_id)[0][0]
+        db.add_election_voters(election_id, ["plan001"])
+        
+        statements = capture_statements(db, [
+            lambda: db.authenticate_voter("plan001", "password123"),
+            lambda: db.record_vote("plan001", candidate_id),
+            lambda: db.has_voter_voted("plan001"),
+            lambda: db.get_voting_results(),
+            lambda: db.get_total_votes(),
+            lambda: db.get_statistics(),
+            lambda: db.get_recent_votes(10),
+            lambda: db.get_recent_votes(10, True, 1),
+            lambda: db.get_change_token(),
+            lambda: db.get_vote_timeline(5, 12),
+            lambda: db.get_vote_timeline(per_candidate=True),
+            lambda: db.verify_tally(),
+            lambda: db.authenticate_voter("plan001", "password123", election_id),
+            lambda: db.record_vote("plan001", other_id, election_id=election_id),
+            lambda: db.has_voter_voted("plan001", election_id),
+            lambda: db.get_voting_results(election_id),
+            lambda: db.get_statistics(election_id),
+            lambda: db.get_recent_votes(10, election_id=election_id),
+            lambda: db.get_vote_timeline(5, 12, election_id=election_id),
+        ])
+        assert len(statements) >= 8, f"Expected to capture the hot queries, got {len(statements)}"
+        
+        for sql in statements:
+            plan = query_plan(db, sql)
+            for detail in plan:
+                if detail.startswith('SCAN') and 'INDEX' not in detail and 'CONSTANT ROW' not in detail:
+                    table = detail.split()[1]
+                    assert table in SMALL_TABLES or table.startswith('('), f"Full table scan in {' '.join(sql.split())!r}: {plan}"
+            # Incremental activity reads (vote_id > ?) only sort the handful of new votes
+            if 'ORDER BY v.vote_timestamp' in sql and 'vote_id >' not in sql:
+                assert not any('TEMP B-TREE' in detail for detail in plan), \
+                    f"Recent votes should be read in index order: {plan}"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Hot query plan test passed")
+
+def test_wal_reader_does_not_block_writer():
+    """Test that an open dashboard read does not block vote writes in WAL mode"""
+    print("Testing WAL concurrent reader/writer...")
+    db, temp_dir = create_test_database(busy_timeout=1.0)
+    
+    try:
+        assert db.get_journal_mode() == 'wal', f"Expected WAL mode, got {db.get_journal_mode()}"
+        db.add_candidate("WAL Candidate")
+        candidate_id = db.get_all_candidates()[0][0]
+        db.register_voters_bulk((f"wal{i:04d}", f"WAL Voter {i}", "password123") for i in range(200))
+        
+        # Hold a read snapshot open, as a slow dashboard query would
+        reader = db.pool.acquire()
+        try:
+            reader.execute("BEGIN")
+            before = reader.execute("SELECT COUNT(*) FROM votes").fetchone()[0]
+            
+            started = time.perf_counter()
+            for i in range(20):
+                assert db.record_vote(f"wal{i:04d}", candidate_id) == VOTE_ACCEPTED
+            elapsed = time.perf_counter() - started
+            
+            assert elapsed < 1.0, f"Writes should not wait for the reader, took {elapsed:.2f}s"
+            during = reader.execute("SELECT COUNT(*) FROM votes").fetchone()[0]
+            assert during == before, "Open read transaction should keep its snapshot"
+            reader.rollback()
+        finally:
+            db.pool.release(reader)
+        
+        # Dashboard refreshes and vote writes running together on separate threads
+        errors = []
+        done = threading.Event()
+        
+        def writer():
+            try:
+                for i in range(20, 200):
+                    db.record_vote(f"wal{i:04d}", candidate_id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+        
+        def dashboard():
+            try:
+                while not done.is_set():
+                    db.get_voting_results()
+                    db.get_recent_votes(10)
+                    db.get_statistics()
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=dashboard) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert not errors, f"Concurrent reads and writes failed: {errors[0]}"
+        assert db.get_total_votes() == 200, f"Expected 200 votes, got {db.get_total_votes()}"
+        
+        busy, wal_frames, checkpointed = db.checkpoint("TRUNCATE")
+        assert busy == 0, "Idle database should checkpoint fully"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ WAL concurrent reader/writer test passed")
+
+def test_group_commit_writer():
+    """Test that queued votes are committed in batches and acknowledged after commit"""
+    print("Testing group commit vote queue...")
+    db, temp_dir = create_test_database()
+    writer = GroupCommitWriter(db, max_batch_size=16, max_delay=0.02)
+    
+    try:
+        db.add_candidate("Queue Candidate")
+        candidate_id = db.get_all_candidates()[0][0]
+        db.register_voters_bulk((f"queue{i:03d}", f"Queue Voter {i}", "password123") for i in range(40))
+        
+        results = []
+        barrier = threading.Barrier(40)
+        
+        def kiosk(i):
+            barrier.wait()
+            result = writer.cast_vote(f"queue{i:03d}", candidate_id, timeout=10)
+            # Acknowledged votes must already be visible to other connections
+            assert db.has_voter_voted(f"queue{i:03d}") is True
+            results.append(result)
+        
+        threads = [threading.Thread(target=kiosk, args=(i,)) for i in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results.count(VOTE_ACCEPTED) == 40, f"All queued votes should be accepted: {results}"
+        
+        # Duplicate and invalid votes in one batch are rejected without affecting the others
+        futures = [
+            writer.submit("queue000", candidate_id),
+            writer.submit("nobody", candidate_id),
+            writer.submit("queue001", candidate_id + 100),
+        ]
+        assert [f.result(timeout=10) for f in futures] == [VOTE_ALREADY_CAST, VOTE_UNKNOWN_VOTER, VOTE_INVALID_CANDIDATE]
+        
+        metrics = writer.get_metrics()
+        assert metrics['votes_processed'] == 43, f"Unexpected committed count: {metrics}"
+        assert metrics['batches_committed'] < 43, f"Votes should share commits: {metrics}"
+        assert metrics['largest_batch'] <= 16, f"Batch exceeded its size limit: {metrics}"
+        assert metrics['votes_per_second'] > 0, "Throughput metric should be reported"
+        assert db.get_total_votes() == 40, f"Expected 40 stored votes, got {db.get_total_votes()}"
+    finally:
+        writer.stop()
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Group commit vote queue test passed")
+
+def test_candidate_cache_versioning():
+    """Test that the candidate cache is reused and invalidated by any writer"""
+    print("Testing versioned candidate cache...")
+    db, temp_dir = create_test_database()
+    other = DatabaseManager(db.db_path, kdf_iterations=TEST_KDF_ITERATIONS)  # stands in for another kiosk process
+    
+    try:
+        db.add_candidate("Cache One")
+        first = db.get_all_candidates()
+        misses = db.candidate_cache_stats['misses']
+        for _ in range(20):
+            assert db.get_all_candidates() == first
+        assert db.candidate_cache_stats['misses'] == misses, "Unchanged candidates should be served from cache"
+        assert db.candidate_cache_stats['hits'] >= 20, "Repeated reads should be cache hits"
+        
+        candidate_id = first[0][0]
+        assert db.get_candidate(candidate_id)[1] == "Cache One", "Lookup by ID should use the cache"
+        assert db.get_candidate(candidate_id + 100) is None, "Unknown candidate should return None"
+        
+        version = db.get_candidate_version()
+        other.add_candidate("Cache Two")
+        assert db.get_candidate_version() == version + 1, "Adding a candidate should bump the version"
+        names = [c[1] for c in db.get_all_candidates()]
+        assert names == ["Cache One", "Cache Two"], f"Change from another connection not seen: {names}"
+        
+        other.remove_candidate(candidate_id)
+        assert db.get_candidate(candidate_id) is None, "Removed candidate should drop out of the cache"
+    finally:
+        other.close()
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Versioned candidate cache test passed")
+
+def test_password_kdf_and_legacy_upgrade():
+    """Test salted KDF hashes and the upgrade of legacy SHA-256 hashes on login"""
+    print("Testing password KDF and legacy hash upgrade...")
+    db, temp_dir = create_test_database()
+    
+    def stored_hash(table, key_column, key):
+        with db.connection() as conn:
+            return conn.execute(f"SELECT password_hash FROM {table} WHERE {key_column} = ?", (key,)).fetchone()[0]
+    
+    try:
+        db.register_voter("kdf001", "KDF Voter", "password123")
+        db.register_voter("kdf002", "KDF Voter", "password123")
+        first, second = stored_hash("voters", "voter_id", "kdf001"), stored_hash("voters", "voter_id", "kdf002")
+        assert first.startswith(f"pbkdf2_sha256${TEST_KDF_ITERATIONS}$"), f"Unexpected hash format: {first}"
+        assert first != second, "Equal passwords should hash differently with fresh salts"
+        assert db.authenticate_voter("kdf001", "password123")[0], "Correct password should authenticate"
+        assert not db.authenticate_voter("kdf001", "wrong")[0], "Wrong password should be rejected"
+        assert not db.authenticate_voter("nobody", "password123")[0], "Unknown voter should be rejected"
+        
+        # Accounts created before the KDF still hold unsalted SHA-256 digests
+        legacy = hashlib.sha256("legacy-pass".encode()).hexdigest()
+        with db.connection() as conn:
+            conn.execute("INSERT INTO voters (voter_id, name, password_hash) VALUES ('old001', 'Old Voter', ?)", (legacy,))
+            conn.execute("UPDATE admin SET password_hash = ? WHERE admin_id = 'admin'", (legacy,))
+        
+        assert not db.authenticate_voter("old001", "wrong")[0], "Wrong password should not match a legacy hash"
+        assert stored_hash("voters", "voter_id", "old001") == legacy, "Failed login must not rewrite the hash"
+        assert db.authenticate_voter("old001", "legacy-pass")[0], "Legacy hash should still verify"
+        assert stored_hash("voters", "voter_id", "old001").startswith("pbkdf2_sha256$"), "Legacy hash should be upgraded"
+        assert db.authenticate_voter("old001", "legacy-pass")[0], "Upgraded hash should verify"
+        
+        assert db.authenticate_admin("admin", "legacy-pass"), "Legacy admin hash should verify"
+        assert stored_hash("admin", "admin_id", "admin").startswith("pbkdf2_sha256$"), "Admin hash should be upgraded"
+        
+        # Raising the work factor rehashes older KDF hashes on their next login
+        stronger = DatabaseManager(db.db_path, kdf_iterations=TEST_KDF_ITERATIONS * 2)
+        try:
+            assert stronger.authenticate_voter("kdf001", "password123")[0]
+        finally:
+            stronger.close()
+        assert stored_hash("voters", "voter_id", "kdf001").startswith(f"pbkdf2_sha256${TEST_KDF_ITERATIONS * 2}$"), \
+            "Hash below the configured work factor should be rehashed"
+        
+        stats = db.hasher.get_stats()
+        assert stats['legacy_verified'] == 2 and stats['failed'] >= 3, f"Unexpected hasher stats: {stats}"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Password KDF test passed")
+
+def test_voters_page_keyset():
+    """Test that keyset pages walk the whole roll in order for every sort and filter"""
+    print("Testing keyset-paginated voter roll...")
+    db, temp_dir = create_test_database(pool_size=1)
+    
+    try:
+        db.add_candidate("Page Candidate")
+        candidate_id = db.get_all_candidates()[0][0]
+        # Few distinct names so pages split runs of equal sort values
+        db.register_voters_bulk((f"page{i:04d}", f"Voter {i % 7}", "password123") for i in range(250))
+        db.record_votes_batch([(f"page{i:04d}", candidate_id) for i in range(0, 250, 3)])
+        
+        # A second election whose roll is every other voter, with its own voting status
+        _, _, council = db.create_election("Page Council")
+        db.add_candidate("Council Candidate", election_id=council)
+        council_candidate = db.get_all_candidates(council)[0][0]
+        db.add_election_voters(council, (f"page{i:04d}" for i in range(0, 250, 2)))
+        db.record_votes_batch([(f"page{i:04d}", council_candidate, None, council) for i in range(0, 250, 10)])
+        rolls = {DEFAULT_ELECTION_ID: db.get_all_voters()}
+        rolls[council] = [
+            (v[0], v[1], int(v[0][4:]) % 10 == 0, v[3]) for v in rolls[DEFAULT_ELECTION_ID] if int(v[0][4:]) % 2 == 0
+        ]
+        
+        fields = ('voter_id', 'name', 'has_voted', 'registration_date')
+        for election_id, roll in rolls.items():
+            for sort_by in fields:
+                for filter, keep in ((None, lambda v: True), ('voted', lambda v: v[2]), ('not_voted', lambda v: not v[2])):
+                    for descending in (False, True):
+                        column = fields.index(sort_by)
+                        expected = sorted((v for v in roll if keep(v)), key=lambda v: (v[column], v[0]), reverse=descending)
+                        
+                        pages = []
+                        after_id = after_value = None
+                        while True:
+                            page = db.get_voters_page(after_id, 40, filter, sort_by, descending, after_value, election_id)
+                            pages.extend(page)
+                            if len(page) < 40:
+                                break
+                            after_id, after_value = page[-1][0], page[-1][column]
+                        
+                        if filter and sort_by == 'has_voted':
+                            expected.sort(key=lambda v: v[0], reverse=descending)
+                        assert [v[0] for v in pages] == [v[0] for v in expected], \
+                            f"Pages out of order for election={election_id} sort={sort_by} filter={filter} descending={descending}"
+                        assert [bool(v[2]) for v in pages] == [bool(v[2]) for v in expected], \
+                            f"Voting status should come from election {election_id}'s roll"
+        
+        # Deep pages are index range searches, never scans or sorts of the roll
+        statements = capture_statements(db, [
+            lambda s=sort_by, f=filter, d=descending: db.get_voters_page("page0200", 20, f, s, d, "Voter 3")
+            for sort_by in fields for filter in (None, 'voted', 'not_voted') for descending in (False, True)
+        ])
+        for sql in statements:
+            plan = query_plan(db, sql)
+            assert all(detail.startswith('SEARCH') for detail in plan), f"Page query is not an index search: {plan}"
+        
+        try:
+            db.get_voters_page(sort_by="password_hash")
+            assert False, "Unknown sort column should be rejected"
+        except ValueError:
+            pass
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Keyset voter paging test passed")
+
+def test_change_token():
+    """Test that the change token moves exactly when results or statistics can change"""
+    print("Testing change probe token...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        db.add_candidate("Probe One")
+        db.add_candidate("Probe Two")
+        candidate_id = db.get_all_candidates()[0][0]
+        db.register_voters_bulk((f"probe{i:03d}", f"Probe Voter {i}", "password123") for i in range(5))
+        
+        token = db.get_change_token()
+        db.get_voting_results()
+        db.get_statistics()
+        db.authenticate_voter("probe000", "password123")
+        assert db.get_change_token() == token, "Reads and logins should not move the token"
+        assert db.record_vote("probe000", "no-such-candidate") != VOTE_ACCEPTED
+        assert db.get_change_token() == token, "A rejected vote should not move the token"
+        
+        db.record_vote("probe000", candidate_id)
+        after_vote = db.get_change_token()
+        assert after_vote[0] != token[0] and after_vote[1:] == token[1:], "A vote should move only the vote watermark"
+        
+        db.register_voter("probe999", "Late Voter", "password123")
+        after_register = db.get_change_token()
+        assert after_register[2] != after_vote[2], "Registering a voter should move the token"
+        
+        db.add_candidate("Probe Three")
+        assert db.get_change_token()[1] != after_register[1], "Candidate changes should move the token"
+        
+        # The activity feed only asks for votes after the newest one it has shown
+        shown = db.get_recent_votes(10, include_ids=True)
+        db.record_vote("probe001", candidate_id)
+        db.record_vote("probe002", candidate_id)
+        newer = db.get_recent_votes(10, include_ids=True, after_vote_id=shown[0][0])
+        assert len(newer) == 2 and all(vote[0] > shown[0][0] for vote in newer), f"Unexpected new votes: {newer}"
+        assert db.get_recent_votes(10, include_ids=True, after_vote_id=newer[0][0]) == [], "No votes should be newer"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Change probe token test passed")
+
+def test_streaming_exports():
+    """Test CSV/JSONL/gzip exports and that they stream instead of materializing rows"""
+    print("Testing streaming exports...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        db.add_candidate("Export One", "Party A")
+        db.add_candidate("Export Two")
+        candidate_ids = [c[0] for c in db.get_all_candidates()]
+        db.register_voters_bulk((f"exp{i:05d}", f"Export Voter {i}", "password123") for i in range(3000))
+        db.record_votes_batch([(f"exp{i:05d}", candidate_ids[i % 3 == 0]) for i in range(2400)])
+        
+        path = os.path.join(temp_dir, "results.csv")
+        assert exporters.export(db, 'results', path) == 2
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]['name'] == "Export One" and rows[0]['votes'] == "1600", f"Unexpected results export: {rows}"
+        
+        path = os.path.join(temp_dir, "roll.jsonl.gz")
+        assert exporters.export(db, 'turnout', path) == 3000
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            roll = [json.loads(line) for line in f]
+        assert roll[0] == {'voter_id': 'exp00000', 'name': 'Export Voter 0', 'has_voted': True,
+                           'registration_date': roll[0]['registration_date']}, f"Unexpected roll row: {roll[0]}"
+        assert sum(voter['has_voted'] for voter in roll) == 2400, "Roll should record who voted"
+        assert 'password_hash' not in roll[0], "Roll export must not include password hashes"
+        
+        path = os.path.join(temp_dir, "audit.csv.gz")
+        assert exporters.export(db, 'audit', path) == 2400
+        with gzip.open(path, 'rt', newline='') as f:
+            audit = list(csv.reader(f))
+        assert audit[0] == ['vote_id', 'election_id', 'vote_timestamp', 'candidate_id', 'candidate_name', 'party']
+        assert len(audit) == 2401, "Audit should have a header and one row per vote"
+        
+        # Streaming keeps only one chunk of rows alive at a time
+        tracemalloc.start()
+        try:
+            materialized = tracemalloc.get_traced_memory()[0]
+            everything = list(db.iter_vote_audit())
+            materialized = tracemalloc.get_traced_memory()[0] - materialized
+            del everything
+            
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            exporters.export(db, 'audit', os.path.join(temp_dir, "audit.jsonl"), chunk_size=100)
+            streamed = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+        assert streamed < materialized / 4, f"Export used {streamed} bytes; holding all rows takes {materialized}"
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Streaming exports test passed")
+
+def test_federated_tally():
+    """Test merging station databases in worker processes and rejecting incompatible ones"""
+    print("Testing federated tally...")
+    stations = []
+    try:
+        for index, (votes_a, votes_b) in enumerate([(30, 10), (5, 25), (12, 12)]):
+            db, temp_dir = create_test_database(f"station{index}.db")
+            stations.append((db, temp_dir))
+            # Ids differ between stations; candidates are matched by name and party
+            if index == 1:
+                db.add_candidate("Placeholder")
+                db.remove_candidate(db.get_all_candidates()[0][0])
+            db.add_candidate("Alice", "Party A")
+            db.add_candidate("Bob", "Party B")
+            ids = {c[1]: c[0] for c in db.get_all_candidates()}
+            total = votes_a + votes_b
+            db.register_voters_bulk((f"s{index}v{i}", f"Voter {i}", "pw123456") for i in range(total + 5))
+            db.record_votes_batch([(f"s{index}v{i}", ids["Alice"] if i < votes_a else ids["Bob"]) for i in range(total)])
+        
+        # A station that ran a different ballot, and one whose tally drifted from its votes
+        odd_db, odd_dir = create_test_database("odd.db")
+        stations.append((odd_db, odd_dir))
+        odd_db.add_candidate("Alice", "Party A")
+        odd_db.add_candidate("Carol")
+        with stations[2][0].connection() as conn:
+            conn.execute("UPDATE vote_tally SET vote_count = vote_count + 1")
+        
+        paths = [db.db_path for db, _ in stations]
+        for db, _ in stations:
+            db.close()
+        before = [open(path, 'rb').read() for path in paths]
+        
+        report = federated_tally.federated_tally(paths + [paths[0]], workers=2)
+        assert report['results'] == [("Alice", "Party A", 47), ("Bob", "Party B", 47)], \
+            f"Unexpected merged results: {report['results']}"
+        assert report['registered'] == 45 + 35 + 29 and report['voted'] == 94
+        assert [s['path'] for s in report['stations']] == paths[:3], "Duplicate paths should be counted once"
+        assert report['stations'][1]['votes'] == {"Alice": 5, "Bob": 25}
+        assert [s['tally_mismatches'] for s in report['stations']] == [0, 0, 2], "Recount should flag the drifted tally"
+        assert len(report['rejected']) == 1 and report['rejected'][0][0] == paths[3]
+        assert "Bob" in report['rejected'][0][1] and "Carol" in report['rejected'][0][1]
+        
+        # Counting in-process gives the same answer, and trusting the tally picks up the drift
+        assert federated_tally.federated_tally(paths, workers=1)['results'] == report['results']
+        trusted = federated_tally.federated_tally(paths, workers=1, recount=False)
+        assert trusted['total_votes'] == 96, "Trusted tallies should be read as stored"
+        
+        # A station without a maintained tally is recounted from its votes, even when the tally is trusted
+        untallied = os.path.join(stations[0][1], "untallied.db")
+        shutil.copyfile(paths[0], untallied)
+        conn = sqlite3.connect(untallied)
+        conn.execute("DROP TABLE vote_tally")
+        conn.close()
+        for recount in (True, False):
+            station = federated_tally.federated_tally([untallied], workers=1, recount=recount)['stations'][0]
+            assert station['votes'] == {"Alice": 30, "Bob": 10} and station['tally_mismatches'] is None
+        
+        missing = federated_tally.federated_tally([os.path.join(stations[0][1], "missing.db")], workers=1)
+        assert missing['results'] == [] and len(missing['rejected']) == 1
+        assert [open(path, 'rb').read() for path in paths] == before, "Station files must not be modified"
+    finally:
+        for db, temp_dir in stations:
+            cleanup_test_database(db, temp_dir)
+    
+    print("✓ Federated tally test passed")
+
+def test_ranked_ballots():
+    """Test that ranked ballots are stored packed, validated, grouped and counted by instant runoff"""
+    print("Testing ranked ballot storage...")
+    db, temp_dir = create_test_database()
+    writer = GroupCommitWriter(db, max_batch_size=8, max_delay=0.01)
+    
+    try:
+        for name in ("Rank A", "Rank B", "Rank C"):
+            db.add_candidate(name)
+        a, b, c = [candidate[0] for candidate in db.get_all_candidates()]
+        db.register_voters_bulk((f"rank{i:03d}", f"Rank Voter {i}", "password123") for i in range(20))
+        
+        # Duplicates, unknown candidates and a first choice that is not candidate_id are rejected
+        assert db.record_vote("rank000", a, [a, b, a]) == VOTE_INVALID_CANDIDATE
+        assert db.record_vote("rank000", a, [a, c + 100]) == VOTE_INVALID_CANDIDATE
+        assert db.record_vote("rank000", a, [b, a]) == VOTE_INVALID_CANDIDATE
+        assert db.has_voter_voted("rank000") is False, "Rejected ranking must not mark the voter"
+        
+        # 8 A>B>C, 6 B>C, 5 C>B and one plain vote for C: C goes first and its ballots elect B
+        for i in range(8):
+            assert db.record_vote(f"rank{i:03d}", a, [a, b, c]) == VOTE_ACCEPTED
+        futures = [writer.submit(f"rank{i:03d}", b, (b, c)) for i in range(8, 14)]
+        futures += [writer.submit(f"rank{i:03d}", c, [c, b]) for i in range(14, 19)]
+        assert [f.result(timeout=10) for f in futures] == [VOTE_ACCEPTED] * 11
+        assert db.record_vote("rank019", c) == VOTE_ACCEPTED
+        
+        with db.connection() as conn:
+            blobs = [row[0] for row in conn.execute("SELECT rankings FROM ranked_ballots")]
+        assert len(blobs) == 19, "Single-choice votes should not be stored as rankings"
+        assert list(irv.unpack_ranking(blobs[0])) == [a, b, c] and len(blobs[0]) == 12, "Rankings should pack 4 bytes per choice"
+        
+        # Plurality results count first choices; identical ballots are grouped
+        assert [row[3] for row in db.get_voting_results()] == [8, 6, 6]
+        ballots = {tuple(ranking): count for ranking, count in db.iter_ranked_ballots()}
+        assert ballots == {(a, b, c): 8, (b, c): 6, (c, b): 5, (c,): 1}, f"Unexpected grouped ballots: {ballots}"
+        
+        result = irv.instant_runoff(db.iter_ranked_ballots(), [a, b, c])
+        assert result['winner'] == b and result['ballots'] == 20 and result['exhausted'] == 1, f"Unexpected runoff: {result}"
+        assert result['rounds'][0]['eliminated'] == c and result['rounds'][0]['transfers'] == {b: 5, None: 1}
+        assert result['rounds'][1]['counts'] == {a: 8, b: 11}
+        
+        # Deleting a vote deletes its ranking with it
+        with db.connection() as conn:
+            conn.execute("DELETE FROM votes WHERE candidate_id = ?", (a,))
+            assert conn.execute("SELECT COUNT(*) FROM ranked_ballots").fetchone()[0] == 11
+    finally:
+        writer.stop()
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Ranked ballot storage test passed")
+
+def test_instant_runoff_engine():
+    """Test instant-runoff rounds, tie-breaks and exhausted ballots, and that large counts stay fast"""
+    print("Testing instant-runoff engine...")
+    
+    # Majority on first preferences needs a single round
+    result = irv.instant_runoff([((1, 2), 6), ((2, 1), 4)])
+    assert result['winner'] == 1 and len(result['rounds']) == 1 and result['rounds'][0]['eliminated'] is None
+    
+    # Unranked standing candidates get zero votes and go first; preferences for others are skipped
+    result = irv.instant_runoff([((9, 1, 2), 3), ((2,), 2), ((3, 1), 2), ((4,), 1)], [1, 2, 3, 4, 5])
+    assert [r['eliminated'] for r in result['rounds']] == [5, 4, 3, None], f"Unexpected order: {result['rounds']}"
+    assert result['winner'] == 1 and result['rounds'][-1]['counts'] == {1: 5, 2: 2}
+    assert result['exhausted'] == 1, "Ballots whose choices are all eliminated should be exhausted"
+    assert result['rounds'][1]['transfers'] == {None: 1}
+    
+    # Tied for last: the candidate behind in the earlier round goes, otherwise the one listed later
+    ballots = [((1,), 5), ((2,), 2), ((3,), 3), ((4, 2), 1)]
+    result = irv.instant_runoff(ballots, [1, 2, 3, 4])
+    assert [r['eliminated'] for r in result['rounds']][:2] == [4, 2], f"Unexpected tie-break: {result['rounds']}"
+    assert irv.instant_runoff([((1,), 2), ((2,), 2)], [1, 2])['winner'] == 1
+    
+    # Nothing to count
+    assert irv.instant_runoff([], [1, 2])['winner'] is None
+    
+    # Many distinct ballots: each elimination only moves that candidate's ballots
+    rankings = [(i % 7 + 1, (i * 3) % 7 + 1, (i * 5 + 2) % 7 + 1) for i in range(200000)]
+    started = time.perf_counter()
+    result = irv.instant_runoff(((ranking, 1) for ranking in rankings), range(1, 8))
+    elapsed = time.perf_counter() - started
+    assert result['ballots'] == 200000 and result['winner'] is not None
+    assert elapsed < 5.0, f"Counting 200k ballots took {elapsed:.2f}s"
+    
+    print(f"✓ Instant-runoff engine test passed (200k ballots in {elapsed:.2f}s)")
+
+def test_operation_metrics():
+    """Test per-operation call counts, error counts, latency histograms and the JSON dump"""
+    print("Testing operation metrics...")
+    db, temp_dir = create_test_database()
+    
+    try:
+        db.add_candidate("Metrics Candidate")
+        for _ in range(5):
+            db.get_statistics()
+        try:
+            db.checkpoint("SOMETIMES")
+        except ValueError:
+            pass
+        
+        snapshot = db.metrics.snapshot()
+        operations = snapshot['operations']
+        assert operations['DatabaseManager.get_statistics']['calls'] == 5
+        assert operations['DatabaseManager.get_statistics']['errors'] == 0
+        assert operations['DatabaseManager.checkpoint'] == dict(operations['DatabaseManager.checkpoint'], calls=1, errors=1)
+        assert 'DatabaseManager.connection' not in operations, "connection() should not be timed"
+        assert 'DatabaseManager.init_database' in operations, "Calls made during construction should be counted"
+        for name, stats in operations.items():
+            assert sum(stats['histogram'].values()) == stats['calls'], f"Histogram of {name} does not add up"
+            assert stats['p50_ms'] <= stats['p99_ms'] <= max(stats['max_ms'], stats['p99_ms'])
+        assert snapshot['gauges']['connections_opened'] == db.connections_opened
+        assert snapshot['gauges']['connection_pool']['open_connections'] >= 1
+        
+        # With group commit on, the vote queue's throughput is reported with the other gauges
+        voting_system = VotingSystem(db, group_commit=True)
+        try:
+            voting_system.vote_writer.cast_vote("nobody", db.get_all_candidates()[0][0], timeout=10)
+            queue = db.metrics.snapshot()['gauges']['vote_queue']
+            assert queue['votes_processed'] == 1 and 'votes_per_second' in queue, f"Unexpected queue gauge: {queue}"
+        finally:
+            voting_system.vote_writer.stop()
+        
+        path = os.path.join(temp_dir, "metrics.json")
+        db.metrics.dump(path)
+        with open(path) as f:
+            assert json.load(f)['operations']['DatabaseManager.get_statistics']['calls'] == 5
+        
+        # Percentiles come from the bucket upper bounds
+        stats = OperationStats()
+        for elapsed_ms in [0.3] * 90 + [7.0] * 9 + [20000.0]:
+            stats.record(elapsed_ms)
+        assert (stats.percentile(50), stats.percentile(95), stats.percentile(100)) == (0.5, 10, 20000.0)
+        
+        # Timing costs a few microseconds per call, so it can stay on
+        @instrument()
+        class Timed:
+            def noop(self):
+                return None
+        
+        timed = Timed()
+        timed.metrics = MetricsRegistry()
+        calls = 20000
+        started = time.perf_counter()
+        for _ in range(calls):
+            timed.noop()
+        overhead = (time.perf_counter() - started) / calls
+        assert timed.metrics.snapshot()['operations']['Timed.noop']['calls'] == calls
+        assert overhead < 50e-6, f"Instrumentation costs {overhead * 1e6:.1f}µs per call"
+        
+        # Streaming methods are recorded once read, with errors raised while reading them
+        @instrument()
+        class Streaming:
+            def rows(self, fail=False):
+                yield 1
+                time.sleep(0.02)
+                if fail:
+                    raise ValueError("broken stream")
+                yield 2
+        
+        streaming = Streaming()
+        streaming.metrics = MetricsRegistry()
+        rows = streaming.rows()
+        assert 'Streaming.rows' not in streaming.metrics.snapshot()['operations'], "Nothing has been read yet"
+        assert list(rows) == [1, 2]
+        partial = streaming.rows()
+        next(partial)
+        partial.close()
+        try:
+            list(streaming.rows(fail=True))
+            assert False, "Errors raised while reading should reach the caller"
+        except ValueError:
+            pass
+        summary = streaming.metrics.snapshot()['operations']['Streaming.rows']
+        assert (summary['calls'], summary['errors']) == (3, 1), f"Unexpected stream metrics: {summary}"
+        assert summary['max_ms'] >= 20, "Time spent producing rows should be counted"
+        list(db.iter_vote_audit())
+        assert db.metrics.snapshot()['operations']['DatabaseManager.iter_vote_audit']['calls'] == 1
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Operation metrics test passed")
+
+def test_multiple_elections():
+    """Test that elections keep separate candidates, rolls, votes and results"""
+    print("Testing multiple elections...")
+    db, temp_dir = create_test_database()
+    writer = GroupCommitWriter(db, max_batch_size=8, max_delay=0.01)
+    
+    try:
+        db.register_voters_bulk((f"elec{i:03d}", f"Election Voter {i}", "password123") for i in range(10))
+        db.add_candidate("Shared Name")
+        general = db.get_all_candidates()[0][0]
+        
+        success, _, council = db.create_election("Council", "Local council seat")
+        assert success and council != DEFAULT_ELECTION_ID
+        assert db.create_election("Council")[0] is False, "Election names should be unique"
+        assert [e[1] for e in db.get_elections()] == ["General Election", "Council"]
+        
+        # Candidate names only need to be unique within an election
+        assert db.add_candidate("Shared Name", election_id=council)[0]
+        assert db.add_candidate("Council Only", election_id=council)[0]
+        assert not db.add_candidate("Shared Name", election_id=council)[0]
+        assert not db.add_candidate("Nowhere", election_id=999)[0], "Unknown elections should be rejected"
+        shared, only = [c[0] for c in db.get_all_candidates(council)]
+        assert [c[0] for c in db.get_all_candidates()] == [general]
+        assert len(db.get_all_candidates(None)) == 3
+        
+        # Only voters put on the council roll may vote in it
+        assert db.add_election_voters(council, [f"elec{i:03d}" for i in range(6)] + ["nobody"], chunk_size=4) == 6
+        assert db.add_election_voters(council, ["elec000"]) == 0, "Voters already on the roll should be skipped"
+        token = db.get_change_token()
+        assert db.add_election_voters(council, ["elec007"]) == 1
+        enrolled = db.get_change_token()
+        assert enrolled[3] != token[3] and enrolled[:3] == token[:3], "Roll changes should move only the roll version"
+        assert db.remove_election_voters(council, ["elec007", "nobody"]) == 1
+        assert db.get_change_token()[3] != enrolled[3], "Removing voters from a roll should move the token"
+        assert db.authenticate_voter("elec000", "password123", council) == (True, "Election Voter 0", False)
+        assert db.authenticate_voter("elec009", "password123", council) == (True, "Election Voter 9", None)
+        assert db.record_vote("elec009", shared, election_id=council) == VOTE_UNKNOWN_VOTER
+        try:
+            db.add_election_voters(DEFAULT_ELECTION_ID)
+            assert False, "The default election's roll should not take explicit voters"
+        except ValueError:
+            pass
+        
+        # Voting in one election leaves the voter free to vote in the other
+        assert db.record_vote("elec000", general) == VOTE_ACCEPTED
+        assert db.has_voter_voted("elec000", council) is False
+        assert db.record_vote("elec000", general, election_id=council) == VOTE_INVALID_CANDIDATE, \
+            "Candidates from another election should be rejected"
+        assert db.record_vote("elec000", shared, election_id=council) == VOTE_ACCEPTED
+        assert db.record_vote("elec000", only, election_id=council) == VOTE_ALREADY_CAST
+        assert db.remove_election_voters(council, ["elec000"]) == 0, "Voters who have voted should stay on the roll"
+        futures = [writer.submit(f"elec{i:03d}", only, election_id=council) for i in range(1, 4)]
+        futures.append(writer.submit("elec004", only, (only, shared), election_id=council))
+        assert [f.result(timeout=10) for f in futures] == [VOTE_ACCEPTED] * 4
+        assert db.has_voter_voted("elec001") is False, "Council votes should not touch the general roll"
+        
+        assert db.get_voting_results() == [(general, "Shared Name", "", 1)]
+        assert [(row[0], row[3]) for row in db.get_voting_results(council)] == [(only, 4), (shared, 1)]
+        assert db.get_total_votes() == 1 and db.get_total_votes(council) == 5
+        stats = db.get_statistics(council)
+        assert (stats['total_voters'], stats['voters_who_voted'], stats['total_candidates'], stats['total_votes']) == (6, 5, 2, 5)
+        assert db.get_statistics()['total_voters'] == 10 and db.get_statistics()['voters_who_voted'] == 1
+        assert len(db.get_recent_votes(10, election_id=council)) == 5 and len(db.get_recent_votes(10)) == 1
+        assert db.get_vote_timeline(election_id=council)[-1][2] == 5 and db.get_vote_timeline()[-1][2] == 1
+        assert {tuple(r): n for r, n in db.iter_ranked_ballots(election_id=council)} == {(shared,): 1, (only,): 3, (only, shared): 1}
+        
+        # Exports cover the chosen election only, with its own roll and voting status
+        path = os.path.join(temp_dir, "council.csv")
+        assert exporters.export(db, 'results', path, election_id=council) == 2
+        with open(path, newline='') as f:
+            assert [(row['name'], row['votes']) for row in csv.DictReader(f)] == [("Council Only", "4"), ("Shared Name", "1")]
+        assert exporters.export(db, 'turnout', path, election_id=council) == 6
+        with open(path, newline='') as f:
+            assert sum(row['has_voted'] == "True" for row in csv.DictReader(f)) == 5, "Turnout should use the election's roll"
+        assert exporters.export(db, 'audit', path, election_id=council) == 5
+        with open(path, newline='') as f:
+            assert {row['election_id'] for row in csv.DictReader(f)} == {str(council)}
+        assert exporters.export(db, 'audit', path) == 1
+        try:
+            exporters.export(db, 'results', path, election_id=999)
+            assert False, "Unknown elections should not export"
+        except ValueError:
+            pass
+        
+        report = federated_tally.federated_tally([db.db_path], workers=1, election_id=council)
+        assert report['results'] == [("Council Only", "", 4), ("Shared Name", "", 1)], f"Unexpected tally: {report['results']}"
+        assert (report['registered'], report['voted']) == (6, 5)
+        
+        db.rebuild_tally()
+        assert db.verify_tally() == [] and db.get_total_votes(council) == 5
+        assert db.get_vote_timeline(election_id=council)[-1][2] == 5, "Rebuilt timeline should stay per election"
+    finally:
+        writer.stop()
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Multiple elections test passed")
+
+def test_legacy_database_migration():
+    """Test that a database from before elections opens with its votes in the default election"""
+    print("Testing migration of a pre-election database...")
+    temp_dir = tempfile.mkdtemp()
+    path = os.path.join(temp_dir, "legacy.db")
+    
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE voters (
+            voter_id TEXT PRIMARY KEY, name TEXT NOT NULL, password_hash TEXT NOT NULL,
+            has_voted BOOLEAN DEFAULT FALSE, registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE candidates (
+            candidate_id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE,
+            party TEXT, description TEXT, added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE votes (
+            vote_id INTEGER PRIMARY KEY AUTOINCREMENT, candidate_id INTEGER NOT NULL,
+            vote_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (candidate_id) REFERENCES candidates (candidate_id)
+        );
+        INSERT INTO voters (voter_id, name, password_hash, has_voted) VALUES ('old001', 'Old Voter', 'x', TRUE);
+        INSERT INTO candidates (name, party) VALUES ('Removed', ''), ('Old A', 'Party A'), ('Old B', 'Party B');
+        DELETE FROM candidates WHERE name = 'Removed';
+        INSERT INTO votes (candidate_id) VALUES (2), (2), (3);
+    ''')
+    conn.commit()
+    conn.close()
+    
+    db = DatabaseManager(path, kdf_iterations=TEST_KDF_ITERATIONS)
+    try:
+        assert [(row[1], row[3]) for row in db.get_voting_results()] == [("Old A", 2), ("Old B", 1)]
+        assert db.get_statistics()['voters_who_voted'] == 1 and db.verify_tally() == []
+        assert db.add_candidate("New C")[0]
+        assert db.get_all_candidates()[-1][0] == 4, "Candidate ids should not be reused after the rebuild"
+        
+        _, _, election_id = db.create_election("After Migration")
+        assert db.add_candidate("Old A", election_id=election_id)[0]
+        assert db.get_total_votes(election_id) == 0 and db.get_total_votes() == 3
+    finally:
+        db.close()
+    
+    # Opening an already migrated database changes nothing
+    db = DatabaseManager(path, kdf_iterations=TEST_KDF_ITERATIONS)
+    try:
+        assert len(db.get_all_candidates(None)) == 4 and db.get_total_votes() == 3
+    finally:
+        cleanup_test_database(db, temp_dir)
+    
+    print("✓ Pre-election database migration test passed")
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 50)
+    print("DATABASE MANAGER - AUTOMATED TESTS")
+    print("=" * 50)
+    
+    try:
+        test_connection_pool_reuse()
+        test_connection_pool_bounded()
+        test_connection_rollback_on_error()
+        test_record_vote_result_codes()
+        test_record_vote_concurrent_double_vote()
+        test_vote_tally_maintenance()
+        test_vote_timeline()
+        test_statistics_aggregates()
+        test_bulk_voter_registration()
+        test_import_voters_csv()
+        test_hot_queries_use_indexes()
+        test_wal_reader_does_not_block_writer()
+        test_group_commit_writer()
+        test_candidate_cache_versioning()
+        test_password_kdf_and_legacy_upgrade()
+        test_voters_page_keyset()
+        test_change_token()
+        test_streaming_exports()
+        test_federated_tally()
+        test_ranked_ballots()
+        test_instant_runoff_engine()
+        test_operation_metrics()
+        test_multiple_elections()
+        test_legacy_database_migration()
+        
+        print("\n" + "=" * 50)
+        print("ALL TESTS PASSED! ✓")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        return False
+    
+    return True
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
\ No newline at end of file
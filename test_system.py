@@ -7,8 +7,24 @@ This script validates all core functionality without requiring GUI interaction.
 
 import os
 import sys
-from database_manager import DatabaseManager
+import shutil
+import tempfile
+import threading
+import time
+import json
+import subprocess
+import http.client
+from types import SimpleNamespace
+from database_manager import DatabaseManager, VOTE_ACCEPTED
 from voting_system import VotingSystem
+from ui_worker import BackgroundWorker
+from admin_panel import AdminPanel
+from tree_sync import TreeSync
+from api_server import ApiServer
+import load_generator
+
+# Seconds a fresh interpreter may spend importing main.py plus the modules every headless command loads
+IMPORT_BUDGET = 0.5
 
 def test_database_creation():
     """Test database initialization"""
@@ -159,11 +175,23 @@ def test_results_and_statistics(voting_system):
     assert stats['voters_who_voted'] == 3, f"Expected 3 voters who voted, got {stats['voters_who_voted']}"
     assert stats['voter_turnout'] == 100.0, f"Expected 100% turnout, got {stats['voter_turnout']}%"
     
+    # Recent activity keyed by vote ID
+    recent = voting_system.get_recent_votes(10, include_ids=True)
+    assert len(recent) == 3 and len(recent[0]) == 4, f"Expected 3 keyed activity rows, got {recent}"
+    assert len({row[0] for row in recent}) == 3, "Activity rows should have distinct vote IDs"
+    
     # Test export summary
     summary = voting_system.export_results_summary()
     assert summary is not None, "Export summary should not be None"
     assert "VOTING RESULTS SUMMARY" in summary, "Summary should contain title"
     
+    # Both layers are timed into the database's metrics registry
+    metrics = voting_system.get_metrics()
+    operations = metrics['operations']
+    assert operations['VotingSystem.cast_vote']['calls'] >= 3, f"cast_vote calls not counted: {operations}"
+    assert operations['DatabaseManager.record_vote']['calls'] >= 3, "record_vote calls not counted"
+    assert metrics['gauges']['connections_opened'] >= 1, "Connections opened should be reported"
+    
     print("✓ Results and statistics test passed")
 
 def test_validation_functions(voting_system):
@@ -196,8 +224,507 @@ def test_validation_functions(voting_system):
     
     print("✓ Validation functions test passed")
 
+def test_concurrent_sessions():
+    """Test that many kiosk sessions can vote concurrently through one VotingSystem"""
+    print("Testing concurrent voting sessions...")
+    temp_dir = tempfile.mkdtemp()
+    db = DatabaseManager(os.path.join(temp_dir, "sessions.db"))
+    
+    try:
+        voting_system = VotingSystem(db)
+        success, msg, admin_session = voting_system.login_admin_session("admin", "admin123")
+        assert success, f"Admin session login failed: {msg}"
+        assert not voting_system.is_admin, "Session logins must not change the default session"
+        
+        voting_system.add_candidate("Session One", session=admin_session)
+        voting_system.add_candidate("Session Two", session=admin_session)
+        candidate_ids = [c[0] for c in voting_system.get_candidates()]
+        voting_system.register_voters_bulk(
+            [(f"kiosk{i:03d}", f"Kiosk Voter {i}", "password123") for i in range(20)],
+            session=admin_session
+        )
+        
+        errors = []
+        
+        def kiosk(i):
+            try:
+                success, msg, session = voting_system.login_voter_session(f"kiosk{i:03d}", "password123")
+                assert success, f"Voter session login failed: {msg}"
+                assert voting_system.get_voting_results(session=session) is None, "Voters must not see results"
+                success, msg = voting_system.cast_vote(candidate_ids[i % 2], session=session)
+                assert success, f"Session vote failed: {msg}"
+                success, msg = voting_system.cast_vote(candidate_ids[i % 2], session=session)
+                assert not success, "Session must not vote twice"
+                voting_system.logout(session)
+                assert not voting_system.is_eligible_to_vote(session), "Closed session must not be eligible"
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=kiosk, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert not errors, f"Concurrent session failed: {errors[0]}"
+        results = voting_system.get_voting_results(session=admin_session)
+        assert sorted(r[3] for r in results) == [10, 10], f"Unexpected session results: {results}"
+        assert voting_system.get_current_user_info()["type"] == "none", "Default session should be untouched"
+    finally:
+        db.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("✓ Concurrent voting sessions test passed")
+
+class Scheduler:
+    """Stands in for the Tk root: queues after() callbacks for the test to run"""
+    def __init__(self):
+        self.callbacks = []
+    
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+    
+    def after_cancel(self, job):
+        pass
+    
+    def pump(self, timeout=5.0):
+        deadline = time.time() + timeout
+        while self.callbacks and time.time() < deadline:
+            self.callbacks.pop(0)()
+            time.sleep(0.001)
+
+class Button:
+    """Stands in for a Tk button the worker disables while a call is in flight"""
+    def __init__(self):
+        self.state = 'normal'
+    
+    def configure(self, state):
+        self.state = state
+
+def test_background_worker():
+    """Test that GUI work runs off the calling thread and reports back through after()"""
+    print("Testing background worker...")
+    
+    root = Scheduler()
+    busy_changes = []
+    worker = BackgroundWorker(root, on_busy=busy_changes.append)
+    button = Button()
+    release = threading.Event()
+    results, errors, threads = [], [], []
+    
+    def slow_call(value):
+        threads.append(threading.current_thread())
+        release.wait(5)
+        return value * 2
+    
+    def failing_call():
+        raise ValueError("database is locked")
+    
+    try:
+        assert worker.submit(slow_call, 21, on_success=results.append, disable=(button,), key='slow')
+        assert button.state == 'disabled', "Button should be disabled while the call is in flight"
+        assert not worker.submit(slow_call, 1, on_success=results.append, key='slow'), "Duplicate call should be dropped"
+        worker.submit(failing_call, on_error=errors.append)
+        assert worker.busy and busy_changes == [True], "Worker should report busy once"
+        
+        release.set()
+        root.pump()
+        
+        assert results == [42], f"Unexpected worker results: {results}"
+        assert isinstance(errors[0], ValueError), "Exceptions should be delivered to on_error"
+        assert threads[0] is not threading.current_thread(), "Call should run on a worker thread"
+        assert button.state == 'normal', "Button should be re-enabled once the result is delivered"
+        assert not worker.busy and busy_changes == [True, False], f"Unexpected busy changes: {busy_changes}"
+        
+        # Background probes run without flashing the busy indicator
+        worker.submit(slow_call, 1, on_success=results.append, show_busy=False)
+        assert not worker.busy, "Quiet calls should not mark the worker busy"
+        root.pump()
+        assert results[-1] == 2 and busy_changes == [True, False], "Quiet call should not change busy state"
+    finally:
+        release.set()
+        worker.shutdown()
+    
+    print("✓ Background worker test passed")
+
+def test_admin_panel_worker_calls():
+    """Test the admin panel's background calls for the selected election, without a display"""
+    print("Testing admin panel worker calls...")
+    temp_dir = tempfile.mkdtemp()
+    db = DatabaseManager(os.path.join(temp_dir, "panel.db"), kdf_iterations=1000)
+    root = Scheduler()
+    worker = BackgroundWorker(root)
+    errors = []
+    worker.report_error = errors.append
+    
+    try:
+        voting_system = VotingSystem(db)
+        voting_system.login_admin("admin", "admin123")
+        voting_system.add_candidate("General Seat")
+        voting_system.register_voters_bulk([(f"panel{i}", f"Panel Voter {i}", "password123") for i in range(3)])
+        success, msg, council = voting_system.create_election("Panel Council")
+        voting_system.add_candidate("Council Seat", election_id=council)
+        voting_system.add_election_voters(council)
+        council_seat = voting_system.get_candidates(council)[0][0]
+        assert db.record_vote("panel0", council_seat, election_id=council) == VOTE_ACCEPTED
+        
+        # Only the widgets the calls read are stood in for; results are recorded instead of drawn
+        panel = AdminPanel(SimpleNamespace(root=root, worker=worker), voting_system)
+        delivered = {}
+        for callback in ('show_candidates', 'show_results', 'show_recent_activity', 'show_timeline', 'show_runoff',
+                         'show_statistics', 'show_summary', 'on_candidate_added', 'on_roll_changed'):
+            setattr(panel, callback, lambda result, name=callback, **kwargs: delivered.setdefault(name, []).append(result))
+        for button in ('add_candidate_btn', 'refresh_results_btn', 'recount_runoff_btn', 'export_btn',
+                       'remove_from_roll_btn'):
+            setattr(panel, button, Button())
+        panel.runoff_tree = panel.activity_tree = panel.timeline_canvas = object()
+        panel.timeline_width_var = SimpleNamespace(get=lambda: '1 min')
+        panel.voters_tree = SimpleNamespace(yview_moveto=lambda fraction: None, selection=lambda: ("panel0", "panel2"))
+        panel.voters_sync = SimpleNamespace(clear=lambda: None)
+        panel.voter_filter_var = SimpleNamespace(get=lambda: 'Voted')
+        panel.voter_sort = ('Voter ID', False)
+        panel.show_voters = lambda: delivered.setdefault('show_voters', []).append(list(panel.voter_rows))
+        
+        # Picking an election in the header reloads every view for it
+        panel.elections = {"General Election": 1, "Panel Council": council}
+        panel.election_var = SimpleNamespace(get=lambda: "Panel Council")
+        panel.select_election()
+        root.pump()
+        assert not errors, f"Admin calls failed: {errors}"
+        assert [c[1] for c in delivered['show_candidates'][-1]] == ["Council Seat"]
+        assert delivered['show_results'][-1] == ([(council_seat, "Council Seat", "", 1)], 1)
+        assert delivered['show_statistics'][-1]['total_votes'] == 1
+        assert delivered['show_runoff'][-1]['winner'] == council_seat
+        assert len(delivered['show_recent_activity'][-1]) == 1 and delivered['show_timeline'][-1][1] == 3
+        assert [v[0] for v in delivered['show_voters'][-1]] == ["panel0"], "Voters tab should show the council roll's status"
+        
+        # Removing selected voters from the roll keeps anyone who has already voted
+        panel.remove_from_roll()
+        root.pump()
+        assert delivered['on_roll_changed'][-1] == (True, "Removed 1 voters from the roll\n⚠ 1 were not on the roll or have already voted")
+        assert voting_system.get_statistics(council)['total_voters'] == 2
+        assert db.add_election_voters(council, ["panel2"]) == 1
+        
+        # Buttons act on the selected election
+        entries = {'candidate_name_entry': "Council Second", 'candidate_party_entry': "", 'candidate_desc_entry': ""}
+        for entry, text in entries.items():
+            setattr(panel, entry, SimpleNamespace(get=lambda text=text: text, delete=lambda *args: None))
+        panel.add_candidate()
+        panel.refresh_runoff()
+        panel.export_results()
+        root.pump()
+        assert not errors, f"Admin calls failed: {errors}"
+        assert delivered['on_candidate_added'][-1][0], f"Add candidate failed: {delivered['on_candidate_added']}"
+        assert [c[1] for c in voting_system.get_candidates(council)] == ["Council Seat", "Council Second"]
+        assert "Election: Panel Council" in delivered['show_summary'][-1]
+        assert all(button.state == 'normal' for button in (panel.add_candidate_btn, panel.export_btn))
+        
+        # A new vote moves the change token and refreshes the statistics, but only Recount recounts the runoff
+        panel.on_change_token(voting_system.get_change_token())
+        root.pump()
+        recounts = len(delivered['show_runoff'])
+        assert db.record_vote("panel1", council_seat, election_id=council) == VOTE_ACCEPTED
+        panel.on_change_token(voting_system.get_change_token())
+        root.pump()
+        assert not errors, f"Auto-refresh failed: {errors}"
+        assert delivered['show_statistics'][-1]['total_votes'] == 2, "Statistics should follow new votes"
+        assert delivered['show_results'][-1][1] == 2, "Results should follow new votes"
+        assert len(delivered['show_runoff']) == recounts, "Change probes should not recount the runoff"
+    finally:
+        worker.shutdown()
+        db.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("✓ Admin panel worker calls test passed")
+
+def test_tree_sync():
+    """Test that Treeview refreshes only touch rows that changed"""
+    print("Testing keyed Treeview sync...")
+    
+    class Tree:
+        """Records the Treeview calls TreeSync makes"""
+        def __init__(self):
+            self.children = []
+            self.values = {}
+            self.calls = 0
+        
+        def insert(self, parent, index, iid, values):
+            self.children.insert(index, iid)
+            self.values[iid] = values
+            self.calls += 1
+        
+        def item(self, iid, values):
+            self.values[iid] = values
+            self.calls += 1
+        
+        def delete(self, *iids):
+            for iid in iids:
+                self.children.remove(iid)
+                del self.values[iid]
+            self.calls += 1
+        
+        def move(self, iid, parent, index):
+            self.children.remove(iid)
+            self.children.insert(index, iid)
+            self.calls += 1
+    
+    tree = Tree()
+    sync = TreeSync(tree)
+    roll = [(f"V{i:04d}", (f"V{i:04d}", f"Voter {i}", "No")) for i in range(1000)]
+    
+    assert sync.sync(roll) == (1000, 0, 0), "First sync should insert every row"
+    tree.calls = 0
+    assert sync.sync(roll) == (0, 0, 0) and tree.calls == 0, "Unchanged rows should cost no Treeview calls"
+    
+    roll[10] = ("V0010", ("V0010", "Voter 10", "Yes"))
+    del roll[500]
+    roll.insert(0, ("A0001", ("A0001", "New Voter", "No")))
+    assert sync.sync(roll) == (1, 1, 1), "Only the changed rows should be touched"
+    assert tree.calls == 3, f"Expected 3 Treeview calls, got {tree.calls}"
+    assert tree.children == [key for key, _ in roll], "Display order should follow the rows"
+    assert tree.values["V0010"][2] == "Yes", "Updated row should show new values"
+    
+    # Results reorder when the leader changes
+    results = [(1, (1, "Alice", 5)), (2, (2, "Bob", 3)), (3, (3, "Carol", 1))]
+    ranking = TreeSync(Tree())
+    ranking.sync(results)
+    ranking.sync([(2, (1, "Bob", 6)), (1, (2, "Alice", 5)), (3, (3, "Carol", 1))])
+    assert ranking.tree.children == ["2", "1", "3"], f"Rows should be reordered: {ranking.tree.children}"
+    
+    print("✓ Keyed Treeview sync test passed")
+
+def api_request(conn, method, path, payload=None, token=None):
+    """Send one JSON request over an open connection; returns (status, decoded body)"""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f"Bearer {token}"
+    body = json.dumps(payload) if payload is not None else None
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_api_server():
+    """Test the JSON API end to end over localhost, including concurrent kiosks"""
+    print("Testing JSON API server...")
+    temp_dir = tempfile.mkdtemp()
+    db = DatabaseManager(os.path.join(temp_dir, "api.db"), kdf_iterations=1000)
+    server = None
+    
+    try:
+        voting_system = VotingSystem(db)
+        success, msg, admin_session = voting_system.login_admin_session("admin", "admin123")
+        voting_system.add_candidate("API One", "Party A", session=admin_session)
+        voting_system.add_candidate("API Two", session=admin_session)
+        voting_system.register_voters_bulk(
+            [(f"api{i:03d}", f"API Voter {i}", "password123") for i in range(25)], session=admin_session
+        )
+        
+        server = ApiServer(voting_system, port=0)
+        port = server.run_in_thread()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        
+        assert api_request(conn, 'GET', '/api/health')[0] == 200
+        status, body = api_request(conn, 'GET', '/api/candidates')
+        candidate_ids = [c['candidate_id'] for c in body['candidates']]
+        assert status == 200 and [c['name'] for c in body['candidates']] == ["API One", "API Two"]
+        
+        # Logins, tokens and permissions
+        status, body = api_request(conn, 'POST', '/api/login', {'user_id': "api000", 'password': "wrong"})
+        assert status == 401 and not body['ok'], "Bad password should be rejected"
+        status, body = api_request(conn, 'POST', '/api/login', {'user_id': "api000", 'password': "password123"})
+        assert status == 200 and body['name'] == "API Voter 0", f"Voter login failed: {body}"
+        voter_token = body['token']
+        assert api_request(conn, 'GET', '/api/results', token=voter_token)[0] == 403, "Voters must not see results"
+        assert api_request(conn, 'POST', '/api/vote', {'candidate_id': candidate_ids[0]})[0] == 401
+        assert api_request(conn, 'POST', '/api/vote', {'candidate_id': "1"}, voter_token)[0] == 400
+        status, body = api_request(conn, 'POST', '/api/vote', {'candidate_id': candidate_ids[0]}, voter_token)
+        assert status == 200 and body['ok'], f"API vote failed: {body}"
+        assert api_request(conn, 'POST', '/api/vote', {'candidate_id': candidate_ids[0]}, voter_token)[0] == 409
+        assert api_request(conn, 'POST', '/api/logout', token=voter_token)[0] == 200
+        assert api_request(conn, 'POST', '/api/logout', token=voter_token)[0] == 401, "Token should end with logout"
+        
+        # Malformed requests get JSON errors and the connection stays usable
+        conn.request('POST', '/api/login', body="{not json", headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        assert response.status == 400 and not json.loads(response.read())['ok']
+        assert api_request(conn, 'GET', '/api/nowhere')[0] == 404
+        assert api_request(conn, 'GET', '/api/vote')[0] == 405
+        
+        # Many kiosks at once, each on its own keep-alive connection
+        errors = []
+        
+        def kiosk(i):
+            try:
+                kiosk_conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                status, body = api_request(kiosk_conn, 'POST', '/api/login',
+                                           {'user_id': f"api{i:03d}", 'password': "password123"})
+                assert status == 200, f"Kiosk login failed: {body}"
+                status, body = api_request(kiosk_conn, 'POST', '/api/vote',
+                                           {'candidate_id': candidate_ids[i % 2]}, body['token'])
+                assert status == 200, f"Kiosk vote failed: {body}"
+                kiosk_conn.close()
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=kiosk, args=(i,)) for i in range(1, 25)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, f"Concurrent API vote failed: {errors[0]}"
+        
+        status, body = api_request(conn, 'POST', '/api/login',
+                                   {'user_type': "admin", 'user_id': "admin", 'password': "admin123"})
+        admin_token = body['token']
+        status, body = api_request(conn, 'GET', '/api/results', token=admin_token)
+        assert status == 200 and body['total_votes'] == 25, f"Unexpected API results: {body}"
+        assert [r['votes'] for r in body['results']] == [13, 12] and body['results'][0]['name'] == "API One"
+        status, body = api_request(conn, 'GET', '/api/statistics', token=admin_token)
+        assert status == 200 and body['voters_who_voted'] == 25 and body['voter_turnout'] == 100.0
+        
+        # Ranked ballots count their first choice in the results and every choice in the runoff
+        voting_system.register_voters_bulk(
+            [(f"rank{i:03d}", f"Ranked Voter {i}", "password123") for i in range(2)], session=admin_session
+        )
+        for i in range(2):
+            status, body = api_request(conn, 'POST', '/api/login', {'user_id': f"rank{i:03d}", 'password': "password123"})
+            token = body['token']
+            assert api_request(conn, 'POST', '/api/vote', {'rankings': "1, 2"}, token)[0] == 400
+            status, body = api_request(conn, 'POST', '/api/vote', {'rankings': [candidate_ids[1]] * 2}, token)
+            assert status == 409 and body['error'] == "Each candidate can only be ranked once"
+            status, body = api_request(conn, 'POST', '/api/vote', {'rankings': candidate_ids[::-1]}, token)
+            assert status == 200 and body['ok'], f"Ranked API vote failed: {body}"
+        
+        assert api_request(conn, 'GET', '/api/runoff', token=voter_token)[0] == 401
+        status, body = api_request(conn, 'GET', '/api/runoff', token=admin_token)
+        assert status == 200 and body['winner_name'] == "API Two" and body['ballots'] == 27, f"Unexpected runoff: {body}"
+        assert [c['votes'] for c in body['rounds'][0]['counts']] == [14, 13]
+        
+        # Kiosks choose an election at login; admins pick one with ?election_id=
+        success, msg, council = voting_system.create_election("API Council", session=admin_session)
+        voting_system.add_candidate("Council Seat", session=admin_session, election_id=council)
+        voting_system.add_election_voters(council, ["api000"], session=admin_session)
+        status, body = api_request(conn, 'GET', '/api/elections')
+        assert status == 200 and [e['name'] for e in body['elections']] == ["General Election", "API Council"]
+        status, body = api_request(conn, 'GET', f'/api/candidates?election_id={council}')
+        assert [c['name'] for c in body['candidates']] == ["Council Seat"]
+        council_candidate = body['candidates'][0]['candidate_id']
+        
+        status, body = api_request(conn, 'POST', '/api/login',
+                                   {'user_id': "api001", 'password': "password123", 'election_id': council})
+        assert status == 401, "Voters off the election's roll should not log in to it"
+        status, body = api_request(conn, 'POST', '/api/login',
+                                   {'user_id': "api000", 'password': "password123", 'election_id': council})
+        assert status == 200, f"Council login failed: {body}"
+        token = body['token']
+        assert api_request(conn, 'POST', '/api/vote', {'candidate_id': candidate_ids[0]}, token)[0] != 200, \
+            "General election candidates should be rejected in the council election"
+        assert api_request(conn, 'POST', '/api/vote', {'candidate_id': council_candidate}, token)[0] == 200
+        
+        status, body = api_request(conn, 'GET', f'/api/results?election_id={council}', token=admin_token)
+        assert status == 200 and body['total_votes'] == 1 and body['results'][0]['name'] == "Council Seat"
+        assert api_request(conn, 'GET', '/api/results', token=admin_token)[1]['total_votes'] == 27
+        assert api_request(conn, 'GET', '/api/results?election_id=abc', token=admin_token)[0] == 400
+        conn.close()
+        assert server.stats['connections'] >= 25, "Kiosks should have used separate connections"
+    finally:
+        if server is not None:
+            server.stop()
+        db.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("✓ JSON API server test passed")
+
+def test_headless_startup():
+    """Test that headless commands never import tkinter and that startup imports stay within budget"""
+    print("Testing headless startup...")
+    temp_dir = tempfile.mkdtemp()
+    
+    try:
+        db_path = os.path.join(temp_dir, "headless.db")
+        db = DatabaseManager(db_path, kdf_iterations=1000)
+        db.add_candidate("Headless Candidate")
+        db.close()
+        
+        # A fresh interpreter, since this one has already imported tkinter for other tests
+        script = (
+            "import sys, time\n"
+            "started = time.perf_counter()\n"
+            "import main, voting_system\n"
+            "elapsed = time.perf_counter() - started\n"
+            f"ok = main.main(['--headless', 'stats', '--db', {db_path!r}, '--json'])\n"
+            "print(ok, 'tkinter' in sys.modules, elapsed)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True, text=True, timeout=120,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        assert result.returncode == 0, f"Headless stats failed: {result.stderr}"
+        
+        output, status = result.stdout.rsplit("\n", 2)[:2]
+        ok, tkinter_loaded, elapsed = status.split()
+        stats = json.loads(output)
+        assert ok == "True" and stats['total_candidates'] == 1, f"Unexpected stats output: {result.stdout}"
+        assert stats['results'][0]['name'] == "Headless Candidate"
+        assert tkinter_loaded == "False", "Headless commands must not import tkinter"
+        assert float(elapsed) < IMPORT_BUDGET, f"Startup imports took {float(elapsed):.3f}s (budget {IMPORT_BUDGET}s)"
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("✓ Headless startup test passed")
+
+def test_load_generator():
+    """Test simulated kiosk load against VotingSystem directly and through a local API server"""
+    print("Testing load generator...")
+    temp_dir = tempfile.mkdtemp()
+    
+    try:
+        for mode, extra in (("direct", []), ("api", ['--serve'])):
+            db_path = os.path.join(temp_dir, f"load_{mode}.db")
+            report_path = os.path.join(temp_dir, f"load_{mode}.json")
+            ok = load_generator.main(['--seed', '60', '--db', db_path, '--kdf-iterations', '1000',
+                                      '--concurrency', '8', '--output', report_path] + extra)
+            assert ok, f"Load run ({mode}) reported failed votes"
+            with open(report_path, encoding='utf-8') as f:
+                report = json.load(f)
+            assert report['votes_cast'] == 60, f"Expected 60 votes ({mode}), got {report['votes_cast']}"
+            for phase in load_generator.PHASES:
+                stats = report['phases'][phase]
+                assert stats['count'] == 60 and stats['errors'] == 0 and stats['lock_errors'] == 0, \
+                    f"Unexpected {phase} stats ({mode}): {stats}"
+                assert 0 < stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'] <= stats['max_ms']
+            
+            db = DatabaseManager(db_path)
+            try:
+                assert db.get_total_votes() == 60, "Every simulated vote should be counted"
+            finally:
+                db.close()
+        
+        # A second run over the same roll fails, since those voters have all voted
+        roll_path = os.path.join(temp_dir, "roll.csv")
+        with open(roll_path, 'w', encoding='utf-8') as f:
+            f.write("voter_id,name,password\n")
+            for i in range(5):
+                f.write(f"{load_generator.voter_id_for(i)},Voter {i},{load_generator.VOTER_PASSWORD}\n")
+        assert len(load_generator.load_credentials(roll_path)) == 5
+        assert not load_generator.main(['--roll', roll_path, '--db', os.path.join(temp_dir, "load_direct.db"),
+                                        '--concurrency', '2'])
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    print("✓ Load generator test passed")
+
 def cleanup_test_database():
     """Clean up test database"""
+    # WAL mode keeps -wal/-shm files next to the database while it is open
+    for suffix in ("-wal", "-shm"):
+        try:
+            os.remove("test_voting.db" + suffix)
+        except FileNotFoundError:
+            pass
+    
     try:
         os.remove("test_voting.db")
         print("✓ Test database cleaned up")
@@ -227,6 +754,13 @@ def run_all_tests():
         test_voting_process(voting_system, candidates)
         test_results_and_statistics(voting_system)
         test_validation_functions(voting_system)
+        test_concurrent_sessions()
+        test_background_worker()
+        test_admin_panel_worker_calls()
+        test_tree_sync()
+        test_api_server()
+        test_headless_startup()
+        test_load_generator()
         
         print("\n" + "=" * 50)
         print("ALL TESTS PASSED! ✓")
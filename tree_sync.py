@@ -0,0 +1,59 @@
+# Code created by https://linktr.ee/saran709
+
+class TreeSync:
+    """
+    Keeps a ttk.Treeview in step with a keyed list of rows.
+    Each refresh is compared with the previous one and only rows that were
+    added, changed or removed are touched, so scroll position and selection
+    survive and the Tk work grows with the number of changes, not the table.
+    """
+    
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}  # iid -> values currently shown
+        self.order = []  # iids in display order
+    
+    def sync(self, rows):
+        """
+        Show rows, given as (key, values) pairs in display order
+        Returns: (inserted, updated, removed) counts
+        """
+        new_rows = {}
+        new_order = []
+        for key, values in rows:
+            iid = str(key)
+            new_rows[iid] = tuple(values)
+            new_order.append(iid)
+        
+        removed = [iid for iid in self.order if iid not in new_rows]
+        if removed:
+            self.tree.delete(*removed)
+        
+        survivors = [iid for iid in self.order if iid in new_rows]
+        if survivors != [iid for iid in new_order if iid in self.rows]:
+            # Rows swapped places (e.g. a new leader in the results), so put survivors in order first
+            for index, iid in enumerate(iid for iid in new_order if iid in self.rows):
+                self.tree.move(iid, '', index)
+        
+        inserted = updated = 0
+        for index, iid in enumerate(new_order):
+            values = new_rows[iid]
+            old_values = self.rows.get(iid)
+            if old_values is None:
+                # Earlier rows are already in place, so index is the final position
+                self.tree.insert('', index, iid=iid, values=values)
+                inserted += 1
+            elif old_values != values:
+                self.tree.item(iid, values=values)
+                updated += 1
+        
+        self.rows = new_rows
+        self.order = new_order
+        return inserted, updated, len(removed)
+    
+    def clear(self):
+        """Remove every row"""
+        if self.order:
+            self.tree.delete(*self.order)
+        self.rows = {}
+        self.order = []
\ No newline at end of file
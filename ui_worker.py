@@ -0,0 +1,128 @@
+# Code created by https://linktr.ee/saran709
+import queue
+import tkinter as tk
+from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
+
+class BackgroundWorker:
+    """
+    Runs VotingSystem calls on a background executor so the Tk event loop never
+    waits on SQLite or password hashing. Finished calls are queued and handed
+    back to their callbacks on the Tk thread by a root.after poll, since Tk
+    widgets must only be touched from the thread that created them.
+    """
+    
+    def __init__(self, root, max_workers=2, poll_interval=30, on_busy=None):
+        """
+        poll_interval: milliseconds between checks for finished calls
+        on_busy: called on the Tk thread with True/False as work starts and stops
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.on_busy = on_busy
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ui-worker")
+        self._done = queue.Queue()
+        self._in_flight = {}
+        self._visible = set()
+        self._keys = set()
+        self._next_id = 0
+        self._poll_job = None
+    
+    @property
+    def busy(self):
+        """True while any call shown on the busy indicator has not been delivered yet"""
+        return bool(self._visible)
+    
+    def submit(self, function, *args, on_success=None, on_error=None, disable=(), key=None, show_busy=True):
+        """
+        Run function(*args) in the background.
+        on_success(result) or on_error(exception) is called on the Tk thread afterwards.
+        Widgets in disable are disabled until then. A call with the same key as one
+        still in flight is dropped, so repeated clicks and timers do not pile up.
+        show_busy: False for periodic background checks that should not flash the busy indicator
+        Returns: True if the call was queued
+        """
+        if key is not None and key in self._keys:
+            return False
+        
+        for widget in disable:
+            self._set_state(widget, 'disabled')
+        
+        call_id = self._next_id
+        self._next_id += 1
+        was_busy = self.busy
+        self._in_flight[call_id] = (on_success, on_error, disable, key)
+        if key is not None:
+            self._keys.add(key)
+        if show_busy:
+            self._visible.add(call_id)
+            if not was_busy and self.on_busy:
+                self.on_busy(True)
+        
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(lambda f: self._done.put((call_id, f)))
+        self._schedule_poll()
+        return True
+    
+    def _schedule_poll(self):
+        """Make sure a poll is pending on the Tk event loop"""
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.poll_interval, self._poll)
+    
+    def _poll(self):
+        """Deliver finished calls to their callbacks on the Tk thread"""
+        self._poll_job = None
+        was_busy = self.busy
+        while True:
+            try:
+                call_id, future = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(call_id, future)
+        
+        if self._in_flight:
+            self._schedule_poll()
+        if was_busy and not self.busy and self.on_busy:
+            self.on_busy(False)
+    
+    def _deliver(self, call_id, future):
+        """Re-enable widgets and run one call's callback"""
+        on_success, on_error, disable, key = self._in_flight.pop(call_id)
+        self._visible.discard(call_id)
+        self._keys.discard(key)
+        for widget in disable:
+            self._set_state(widget, 'normal')
+        
+        error = future.exception()
+        try:
+            if error is None:
+                if on_success:
+                    on_success(future.result())
+            elif on_error:
+                on_error(error)
+            else:
+                self.report_error(error)
+        except tk.TclError:
+            # The screen the result was meant for has already been torn down
+            pass
+    
+    def report_error(self, error):
+        """Default handler for calls submitted without on_error"""
+        messagebox.showerror("Error", f"Operation failed: {error}")
+    
+    def _set_state(self, widget, state):
+        """Enable or disable a widget that may since have been destroyed"""
+        try:
+            widget.configure(state=state)
+        except tk.TclError:
+            pass
+    
+    def shutdown(self):
+        """Stop polling and let running calls finish in the background"""
+        if self._poll_job is not None:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except tk.TclError:
+                pass
+            self._poll_job = None
+        self._executor.shutdown(wait=False)
\ No newline at end of file
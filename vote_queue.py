@@ -0,0 +1,139 @@
+# Code created by https://linktr.ee/saran709
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from database_manager import DEFAULT_ELECTION_ID
+
+class GroupCommitWriter:
+    """
+    Write-behind vote queue drained by a single writer thread.
+    Votes submitted by many kiosks are committed together in batches, so one
+    fsync covers a whole batch. Callers are only acknowledged once their
+    batch has been committed.
+    """
+    
+    def __init__(self, db, max_batch_size=64, max_delay=0.005):
+        """
+        max_batch_size: most votes committed in one transaction
+        max_delay: seconds to wait for more votes after the first one arrives
+        """
+        self.db = db
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._started_at = None
+        self.metrics = {
+            'votes_submitted': 0,
+            'votes_processed': 0,
+            'batches_committed': 0,
+            'largest_batch': 0,
+            'failed_batches': 0,
+            'commit_seconds': 0.0,
+        }
+    
+    def start(self):
+        """Start the writer thread"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._started_at = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name="vote-writer", daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Commit everything already queued, then stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+    
+    def submit(self, voter_id, candidate_id, rankings=None, election_id=DEFAULT_ELECTION_ID):
+        """
+        Queue a vote for the writer thread
+        rankings: full preference order of a ranked ballot, starting with candidate_id
+        election_id: election the vote is for
+        Returns: Future resolving to a VOTE_* result code once the batch is durable
+        """
+        if self._thread is None:
+            self.start()
+        
+        future = Future()
+        with self._lock:
+            self.metrics['votes_submitted'] += 1
+        self._queue.put((voter_id, candidate_id, rankings, election_id, future))
+        return future
+    
+    def cast_vote(self, voter_id, candidate_id, rankings=None, election_id=DEFAULT_ELECTION_ID, timeout=None):
+        """
+        Queue a vote and wait until its batch has been committed
+        Returns: VOTE_* result code
+        """
+        return self.submit(voter_id, candidate_id, rankings, election_id).result(timeout)
+    
+    def _run(self):
+        """Writer loop: gather a batch, commit it, acknowledge callers"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            
+            # Keep collecting until the batch is full or the delay window closes
+            deadline = time.perf_counter() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            self._commit_batch(batch)
+    
+    def _commit_batch(self, batch):
+        """Commit one batch and resolve its futures"""
+        started = time.perf_counter()
+        try:
+            results = self.db.record_votes_batch([item[:4] for item in batch])
+        except Exception as e:
+            with self._lock:
+                self.metrics['failed_batches'] += 1
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+        
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.metrics['votes_processed'] += len(batch)
+            self.metrics['batches_committed'] += 1
+            self.metrics['largest_batch'] = max(self.metrics['largest_batch'], len(batch))
+            self.metrics['commit_seconds'] += elapsed
+        
+        for (*_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def get_metrics(self):
+        """Get queue depth, batch sizes and committed votes per second"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            started_at = self._started_at
+        
+        batches = max(metrics['batches_committed'], 1)
+        metrics['pending'] = self._queue.qsize()
+        metrics['average_batch_size'] = metrics['votes_processed'] / batches
+        metrics['average_commit_ms'] = metrics['commit_seconds'] / batches * 1000
+        uptime = time.perf_counter() - started_at if started_at else 0.0
+        metrics['votes_per_second'] = metrics['votes_processed'] / uptime if uptime > 0 else 0.0
+        return metrics
\ No newline at end of file
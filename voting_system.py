@@ -1,120 +1,272 @@
 # Code created by https://linktr.ee/saran709
-from database_manager import DatabaseManager
+import secrets
+from database_manager import DatabaseManager, DEFAULT_ELECTION_ID, VOTE_ACCEPTED, VOTE_INVALID_CANDIDATE
+from vote_queue import GroupCommitWriter
+import exporters
+import irv
+from metrics import instrument
 from datetime import datetime
 
+class VotingSession:
+    """
+    Identity and permissions of one logged-in voter or admin.
+    Sessions are independent, so many kiosks can share one VotingSystem.
+    A voter session is for the one election the voter logged in to.
+    """
+    
+    def __init__(self, user_type, user_id, name=None, election_id=DEFAULT_ELECTION_ID):
+        self.session_id = secrets.token_hex(16)
+        self.user_type = user_type  # "voter" or "admin"
+        self.user_id = user_id
+        self.name = name
+        self.election_id = election_id
+        self.created_at = datetime.now()
+        self.active = True
+    
+    @property
+    def is_admin(self):
+        """Whether this session carries admin permissions"""
+        return self.active and self.user_type == "admin"
+    
+    @property
+    def voter_id(self):
+        """Voter ID for an active voter session, otherwise None"""
+        if self.active and self.user_type == "voter":
+            return self.user_id
+        return None
+    
+    def close(self):
+        """End the session; it keeps no permissions afterwards"""
+        self.active = False
+
+@instrument()
 class VotingSystem:
     """
     Core voting system logic and business rules
+    
+    Every operation accepts an optional session returned by login_voter_session /
+    login_admin_session. Without one, the default session set by login_voter /
+    login_admin is used, which keeps the single-user GUI API unchanged.
+    VotingSystem holds no other per-user state, so sessions may be used from
+    several threads at once against one shared DatabaseManager.
+    
+    With group_commit=True, votes go through a GroupCommitWriter that commits
+    concurrent ballots in batches; cast_vote still returns only once durable.
+    
+    Public methods are timed into the same metrics registry as the database.
     """
     
-    def __init__(self):
-        self.db = DatabaseManager()
-        self.current_voter = None
-        self.is_admin = False
+    def __init__(self, db=None, group_commit=False):
+        self.db = db if db is not None else DatabaseManager()
+        self.session = None
+        self.vote_writer = GroupCommitWriter(self.db) if group_commit else None
+        if self.vote_writer is not None:
+            self.metrics.add_gauge('vote_queue', self.vote_writer.get_metrics)
+    
+    @property
+    def metrics(self):
+        """Metrics registry shared with the database"""
+        return self.db.metrics
+    
+    @property
+    def current_voter(self):
+        """Voter ID of the default session"""
+        return self.session.voter_id if self.session else None
+    
+    @property
+    def is_admin(self):
+        """Whether the default session is an admin session"""
+        return self.session is not None and self.session.is_admin
+    
+    def _resolve_session(self, session):
+        """Use the explicit session if given, otherwise the default one"""
+        return session if session is not None else self.session
     
-    def login_voter(self, voter_id, password):
+    def _is_admin(self, session):
+        """Check admin permissions for an explicit or default session"""
+        session = self._resolve_session(session)
+        return session is not None and session.is_admin
+    
+    def _voter_id(self, session):
+        """Voter ID for an explicit or default session"""
+        session = self._resolve_session(session)
+        return session.voter_id if session else None
+    
+    def _election_id(self, session):
+        """Election of an explicit or default voter session"""
+        session = self._resolve_session(session)
+        return session.election_id if session else DEFAULT_ELECTION_ID
+    
+    def _login_voter(self, voter_id, password, election_id=DEFAULT_ELECTION_ID):
         """
-        Authenticate and login a voter
-        Returns: (success, message, voter_name)
+        Authenticate a voter for one election
+        Returns: (success, message, voter_name, session)
         """
-        success, voter_name, has_voted = self.db.authenticate_voter(voter_id, password)
+        success, voter_name, has_voted = self.db.authenticate_voter(voter_id, password, election_id)
         
         if not success:
-            return False, "Invalid voter ID or password", None
+            return False, "Invalid voter ID or password", None, None
+        
+        if has_voted is None:
+            return False, "You are not on the roll for this election", voter_name, None
         
         if has_voted:
-            return False, "You have already voted in this election", voter_name
+            return False, "You have already voted in this election", voter_name, None
         
-        self.current_voter = voter_id
-        self.is_admin = False
-        return True, f"Welcome {voter_name}!", voter_name
+        session = VotingSession("voter", voter_id, voter_name, election_id)
+        return True, f"Welcome {voter_name}!", voter_name, session
+    
+    def login_voter_session(self, voter_id, password, election_id=DEFAULT_ELECTION_ID):
+        """
+        Authenticate a voter for one election and return a new independent session
+        Returns: (success, message, session)
+        """
+        success, message, voter_name, session = self._login_voter(voter_id, password, election_id)
+        return success, message, session
+    
+    def login_admin_session(self, admin_id, password):
+        """
+        Authenticate an admin and return a new independent session
+        Returns: (success, message, session)
+        """
+        if not self.db.authenticate_admin(admin_id, password):
+            return False, "Invalid admin credentials", None
+        
+        return True, "Admin login successful", VotingSession("admin", admin_id, admin_id)
+    
+    def login_voter(self, voter_id, password, election_id=DEFAULT_ELECTION_ID):
+        """
+        Authenticate and login a voter as the default session
+        Returns: (success, message, voter_name)
+        """
+        success, message, voter_name, session = self._login_voter(voter_id, password, election_id)
+        
+        if success:
+            self.session = session
+        return success, message, voter_name
     
     def login_admin(self, admin_id, password):
         """
-        Authenticate and login an admin
+        Authenticate and login an admin as the default session
         Returns: (success, message)
         """
-        success = self.db.authenticate_admin(admin_id, password)
+        success, message, session = self.login_admin_session(admin_id, password)
         
         if success:
-            self.current_voter = None
-            self.is_admin = True
-            return True, "Admin login successful"
-        else:
-            return False, "Invalid admin credentials"
+            self.session = session
+        return success, message
     
-    def logout(self):
-        """Logout current user"""
-        self.current_voter = None
-        self.is_admin = False
+    def logout(self, session=None):
+        """Logout the given session, or the default session"""
+        if session is not None:
+            session.close()
+            if session is self.session:
+                self.session = None
+        elif self.session is not None:
+            self.session.close()
+            self.session = None
     
-    def cast_vote(self, candidate_id):
+    def cast_vote(self, candidate_id, session=None):
         """
         Cast a vote for the specified candidate
         Returns: (success, message)
         """
-        if not self.current_voter:
+        voter_id = self._voter_id(session)
+        if not voter_id:
             return False, "Please login first"
         
-        if not self.is_eligible_to_vote():
-            return False, "You are not eligible to vote"
-        
-        # Verify candidate exists
-        candidates = self.db.get_all_candidates()
-        candidate_exists = any(c[0] == candidate_id for c in candidates)
+        return self._record_vote(voter_id, candidate_id, election_id=self._election_id(session))
+    
+    def cast_ranked_vote(self, rankings, session=None):
+        """
+        Cast a ranked ballot; rankings lists candidate ids, most preferred first
+        The first choice counts in the plurality results, the full order in the instant runoff
+        Returns: (success, message)
+        """
+        voter_id = self._voter_id(session)
+        if not voter_id:
+            return False, "Please login first"
         
-        if not candidate_exists:
-            return False, "Invalid candidate selection"
+        rankings = list(rankings or ())
+        if not rankings:
+            return False, "Please rank at least one candidate"
+        if len(set(rankings)) != len(rankings):
+            return False, "Each candidate can only be ranked once"
         
+        return self._record_vote(voter_id, rankings[0], rankings, self._election_id(session))
+    
+    def _record_vote(self, voter_id, candidate_id, rankings=None, election_id=DEFAULT_ELECTION_ID):
+        """
+        Store a vote for an authenticated voter
+        Returns: (success, message)
+        """
         try:
-            # Cast the vote
-            self.db.cast_vote(candidate_id)
-            
-            # Mark voter as having voted
-            self.db.mark_voter_as_voted(self.current_voter)
-            
-            return True, "Your vote has been cast successfully!"
-        
+            # Eligibility, candidate validation and the vote itself happen in one transaction
+            if self.vote_writer is not None:
+                result = self.vote_writer.cast_vote(voter_id, candidate_id, rankings, election_id)
+            else:
+                result = self.db.record_vote(voter_id, candidate_id, rankings, election_id)
         except Exception as e:
             return False, f"Error casting vote: {str(e)}"
+        
+        if result == VOTE_ACCEPTED:
+            return True, "Your vote has been cast successfully!"
+        if result == VOTE_INVALID_CANDIDATE:
+            return False, "Invalid candidate selection"
+        return False, "You are not eligible to vote"
     
-    def is_eligible_to_vote(self):
-        """Check if current voter is eligible to vote"""
-        if not self.current_voter:
+    def is_eligible_to_vote(self, session=None):
+        """Check if the session's voter is eligible to vote"""
+        voter_id = self._voter_id(session)
+        if not voter_id:
             return False
         
-        # Check if voter has already voted by querying the database directly
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT has_voted FROM voters WHERE voter_id = ?", (self.current_voter,))
-        result = cursor.fetchone()
-        conn.close()
+        # Check if voter has already voted using a pooled connection
+        has_voted = self.db.has_voter_voted(voter_id, self._election_id(session))
         
-        if result:
-            return not result[0]  # Return True if has_voted is False
-        return False
+        if has_voted is None:
+            return False
+        return not has_voted
     
-    def get_candidates(self):
-        """Get all available candidates"""
-        return self.db.get_all_candidates()
+    def get_candidates(self, election_id=DEFAULT_ELECTION_ID):
+        """Get the candidates standing in an election"""
+        return self.db.get_all_candidates(election_id)
+    
+    def get_candidate(self, candidate_id):
+        """Get a single candidate by ID, or None if it does not exist"""
+        return self.db.get_candidate(candidate_id)
+    
+    def get_voting_results(self, session=None, election_id=DEFAULT_ELECTION_ID):
+        """Get an election's current voting results (admin only)"""
+        if not self._is_admin(session):
+            return None
+        
+        return self.db.get_voting_results(election_id)
     
-    def get_voting_results(self):
-        """Get current voting results (admin only)"""
-        if not self.is_admin:
+    def get_runoff_results(self, session=None, election_id=DEFAULT_ELECTION_ID):
+        """
+        Count an election's ballots by instant runoff (admin only)
+        Returns: irv.instant_runoff result with an added names dict {candidate_id: name}
+        """
+        if not self._is_admin(session):
             return None
         
-        return self.db.get_voting_results()
+        candidates = self.db.get_all_candidates(election_id)
+        ballots = self.db.iter_ranked_ballots(election_id=election_id)
+        result = irv.instant_runoff(ballots, sorted(c[0] for c in candidates))
+        result['names'] = {c[0]: c[1] for c in candidates}
+        return result
     
-    def add_candidate(self, name, party="", description=""):
-        """Add a new candidate (admin only)"""
-        if not self.is_admin:
+    def add_candidate(self, name, party="", description="", session=None, election_id=DEFAULT_ELECTION_ID):
+        """Add a new candidate to an election (admin only)"""
+        if not self._is_admin(session):
             return False, "Admin access required"
         
-        return self.db.add_candidate(name, party, description)
+        return self.db.add_candidate(name, party, description, election_id)
     
-    def remove_candidate(self, candidate_id):
+    def remove_candidate(self, candidate_id, session=None):
         """Remove a candidate (admin only)"""
-        if not self.is_admin:
+        if not self._is_admin(session):
             return False, "Admin access required"
         
         success = self.db.remove_candidate(candidate_id)
@@ -123,30 +275,113 @@ class VotingSystem:
         else:
             return False, "Candidate not found"
     
-    def register_voter(self, voter_id, name, password):
+    def register_voter(self, voter_id, name, password, session=None):
         """Register a new voter (admin only)"""
-        if not self.is_admin:
+        if not self._is_admin(session):
             return False, "Admin access required"
         
         return self.db.register_voter(voter_id, name, password)
     
-    def get_all_voters(self):
+    def register_voters_bulk(self, voters, chunk_size=1000, progress=None, session=None):
+        """
+        Register many voters in chunked transactions (admin only)
+        Returns: (registered_count, duplicate_voter_ids), or None without admin access
+        """
+        if not self._is_admin(session):
+            return None
+        
+        return self.db.register_voters_bulk(voters, chunk_size, progress)
+    
+    def get_all_voters(self, session=None):
         """Get all registered voters (admin only)"""
-        if not self.is_admin:
+        if not self._is_admin(session):
             return None
         
         return self.db.get_all_voters()
     
-    def get_statistics(self):
-        """Get voting statistics"""
-        return self.db.get_statistics()
+    def get_voters_page(self, after_id=None, limit=100, filter=None, sort_by="voter_id",
+                        descending=False, after_value=None, session=None, election_id=DEFAULT_ELECTION_ID):
+        """Get one keyset-paginated page of an election's voter roll (admin only)"""
+        if not self._is_admin(session):
+            return None
+        
+        return self.db.get_voters_page(after_id, limit, filter, sort_by, descending, after_value, election_id)
+    
+    def get_statistics(self, election_id=DEFAULT_ELECTION_ID):
+        """Get an election's voting statistics"""
+        return self.db.get_statistics(election_id)
+    
+    def get_recent_votes(self, limit=10, session=None, include_ids=False, after_vote_id=None,
+                         election_id=DEFAULT_ELECTION_ID):
+        """Get an election's recent votes (admin only)"""
+        if not self._is_admin(session):
+            return None
+        
+        return self.db.get_recent_votes(limit, include_ids, after_vote_id, election_id)
     
-    def get_recent_votes(self, limit=10):
-        """Get recent votes (admin only)"""
-        if not self.is_admin:
+    def get_vote_timeline(self, bucket_minutes=1, buckets=None, per_candidate=False, session=None,
+                          election_id=DEFAULT_ELECTION_ID):
+        """Get an election's votes per time bucket with a running total (admin only)"""
+        if not self._is_admin(session):
             return None
         
-        return self.db.get_recent_votes(limit)
+        return self.db.get_vote_timeline(bucket_minutes, buckets, per_candidate, election_id)
+    
+    # Elections
+    def get_elections(self):
+        """Get all elections as (election_id, name, description, created_date)"""
+        return self.db.get_elections()
+    
+    def create_election(self, name, description="", session=None):
+        """
+        Add an election (admin only)
+        Returns: (success, message, election_id)
+        """
+        if not self._is_admin(session):
+            return False, "Admin access required", None
+        
+        if not name or not name.strip():
+            return False, "Election name cannot be empty", None
+        return self.db.create_election(name.strip(), description)
+    
+    def add_election_voters(self, election_id, voter_ids=None, session=None):
+        """
+        Put registered voters on an election's roll; None adds every registered voter (admin only)
+        Returns: (success, message)
+        """
+        if not self._is_admin(session):
+            return False, "Admin access required"
+        
+        try:
+            added = self.db.add_election_voters(election_id, voter_ids)
+        except ValueError as e:
+            return False, str(e)
+        return True, f"Added {added:,} voters to the roll"
+    
+    def remove_election_voters(self, election_id, voter_ids, session=None):
+        """
+        Take voters off an election's roll; voters who have already voted stay on it (admin only)
+        Returns: (success, message)
+        """
+        if not self._is_admin(session):
+            return False, "Admin access required"
+        
+        voter_ids = list(voter_ids)
+        try:
+            removed = self.db.remove_election_voters(election_id, voter_ids)
+        except ValueError as e:
+            return False, str(e)
+        message = f"Removed {removed:,} voters from the roll"
+        if removed < len(voter_ids):
+            message += f"\n⚠ {len(voter_ids) - removed:,} were not on the roll or have already voted"
+        return True, message
+    
+    def get_change_token(self, session=None):
+        """Get a token that changes whenever results or statistics may have changed (admin only)"""
+        if not self._is_admin(session):
+            return None
+        
+        return self.db.get_change_token()
     
     def validate_voter_id(self, voter_id):
         """Validate voter ID format"""
@@ -179,27 +414,30 @@ class VotingSystem:
         
         return True, "Valid candidate name"
     
-    def get_current_user_info(self):
-        """Get information about current logged-in user"""
-        if self.is_admin:
-            return {"type": "admin", "id": "admin"}
-        elif self.current_voter:
-            return {"type": "voter", "id": self.current_voter}
+    def get_current_user_info(self, session=None):
+        """Get information about the given or default logged-in user"""
+        session = self._resolve_session(session)
+        if session is not None and session.is_admin:
+            return {"type": "admin", "id": session.user_id}
+        elif session is not None and session.voter_id:
+            return {"type": "voter", "id": session.voter_id}
         else:
             return {"type": "none", "id": None}
     
-    def export_results_summary(self):
-        """Export a summary of voting results"""
-        if not self.is_admin:
+    def export_results_summary(self, session=None, election_id=DEFAULT_ELECTION_ID):
+        """Export a summary of an election's voting results"""
+        if not self._is_admin(session):
             return None
         
-        results = self.get_voting_results()
-        stats = self.get_statistics()
+        results = self.get_voting_results(session, election_id)
+        stats = self.get_statistics(election_id)
+        election_names = {election[0]: election[1] for election in self.get_elections()}
         
         summary = []
         summary.append("=" * 50)
         summary.append("VOTING RESULTS SUMMARY")
         summary.append("=" * 50)
+        summary.append(f"Election: {election_names.get(election_id, election_id)}")
         summary.append(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         summary.append("")
         
@@ -220,4 +458,39 @@ class VotingSystem:
         
         summary.append("=" * 50)
         
-        return "\n".join(summary)
\ No newline at end of file
+        return "\n".join(summary)
+    
+    def export_data(self, kind, path, file_format=None, compress=None, session=None, election_id=DEFAULT_ELECTION_ID):
+        """
+        Stream an election's results, turnout roll or vote audit to a CSV/JSONL file (admin only)
+        Returns: (success, message)
+        """
+        if not self._is_admin(session):
+            return False, "Admin access required"
+        
+        try:
+            count = exporters.export(self.db, kind, path, file_format, compress, election_id=election_id)
+        except (OSError, ValueError) as e:
+            return False, f"Export failed: {e}"
+        return True, f"Exported {count:,} rows to {path}"
+    
+    def get_metrics(self, session=None):
+        """Get call counts, error counts and latency histograms per operation (admin only)"""
+        if not self._is_admin(session):
+            return None
+        
+        return self.metrics.snapshot()
+    
+    def dump_metrics(self, path, session=None):
+        """
+        Write the current metrics to a JSON file (admin only)
+        Returns: (success, message)
+        """
+        if not self._is_admin(session):
+            return False, "Admin access required"
+        
+        try:
+            self.metrics.dump(path)
+        except OSError as e:
+            return False, f"Could not write metrics: {e}"
+        return True, f"Metrics written to {path}"
\ No newline at end of file